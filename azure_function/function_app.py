@@ -4,119 +4,430 @@ Timer-triggered function that runs daily at 7:31 AM UTC (12:31 AM MST).
 Searches USPTO API for new patents since the last sync and loads them
 into Azure SQL Database using MERGE upsert.
 
+Each topic has its own high-water marks in SYNC_WATERMARKS: a filing-date
+mark (new filings) and a publication-date mark (older filings published
+late). A run fetches only the delta past each topic's marks, so a newly
+added topic backfills on its own without re-crawling the others.
+
+Each run works through filing-date and publication-date windows within a
+time budget that fits the Consumption plan timeout. If the budget runs out
+(e.g. a long catch-up after missed days) the run stops at a window
+boundary, leaves a 'partial' SYNC_LOG row, and enqueues a continuation
+message; the continuation resumes from the watermarks immediately. If a
+USPTO page request fails, the run stops before loading that window, so its
+marks stay put and the next daily run fetches it again ('failed' row).
+
+Every invocation records its duration, API and database cost, and row
+counts in SYNC_RUN_METRICS (see sql/17_run_metrics_qc.sql for regressions).
+
 Environment variables (configure in Function App > Application Settings):
     USPTO_API_KEY, AZURE_SQL_SERVER, AZURE_SQL_DATABASE,
     AZURE_SQL_USER, AZURE_SQL_PASSWORD
+    AZURE_SQL_DRIVER (optional; default: newest installed ODBC Driver NN for SQL Server)
+    SYNC_TIME_BUDGET_SECONDS (optional, default 480; keep below functionTimeout)
+    PATENTS_COMPRESS_ABSTRACT (optional; "true" if PATENTS stores abstracts compressed)
+    INSTRUMENTATION (optional; e.g. "appinsights" or "log", see shared/instrumentation.py)
 """
 
-import json
 import logging
 import os
 import time
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Optional
 
 import azure.functions as func
-import pyodbc
 
-from shared.patent_search import search_by_title
+from shared.patent_search import (
+    clear_response_cache,
+    get_quota_state,
+    plan_coalesced_queries,
+    search_all_by_titles,
+)
 from shared.azure_sql_queries import (
+    build_sync_log_insert_query,
+    build_sync_log_update_query,
     build_upsert_query,
+    build_upsert_watermark_query,
     get_last_sync_date_query,
+    get_watermarks_query,
 )
+from shared.instrumentation import configure_from_env, timer
+from shared.db_connection import acquire, release
+from shared.known_patents import KnownPatentIndex
+from shared.run_metrics import RunMetrics
+from shared.scheduler import SourceConfig, YieldScheduler, group_config
 
 app = func.FunctionApp()
 
+# Hot-path timers and counters; no sinks (and near-zero cost) unless configured
+configure_from_env()
+
 SEARCH_TOPICS = [
     "AI data processing",
     "predictive analytics",
     "business intelligence",
 ]
 
+# Where a topic with no watermark (and no earlier sync) starts backfilling
+DEFAULT_SYNC_START = "2022-11-30"
 
-def _get_connection(retries: int = 3, delay: int = 30) -> pyodbc.Connection:
-    """Connect to Azure SQL with retry for cold start (free tier wakes up in ~30-60s)."""
-    last_error = None
-    for attempt in range(retries):
-        try:
-            return pyodbc.connect(
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={os.environ['AZURE_SQL_SERVER']};"
-                f"DATABASE={os.environ['AZURE_SQL_DATABASE']};"
-                f"UID={os.environ['AZURE_SQL_USER']};"
-                f"PWD={os.environ['AZURE_SQL_PASSWORD']}"
+# Quota-aware scheduling: per-topic priority weights and per-run API call
+# budgets (omit a topic for defaults). Remaining quota goes to the topics
+# currently yielding the most new patents per call; low-yield topics back off.
+TOPIC_SCHEDULE = {
+    "AI data processing": SourceConfig(priority=1.0),
+    "predictive analytics": SourceConfig(priority=1.0),
+    "business intelligence": SourceConfig(priority=1.0),
+}
+QUOTA_RESERVE = 50  # API calls of the reported quota to leave unused
+
+# USPTO fetching starts before the last sync date is known (the database may
+# still be resuming), so it speculatively covers this many trailing days.
+SPECULATIVE_LOOKBACK_DAYS = 2
+
+# Catch-up syncs are split into filing- and publication-date windows of this
+# many days; progress is committed (and the watermarks advanced) per window
+SYNC_WINDOW_DAYS = 30
+
+# host.json functionTimeout is 10 minutes; stop well before it
+DEFAULT_TIME_BUDGET_SECONDS = 480
+MIN_WINDOW_RESERVE_SECONDS = 30
+
+# Must match how PATENTS was created (build_create_table_sql(compress_abstract=...))
+COMPRESS_ABSTRACT = os.environ.get("PATENTS_COMPRESS_ABSTRACT", "").lower() in ("1", "true")
+
+CONTINUATION_QUEUE = "patent-sync-continuation"
+
+
+def _fetch_topics(
+    from_date: str,
+    to_date: str,
+    topics: list[str] = SEARCH_TOPICS,
+    by_publication: bool = False,
+) -> tuple[dict[str, list], bool]:
+    """Fetch every page of the given topics for a date range.
+
+    The range applies to the filing date, or to the publication date when
+    by_publication is set. Overlapping topics are OR'd into coalesced
+    queries and attributed locally. Query groups run concurrently, and
+    each group fetches its remaining pages concurrently, all under the
+    shared USPTO rate limiter.
+
+    Returns:
+        Tuple of (dict mapping each topic to its patents, whether any page
+        request failed; the results are then incomplete)
+    """
+    groups = plan_coalesced_queries(topics)
+    dates = {"publication_date_from": from_date, "publication_date_to": to_date} \
+        if by_publication else {"filing_date_from": from_date, "filing_date_to": to_date}
+    by_topic = {topic: [] for topic in topics}
+    failed = False
+    with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+        fetched = pool.map(lambda group: search_all_by_titles(group, **dates), groups)
+        for group, (results, paged) in zip(groups, fetched):
+            logging.info(
+                f"  [{', '.join(group)}] {'published' if by_publication else 'filed'} "
+                f"{from_date}..{to_date}: {paged.pages} page(s), "
+                f"{paged.total_count} matches in {paged.seconds:.1f}s"
             )
-        except pyodbc.Error as e:
-            last_error = e
-            if attempt < retries - 1:
-                logging.warning(f"DB connection attempt {attempt + 1}/{retries} failed, retrying in {delay}s: {e}")
-                time.sleep(delay)
-    raise last_error
+            if paged.failed:
+                logging.error(f"  [{', '.join(group)}] USPTO page request failed")
+                failed = True
+            for topic, patents in results.items():
+                by_topic[topic].extend(patents)
+    return by_topic, failed
+
+
+def _load_watermarks(cursor, today: str) -> dict[str, list[str]]:
+    """Read [filing_date_hwm, publication_date_hwm] for every SEARCH_TOPIC.
+
+    A mark is the date the next delta starts from. On the first run after
+    SYNC_WATERMARKS was introduced, every topic is seeded from the last
+    SYNC_LOG date. After that, a topic without a row is new: it backfills
+    filings from DEFAULT_SYNC_START, and its publications are tracked from
+    today, because the filing backfill already sees everything published
+    so far.
+    """
+    cursor.execute(get_watermarks_query())
+    stored = {r.source: r for r in cursor.fetchall()}
+
+    seed = None
+    if not any(topic in stored for topic in SEARCH_TOPICS):
+        cursor.execute(get_last_sync_date_query())
+        last = cursor.fetchone()
+        if last and last.last_sync_date:
+            seed = str(last.last_sync_date)
+
+    marks = {}
+    for topic in SEARCH_TOPICS:
+        if topic in stored:
+            row = stored[topic]
+            marks[topic] = [
+                str(row.filing_date_hwm or DEFAULT_SYNC_START),
+                str(row.publication_date_hwm or today),
+            ]
+        elif seed:
+            marks[topic] = [seed, seed]
+        else:
+            logging.info(f"New topic '{topic}': backfilling from {DEFAULT_SYNC_START}")
+            marks[topic] = [DEFAULT_SYNC_START, today]
+    return marks
+
+
+def _plan_work(
+    marks: dict[str, list[str]],
+    to_date: str,
+    speculative_from: Optional[str] = None,
+    buffered: Optional[dict] = None,
+) -> list[tuple]:
+    """Plan (kind, topics, window_from, window_to, prefetched) work items.
+
+    Topics sharing a watermark are coalesced into one query. Filing and
+    publication deltas alike are split into SYNC_WINDOW_DAYS windows, so
+    no single item outlasts the time budget. When a speculative fetch was
+    buffered, the filing delta stops short of it and the speculative
+    window reuses the buffered results.
+    """
+    work = []
+    for kind, mark_index in (("filing", 0), ("publication", 1)):
+        by_mark = {}
+        for topic in SEARCH_TOPICS:
+            by_mark.setdefault(marks[topic][mark_index], []).append(topic)
+        for mark, topics in sorted(by_mark.items()):
+            delta_to = to_date
+            if kind == "filing" and buffered is not None:
+                delta_to = (date.fromisoformat(speculative_from) - timedelta(days=1)).isoformat()
+            work.extend((kind, topics, w_from, w_to, None)
+                        for w_from, w_to in _date_windows(mark, delta_to))
+            if delta_to != to_date:
+                prefetched = {topic: buffered[topic] for topic in topics}
+                work.append((kind, topics, speculative_from, to_date, prefetched))
+    return work
+
+
+def _date_windows(from_date: str, to_date: str, days: int = SYNC_WINDOW_DAYS) -> list[tuple[str, str]]:
+    """Split an inclusive date range into consecutive (start, end) windows."""
+    windows = []
+    d = date.fromisoformat(from_date)
+    end = date.fromisoformat(to_date)
+    while d <= end:
+        window_end = min(d + timedelta(days=days - 1), end)
+        windows.append((d.isoformat(), window_end.isoformat()))
+        d = window_end + timedelta(days=1)
+    return windows
 
 
 @app.timer_trigger(schedule="0 31 7 * * *", arg_name="timer", run_on_startup=False)
-def daily_patent_sync(timer: func.TimerRequest) -> None:
+@app.queue_output(arg_name="continuation", queue_name=CONTINUATION_QUEUE,
+                  connection="AzureWebJobsStorage")
+def daily_patent_sync(timer: func.TimerRequest, continuation: func.Out[str]) -> None:
     """Daily patent sync: search USPTO for new patents and load into Azure SQL."""
     logging.info("Starting daily patent sync")
+    _run_sync(continuation, speculative=True)
 
-    conn = _get_connection()
-    cursor = conn.cursor()
 
-    # Determine date range: last sync date -> today
-    cursor.execute(get_last_sync_date_query())
-    row = cursor.fetchone()
-    if row and row.last_sync_date:
-        from_date = str(row.last_sync_date)
-    else:
-        from_date = "2022-11-30"
+@app.queue_trigger(arg_name="msg", queue_name=CONTINUATION_QUEUE,
+                   connection="AzureWebJobsStorage")
+@app.queue_output(arg_name="continuation", queue_name=CONTINUATION_QUEUE,
+                  connection="AzureWebJobsStorage")
+def patent_sync_continuation(msg: func.QueueMessage, continuation: func.Out[str]) -> None:
+    """Continue a catch-up sync that stopped at its time budget."""
+    logging.info(f"Continuing partial sync: {msg.get_body().decode()}")
+    # The previous invocation already woke the database; go straight to the
+    # watermarks instead of re-fetching the speculative window
+    _run_sync(continuation, speculative=False)
 
-    to_date = date.today().isoformat()
-    logging.info(f"Sync range: {from_date} to {to_date}")
 
-    merge_sql = build_upsert_query()
-    total_loaded = 0
+def _run_sync(continuation: func.Out[str], speculative: bool) -> None:
+    """Sync windows from the watermarks to today within the time budget.
 
-    for topic in SEARCH_TOPICS:
-        results = search_by_title(
-            topic,
-            limit=100,
-            filing_date_from=from_date,
-            filing_date_to=to_date,
-        )
-
-        count = 0
-        for p in results:
-            try:
-                params = (
-                    p.get("patent_number", ""),
-                    p.get("title", ""),
-                    p.get("abstract", ""),
-                    p.get("assignee", ""),
-                    json.dumps(p.get("inventors", [])),
-                    p.get("filing_date") or None,
-                    p.get("grant_date") or None,
-                    json.dumps(p.get("cpc_codes", [])),
-                    topic,
-                    "daily_sync",
-                )
-                cursor.execute(merge_sql, params)
-                count += 1
-            except Exception as e:
-                logging.error(f"Error loading {p.get('patent_number', '?')}: {e}")
+    Args:
+        continuation: Queue output for the continuation message
+        speculative: Fetch the trailing SPECULATIVE_LOOKBACK_DAYS while the
+            database connection is being established
+    """
+    started = time.monotonic()
+    # Module state survives between warm invocations; no pages from a
+    # previous run may stand in for today's
+    clear_response_cache()
+    with RunMetrics("daily_sync") as metrics:
+        budget = float(os.environ.get("SYNC_TIME_BUDGET_SECONDS", DEFAULT_TIME_BUDGET_SECONDS))
+        deadline = started + budget
 
-        logging.info(f"  {topic}: {count} patents")
-        total_loaded += count
+        to_date = date.today().isoformat()
+        speculative_from = buffered = None
+        if speculative:
+            # Wake the database and fetch from USPTO at the same time; results
+            # are buffered until the connection is ready
+            speculative_from = (
+                date.today() - timedelta(days=SPECULATIVE_LOOKBACK_DAYS)
+            ).isoformat()
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                conn_future = pool.submit(acquire)
+                buffered, failed = _fetch_topics(speculative_from, to_date)
+                fetched_at = time.monotonic()
+                conn = conn_future.result()
+            if failed:
+                # Incomplete; the window is fetched again in the loop below
+                speculative_from = buffered = None
+            logging.info(
+                f"USPTO fetch took {fetched_at - started:.1f}s, "
+                f"DB ready after {time.monotonic() - started:.1f}s"
+            )
+        else:
+            conn = acquire()
+        cursor = sync_id = None
+        total_loaded = skipped = 0
+        try:
+            cursor = metrics.track(conn.cursor())
+            metrics.begin(cursor)
 
-    conn.commit()
+            # Each topic resumes from its own watermarks
+            marks = _load_watermarks(cursor, to_date)
+            from_date = min(filing for filing, _ in marks.values())
+            logging.info(f"Sync range: {from_date} to {to_date}")
+            work = _plan_work(marks, to_date, speculative_from, buffered)
+
+            cursor.execute(
+                build_sync_log_insert_query(),
+                (from_date, to_date, ", ".join(SEARCH_TOPICS)),
+            )
+            sync_id = cursor.fetchone()[0]
+            conn.commit()
 
-    # Log the sync
-    cursor.execute(
-        "INSERT INTO SYNC_LOG (filing_date_from, filing_date_to, patents_loaded, search_topics) "
-        "VALUES (?, ?, ?, ?)",
-        (from_date, to_date, total_loaded, ", ".join(SEARCH_TOPICS)),
-    )
-    conn.commit()
+            merge_sql = build_upsert_query(COMPRESS_ABSTRACT)
+            watermark_sql = build_upsert_watermark_query()
+            topic_counts = {topic: 0 for topic in SEARCH_TOPICS}
+            slowest_window = 0.0
+            out_of_time = fetch_failed = False
 
-    cursor.close()
-    conn.close()
+            # Each topic group is one scheduler source; its windows stay in date
+            # order so watermarks only ever advance
+            scheduler = YieldScheduler(quota_reserve=QUOTA_RESERVE)
+            for item in work:
+                source = ", ".join(item[1])
+                scheduler.configs[source] = group_config(TOPIC_SCHEDULE, item[1])
+                scheduler.add(source, item)
 
-    logging.info(f"Daily sync complete: {total_loaded} patents loaded")
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining < max(slowest_window * 1.5, MIN_WINDOW_RESERVE_SECONDS):
+                    if scheduler.pending():
+                        out_of_time = True
+                        logging.warning(
+                            f"Time budget nearly spent ({remaining:.0f}s left), stopping; "
+                            f"{scheduler.pending()} window(s) remain"
+                        )
+                    break
+                picked = scheduler.next_item()
+                if picked is None:
+                    break
+                source, (kind, topics, window_from, window_to, by_topic) = picked
+
+                window_started = time.monotonic()
+                calls_before = get_quota_state()["calls"]
+                if by_topic is None:
+                    by_topic, failed = _fetch_topics(
+                        window_from, window_to, topics, by_publication=(kind == "publication")
+                    )
+                    if failed:
+                        # Loading part of the window would move its marks past
+                        # patents never fetched; leave it to the next run
+                        fetch_failed = True
+                        logging.error(
+                            f"USPTO fetch failed for {kind} window {window_from} to "
+                            f"{window_to}, stopping; it and {scheduler.pending()} more remain"
+                        )
+                        break
+                loaded_before = total_loaded
+                # Publication deltas can carry any filing date, so they are checked
+                # against the stored rows one by one via the MERGE itself
+                known = KnownPatentIndex()
+                if kind == "filing":
+                    known = KnownPatentIndex.from_db(cursor, window_from, window_to)
+
+                with timer("db.upsert_batch", source=source, kind=kind) as batch:
+                    for topic in topics:
+                        for p in by_topic[topic]:
+                            topic_counts[topic] += 1
+                            # Skip patents already stored unchanged, including ones
+                            # loaded earlier in this run under a higher-priority topic
+                            if known.is_unchanged(p):
+                                skipped += 1
+                                continue
+                            try:
+                                cursor.execute(merge_sql, p.to_db_params(topic, "daily_sync"))
+                                known.add(p)
+                                total_loaded += 1
+                            except Exception as e:
+                                logging.error(f"Error loading {p.patent_number or '?'}: {e}")
+                    batch.set(items=total_loaded - loaded_before)
+
+                # Advance watermarks and the SYNC_LOG count in the same transaction
+                # as the window's data. A mark is where the next delta starts: the
+                # day after a completed window, or today itself (still filling up).
+                next_mark = window_to
+                if window_to < to_date:
+                    next_mark = (date.fromisoformat(window_to) + timedelta(days=1)).isoformat()
+                for topic in topics:
+                    marks[topic][0 if kind == "filing" else 1] = next_mark
+                    cursor.execute(watermark_sql, (topic, *marks[topic]))
+                cursor.execute(build_sync_log_update_query(), (total_loaded, "partial", sync_id))
+                conn.commit()
+                scheduler.record(source, get_quota_state()["calls"] - calls_before,
+                                 total_loaded - loaded_before)
+                slowest_window = max(slowest_window, time.monotonic() - window_started)
+                logging.info(f"  {kind.capitalize()} window {window_from} to {window_to} done")
+
+            for topic, count in topic_counts.items():
+                logging.info(f"  {topic}: {count} patents")
+            logging.info(f"  Skipped (already stored, unchanged): {skipped}")
+            for row in scheduler.summary():
+                logging.info(f"  Schedule {row}")
+
+            # Work deferred by call budgets or the API quota (not the time
+            # budget) is left to the next daily run, which resumes from the
+            # watermarks
+            if not (out_of_time or fetch_failed) and scheduler.pending():
+                logging.warning(
+                    f"{scheduler.pending()} window(s) deferred by quota: {get_quota_state()}"
+                )
+
+            status = "failed" if fetch_failed else "partial" if out_of_time else "completed"
+            cursor.execute(build_sync_log_update_query(), (total_loaded, status, sync_id))
+            if out_of_time:
+                # The continuation resumes from the watermarks committed above
+                continuation.set(f'{{"sync_id": {sync_id}}}')
+            run = metrics.finish(
+                cursor, sync_id, status, "daily_sync",
+                rows_sent=total_loaded, rows_skipped=skipped,
+            )
+            conn.commit()
+            logging.info(f"Run metrics: {run}")
+            cursor.close()
+        except Exception:
+            # Record the failure if the run got as far as the database;
+            # windows committed before the error keep their watermarks
+            if cursor is not None:
+                try:
+                    conn.rollback()
+                    if sync_id is not None:
+                        cursor.execute(build_sync_log_update_query(),
+                                       (total_loaded, "failed", sync_id))
+                    metrics.finish(cursor, sync_id, "failed", "daily_sync",
+                                   rows_sent=total_loaded, rows_skipped=skipped)
+                    conn.commit()
+                except Exception as e:
+                    logging.error(f"Could not record the failed run: {e}")
+            raise
+        finally:
+            release(conn)  # Kept open for the next warm invocation; rolls back
+
+    if fetch_failed:
+        logging.error(f"Daily sync stopped on a USPTO failure: {total_loaded} patents loaded; "
+                      f"the next run resumes from the watermarks")
+    elif out_of_time:
+        logging.info(f"Daily sync partial: {total_loaded} patents loaded, continuing")
+    else:
+        logging.info(f"Daily sync complete: {total_loaded} patents loaded")
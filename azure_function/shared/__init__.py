@@ -1 +1,5 @@
-"""Shared modules for Azure Function daily patent sync."""
+"""Shared modules for Azure Function daily patent sync.
+
+Every module here except this one is a copy of tools/<name>.py; edit the
+tools/ version and run scripts/sync_shared.py (--check to verify).
+"""
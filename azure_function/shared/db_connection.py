@@ -0,0 +1,187 @@
+"""Azure SQL connections shared by the Function, the scripts and the charts.
+
+One place for the connection string, the ODBC driver and the retry policy:
+
+- The driver comes from AZURE_SQL_DRIVER, or the newest installed
+  "ODBC Driver NN for SQL Server" (17 on older Functions images, 18 locally).
+- The serverless database auto-pauses and takes ~30-60s to resume; resume
+  and other transient errors are retried with exponential backoff (2s, 4s,
+  ... capped at max_delay), anything else (e.g. bad credentials) fails
+  immediately.
+- ODBC driver-manager pooling is on, so closing a connection and opening
+  another with the same string skips the login handshake.
+- ConnectionPool keeps a few open connections in module state. A warm
+  Functions host keeps module state between invocations, so a repeat run
+  gets its connection back without reconnecting; a connection idle longer
+  than HEALTH_CHECK_AFTER_SECONDS is checked with SELECT 1 first.
+
+New connections are timed as "db.connect" instrumentation events and pool
+hits counted as "db.connect_reused".
+
+Usage:
+    conn = get_connection()            # scripts: one connection per run
+
+    conn = acquire()                   # Function: warm pool
+    ...
+    release(conn)
+"""
+import logging
+import os
+import re
+import threading
+import time
+
+import pyodbc
+
+from .instrumentation import count, timer
+
+# Must be set before the first connect; pyodbc enables it by default, but
+# say so explicitly since the warm pool relies on it
+pyodbc.pooling = True
+
+# Serverless resume / transient error codes worth retrying
+# (40613: database unavailable, i.e. resuming; 40197/40501: service busy;
+#  49918-49920: too many requests; HYT00: login timeout; 08S01: link failure)
+TRANSIENT_DB_ERRORS = ("40613", "40197", "40501", "49918", "49919", "49920", "HYT00", "08S01")
+HEALTH_CHECK_AFTER_SECONDS = 30
+POOL_SIZE = 2
+
+_logger = logging.getLogger("patent_db")
+
+
+def odbc_driver() -> str:
+    """ODBC driver name: AZURE_SQL_DRIVER, else the newest installed SQL Server driver."""
+    configured = os.environ.get("AZURE_SQL_DRIVER")
+    if configured:
+        return configured
+    versions = [
+        int(m.group(1))
+        for m in (re.fullmatch(r"ODBC Driver (\d+) for SQL Server", d) for d in pyodbc.drivers())
+        if m
+    ]
+    return f"ODBC Driver {max(versions, default=18)} for SQL Server"
+
+
+def connection_string() -> str:
+    """Connection string for AZURE_SQL_SERVER / _DATABASE / _USER / _PASSWORD."""
+    return (
+        f"DRIVER={{{odbc_driver()}}};"
+        f"SERVER={os.environ['AZURE_SQL_SERVER']};"
+        f"DATABASE={os.environ['AZURE_SQL_DATABASE']};"
+        f"UID={os.environ['AZURE_SQL_USER']};"
+        f"PWD={os.environ['AZURE_SQL_PASSWORD']};"
+        "Encrypt=yes;TrustServerCertificate=no;"
+        f"Connection Timeout={os.environ.get('AZURE_SQL_CONNECT_TIMEOUT', '30')};"
+    )
+
+
+def is_transient(error: Exception) -> bool:
+    """True for errors worth retrying (serverless resume, throttling, timeouts)."""
+    return any(code in str(error) for code in TRANSIENT_DB_ERRORS)
+
+
+def get_connection(
+    max_attempts: int = 7, base_delay: float = 2.0, max_delay: float = 32.0
+) -> pyodbc.Connection:
+    """Open a connection, waiting out a serverless auto-resume.
+
+    Args:
+        max_attempts: Connection attempts before giving up
+        base_delay: Seconds before the first retry (doubles each retry)
+        max_delay: Cap on the delay between retries
+
+    Returns:
+        Open pyodbc connection
+
+    Raises:
+        pyodbc.Error: Non-transient error, or still failing after max_attempts
+    """
+    conn_str = connection_string()
+    delay = base_delay
+    with timer("db.connect") as t:
+        for attempt in range(1, max_attempts + 1):
+            try:
+                conn = pyodbc.connect(conn_str)
+                t.set(attempts=attempt, reused=False)
+                return conn
+            except pyodbc.Error as e:
+                if attempt == max_attempts or not is_transient(e):
+                    raise
+                _logger.warning(
+                    f"DB not ready (attempt {attempt}/{max_attempts}, likely resuming), "
+                    f"retrying in {delay:.0f}s: {e}"
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, max_delay)
+
+
+def is_healthy(conn: pyodbc.Connection) -> bool:
+    """Round-trip SELECT 1; False if the connection is broken."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1").fetchone()
+        cursor.close()
+        return True
+    except pyodbc.Error:
+        return False
+
+
+class ConnectionPool:
+    """Small pool of open connections kept across warm invocations."""
+
+    def __init__(self, size: int = POOL_SIZE):
+        self.size = size
+        self._idle = []  # (connection, released_at)
+        self._lock = threading.Lock()
+
+    def acquire(self) -> pyodbc.Connection:
+        """An idle healthy connection if there is one, else a new connection."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, released_at = self._idle.pop()
+            if time.monotonic() - released_at < HEALTH_CHECK_AFTER_SECONDS or is_healthy(conn):
+                count("db.connect_reused")
+                return conn
+            _close_quietly(conn)
+        return get_connection()
+
+    def release(self, conn: pyodbc.Connection) -> None:
+        """Return a connection for reuse; uncommitted work is rolled back."""
+        try:
+            conn.rollback()
+        except pyodbc.Error:
+            _close_quietly(conn)
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        _close_quietly(conn)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+
+_pool = ConnectionPool()
+
+
+def acquire() -> pyodbc.Connection:
+    """Connection from the process-wide warm pool (see ConnectionPool)."""
+    return _pool.acquire()
+
+
+def release(conn: pyodbc.Connection) -> None:
+    """Give a connection from acquire() back to the warm pool."""
+    _pool.release(conn)
+
+
+def _close_quietly(conn: pyodbc.Connection) -> None:
+    try:
+        conn.close()
+    except pyodbc.Error:
+        pass
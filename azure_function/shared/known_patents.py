@@ -0,0 +1,99 @@
+"""Compact in-memory index of patents already stored in Azure SQL.
+
+Loaded once per sync from (patent_number, row_hash) pairs, the index lets
+loaders drop incoming patents that are already present and unchanged
+before any SQL is sent. Each entry costs 16 bytes (a 64-bit key derived
+from the patent number plus the 64-bit content fingerprint) held in two
+parallel sorted arrays, instead of a Python str in a set.
+"""
+import hashlib
+from array import array
+from bisect import bisect_left
+
+from .azure_sql_queries import get_known_patents_query
+from .patent_record import Patent
+
+# Pending additions are merged into the sorted arrays in batches
+_MERGE_THRESHOLD = 4096
+
+
+def patent_key(patent_number: str) -> int:
+    """Signed 64-bit key for a patent number (application or publication)."""
+    digest = hashlib.blake2b(patent_number.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class KnownPatentIndex:
+    """Sorted-array set of patent keys with their row_hash fingerprints."""
+
+    def __init__(self):
+        self._keys = array("q")
+        self._hashes = array("q")
+        self._pending = {}
+
+    @classmethod
+    def from_db(cls, cursor, filing_date_from: str, filing_date_to: str) -> "KnownPatentIndex":
+        """Load the index for a filing date range.
+
+        Args:
+            cursor: Open pyodbc cursor
+            filing_date_from: Start of the filing date range (YYYY-MM-DD)
+            filing_date_to: End of the filing date range (YYYY-MM-DD)
+
+        Returns:
+            Populated KnownPatentIndex
+        """
+        index = cls()
+        cursor.execute(get_known_patents_query(), (filing_date_from, filing_date_to))
+        pairs = []
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            # NULL row_hash (rows loaded before fingerprints existed) -> 0,
+            # which never equals a real fingerprint so the row is rewritten
+            pairs.extend((patent_key(r[0]), r[1] or 0) for r in rows)
+        pairs.sort()
+        index._keys = array("q", (k for k, _ in pairs))
+        index._hashes = array("q", (h for _, h in pairs))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._pending)
+
+    def __contains__(self, patent_number: str) -> bool:
+        return self._lookup(patent_key(patent_number)) is not None
+
+    def is_unchanged(self, patent: Patent) -> bool:
+        """True if the patent is already stored with identical content."""
+        return self._lookup(patent_key(patent.patent_number)) == patent.row_hash
+
+    def add(self, patent: Patent) -> None:
+        """Record a patent as stored (call after a successful MERGE)."""
+        self._pending[patent_key(patent.patent_number)] = patent.row_hash
+        if len(self._pending) >= _MERGE_THRESHOLD:
+            self._merge_pending()
+
+    def _lookup(self, key: int):
+        if key in self._pending:
+            return self._pending[key]
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._hashes[i]
+        return None
+
+    def _merge_pending(self) -> None:
+        keys, hashes = array("q"), array("q")
+        i = 0
+        for key, row_hash in sorted(self._pending.items()):
+            j = bisect_left(self._keys, key, i)
+            keys.extend(self._keys[i:j])
+            hashes.extend(self._hashes[i:j])
+            if j < len(self._keys) and self._keys[j] == key:
+                j += 1  # Replaced by the pending fingerprint
+            keys.append(key)
+            hashes.append(row_hash)
+            i = j
+        keys.extend(self._keys[i:])
+        hashes.extend(self._hashes[i:])
+        self._keys, self._hashes, self._pending = keys, hashes, {}
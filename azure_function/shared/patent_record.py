@@ -0,0 +1,111 @@
+"""Compact patent record shared by the search tools and the loaders.
+
+A Patent replaces the per-patent dict that the search functions used to
+return. It is a slotted dataclass (no per-instance __dict__), stores
+inventors and CPC codes as tuples, and interns the highly repetitive
+assignee, inventor and CPC strings so large backfills hold many more
+records per MB.
+
+For backward compatibility a Patent still supports dict-style reads:
+    patent["title"], patent.get("cpc_codes", [])
+Writes are not supported: code that set patent["search_query"] or
+patent["category"] before loading now passes them to to_db_params(), whose
+parameters match build_upsert_query().
+"""
+import hashlib
+import json
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Optional
+
+
+@dataclass(slots=True)
+class Patent:
+    """One patent application/publication in storage-ready form."""
+
+    patent_number: str
+    title: str = ""
+    abstract: str = ""
+    assignee: str = ""
+    inventors: tuple[str, ...] = ()
+    filing_date: Optional[str] = None
+    grant_date: Optional[str] = None
+    cpc_codes: tuple[str, ...] = ()
+    status_code: Optional[int] = None
+    application_number: str = ""
+    _row: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _hash: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.assignee = sys.intern(self.assignee or "")
+        self.inventors = tuple(sys.intern(name) for name in self.inventors)
+        self.cpc_codes = tuple(sys.intern(code) for code in self.cpc_codes)
+
+    def to_db_params(self, search_query: str, category: str) -> tuple:
+        """Parameters for build_upsert_query(), in placeholder order.
+
+        The patent-derived part (including the JSON encoding of inventors
+        and CPC codes) is built once and cached on the record, so treat
+        records as immutable and use dataclasses.replace() to change one.
+
+        Args:
+            search_query: Topic or CPC source that found this patent
+            category: Load category (e.g., "daily_sync", "cpc_collection")
+
+        Returns:
+            12-tuple of MERGE parameters (row_hash last)
+        """
+        return self._content_row() + (search_query, category, self.row_hash)
+
+    @property
+    def row_hash(self) -> int:
+        """Signed 64-bit fingerprint of the stored content columns.
+
+        Matches PATENTS.row_hash, so an unchanged patent can be detected
+        without sending it to the database. search_query and category are
+        deliberately excluded: re-finding a patent via another source is
+        not a content change. The enrichment stage does not update it.
+        """
+        if self._hash is None:
+            digest = hashlib.blake2b(
+                json.dumps(self._content_row()).encode(), digest_size=8
+            ).digest()
+            self._hash = int.from_bytes(digest, "big", signed=True)
+        return self._hash
+
+    def _content_row(self) -> tuple:
+        if self._row is None:
+            self._row = (
+                self.patent_number,
+                self.title,
+                self.abstract,
+                self.assignee,
+                json.dumps(self.inventors),
+                self.filing_date or None,
+                self.grant_date or None,
+                json.dumps(self.cpc_codes),
+                self.status_code,
+            )
+        return self._row
+
+    def to_dict(self) -> dict:
+        """Plain dict view, with inventors and CPC codes as lists."""
+        data = {name: getattr(self, name) for name in _PUBLIC_FIELDS}
+        data["inventors"] = list(self.inventors)
+        data["cpc_codes"] = list(self.cpc_codes)
+        return data
+
+    def get(self, key: str, default=None):
+        """Dict-style read kept for callers written against the old dicts."""
+        if key in _PUBLIC_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key: str):
+        if key not in _PUBLIC_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+_PUBLIC_FIELDS = tuple(f.name for f in fields(Patent) if not f.name.startswith("_"))
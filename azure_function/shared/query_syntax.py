@@ -0,0 +1,37 @@
+"""Keyword query syntax shared by the matchers and the search builders.
+
+search_by_title() queries use the USPTO API's Lucene-style syntax (see
+patent_search.py): bare terms, "quoted phrases", AND / OR / NOT,
+parentheses, field: prefixes and trailing * wildcards. title_matches(),
+the local search index and build_contains_condition() all split queries
+and text the same way through these helpers.
+"""
+import re
+from typing import Optional
+
+# One query token: a quoted phrase, a parenthesis, or a bare term/operator
+QUERY_TOKEN_RE = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def query_tokens(keywords: str) -> list[str]:
+    """Split a keyword query into phrases, parentheses, terms and operators."""
+    return QUERY_TOKEN_RE.findall(keywords)
+
+
+def words(text: Optional[str]) -> list[str]:
+    """Lower-cased word tokens of text (runs of letters and digits)."""
+    return _WORD_RE.findall((text or "").lower())
+
+
+def normalize_token(token: str) -> str:
+    """Crude plural folding so 'locks' matches 'lock' like the API does."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def normalized_words(text: Optional[str]) -> list[str]:
+    """Word tokens of text with plural folding, as queries are matched."""
+    return [normalize_token(word) for word in words(text)]
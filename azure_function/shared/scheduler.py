@@ -0,0 +1,145 @@
+"""Quota-aware scheduling of USPTO work across sources.
+
+The USPTO API quota is the scarcest resource in every sync, so instead of
+walking sources in a fixed order the loaders queue their work items here
+and let the scheduler choose what runs next:
+
+- Each source (a topic, a CPC code, or a coalesced group of them) keeps
+  its items in FIFO order, so windows and watermarks still advance in
+  date order within a source.
+- Across sources, the next item comes from the source with the highest
+  priority x expected yield, where yield is new unique patents per API
+  call (an exponentially weighted average of recent items). Untried
+  sources start at an optimistic prior so every source gets sampled.
+- Sources whose recent items stay below `low_yield` back off
+  geometrically, and a source stops once it reaches its per-run call
+  budget.
+- When the API reports its remaining quota in rate-limit headers, the
+  scheduler stops handing out work once only `quota_reserve` calls are
+  left.
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .patent_search import API_PAGE_SIZE, get_quota_state
+
+
+@dataclass
+class SourceConfig:
+    """Scheduling knobs for one source."""
+
+    priority: float = 1.0
+    call_budget: Optional[int] = None  # Max API calls per run (None = unlimited)
+
+
+@dataclass
+class _SourceStats:
+    calls: int = 0
+    new_patents: int = 0
+    expected_yield: float = float(API_PAGE_SIZE)
+    low_streak: int = 0
+
+
+class YieldScheduler:
+    """Hands out queued work items, highest expected yield first."""
+
+    def __init__(
+        self,
+        configs: Optional[dict[str, SourceConfig]] = None,
+        quota_reserve: int = 0,
+        low_yield: float = 1.0,
+        backoff: float = 0.5,
+        smoothing: float = 0.3,
+        quota_fn: Callable[[], dict] = get_quota_state,
+    ):
+        self.configs = configs or {}
+        self.quota_reserve = quota_reserve
+        self.low_yield = low_yield
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.quota_fn = quota_fn
+        self._queues: dict[str, deque] = {}
+        self._stats: dict[str, _SourceStats] = {}
+
+    def add(self, source: str, item) -> None:
+        """Queue a work item for a source (kept in FIFO order per source)."""
+        self._queues.setdefault(source, deque()).append(item)
+        self._stats.setdefault(source, _SourceStats())
+
+    def pending(self) -> int:
+        """Number of queued items not yet handed out."""
+        return sum(len(q) for q in self._queues.values())
+
+    def quota_exhausted(self) -> bool:
+        """True once the API-reported remaining quota is within the reserve."""
+        remaining = self.quota_fn().get("remaining")
+        return remaining is not None and remaining <= self.quota_reserve
+
+    def next_item(self) -> Optional[tuple]:
+        """Pop the next (source, item) to run, or None if nothing may run.
+
+        Returns None when the queue is empty, every source with work left is
+        over its call budget, or the API quota is down to the reserve.
+        """
+        if self.quota_exhausted():
+            return None
+        best, best_score = None, -1.0
+        for source, queue in self._queues.items():  # Insertion order breaks ties
+            if not queue:
+                continue
+            stats = self._stats[source]
+            config = self.configs.get(source, SourceConfig())
+            if config.call_budget is not None and stats.calls >= config.call_budget:
+                continue
+            score = config.priority * stats.expected_yield * self.backoff ** stats.low_streak
+            if score > best_score:
+                best, best_score = source, score
+        if best is None:
+            return None
+        return best, self._queues[best].popleft()
+
+    def record(self, source: str, calls: int, new_patents: int) -> None:
+        """Feed back what an item cost and yielded.
+
+        Args:
+            source: Source the item came from
+            calls: USPTO API calls the item made (0 for prefetched data)
+            new_patents: New or changed patents it produced
+        """
+        stats = self._stats[source]
+        stats.calls += calls
+        stats.new_patents += new_patents
+        if calls <= 0:
+            return
+        item_yield = new_patents / calls
+        stats.expected_yield = (
+            self.smoothing * item_yield + (1 - self.smoothing) * stats.expected_yield
+        )
+        stats.low_streak = stats.low_streak + 1 if item_yield < self.low_yield else 0
+
+    def summary(self) -> list[dict]:
+        """Per-source calls, new patents, yield and items left, for logging."""
+        return [
+            {
+                "source": source,
+                "calls": stats.calls,
+                "new_patents": stats.new_patents,
+                "yield": round(stats.new_patents / stats.calls, 2) if stats.calls else None,
+                "deferred": len(self._queues[source]),
+            }
+            for source, stats in self._stats.items()
+        ]
+
+
+def group_config(configs: dict[str, SourceConfig], members: list[str]) -> SourceConfig:
+    """Config for a coalesced group: highest member priority, summed budgets.
+
+    The group is unlimited if any member has no call budget.
+    """
+    member_configs = [configs.get(m, SourceConfig()) for m in members]
+    budgets = [c.call_budget for c in member_configs]
+    return SourceConfig(
+        priority=max(c.priority for c in member_configs),
+        call_budget=None if None in budgets else sum(budgets),
+    )
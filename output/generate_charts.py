@@ -1,48 +1,71 @@
 """Generate patent analysis charts from Azure SQL data.
 
-Connects to Azure SQL Database, runs analytical queries, and produces
-matplotlib charts saved to the output/ directory.
+Connects to Azure SQL Database, fetches every aggregate in one batch
+(tools.analytics.fetch_dashboard), and produces matplotlib charts saved to
+the output/ directory.
+
+Rendering is incremental. Each chart's fingerprint (a hash of its input
+rows, its render code and the requested formats) is kept in
+output/.chart_fingerprints.json, and charts whose fingerprint and files are
+unchanged are skipped. The dashboard results themselves come from the
+analytics result cache (tools/result_cache.py) until a load changes
+PATENTS, so a repeat run between loads only reads the version token.
+Charts that do need rendering are drawn in a process pool; each chart is
+rendered once and saved in every requested format, plus an optional small
+thumbnail.
 
 Usage:
     python output/generate_charts.py
+    python output/generate_charts.py --formats png,svg --thumbnails
+    python output/generate_charts.py --force     # re-render everything
+    python output/generate_charts.py --refresh   # re-query, ignoring cached results
+    python output/generate_charts.py --profile   # cProfile + fetch/render breakdown
+
+--profile writes a .prof file and a text report to output/profiles/;
+add --profile-memory to include tracemalloc allocation sites. cProfile sees
+the main process only, so rendering in the process pool shows up as
+render wall-clock time, not in the function tables.
 
 Requires: matplotlib, pyodbc, python-dotenv
 """
 
+import argparse
+import hashlib
+import inspect
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-import pyodbc
 from dotenv import load_dotenv
 
 # Load .env from project root
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
 load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, "output")
+PROFILE_DIR = os.path.join(OUTPUT_DIR, "profiles")
 
+from tools.analytics import fetch_dashboard
+from tools.db_connection import get_connection
+from tools.profiling import Profiler, stage
+from tools.result_cache import ResultCache
+from tools.statements import StatementRegistry
 
-def get_connection() -> pyodbc.Connection:
-    return pyodbc.connect(
-        f"DRIVER={{ODBC Driver 18 for SQL Server}};"
-        f"SERVER={os.environ['AZURE_SQL_SERVER']};"
-        f"DATABASE={os.environ['AZURE_SQL_DATABASE']};"
-        f"UID={os.environ['AZURE_SQL_USER']};"
-        f"PWD={os.environ['AZURE_SQL_PASSWORD']};"
-        "Connection Timeout=120;"
-    )
+# --- Configuration ---
+STATE_FILE = os.path.join(OUTPUT_DIR, ".chart_fingerprints.json")
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "analytics")
+DPI = 150
+THUMBNAIL_DPI = 30  # 12x6in figures -> 360x180 px thumbnails
+MAX_WORKERS = 4
 
 
-def generate_filing_trends(cursor):
-    """Bar chart of patent filing counts by month."""
-    cursor.execute("""
-        SELECT FORMAT(filing_date, 'yyyy-MM') AS filing_month, COUNT(*) AS cnt
-        FROM PATENTS WHERE filing_date IS NOT NULL
-        GROUP BY FORMAT(filing_date, 'yyyy-MM')
-        ORDER BY filing_month
-    """)
-    rows = cursor.fetchall()
+def render_filing_trends(rows: list):
+    """Bar chart of patent filing counts by month (monthly_trend rows)."""
     months = [r[0] for r in rows]
     counts = [r[1] for r in rows]
 
@@ -51,7 +74,7 @@ def generate_filing_trends(cursor):
     ax.set_xlabel("Filing Month", fontsize=12)
     ax.set_ylabel("Patent Count", fontsize=12)
     ax.set_title("AI & Data Patent Filing Trends (2025-2026)", fontsize=14, fontweight="bold")
-    plt.xticks(rotation=45, ha="right")
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
     for bar, count in zip(bars, counts):
         ax.text(
             bar.get_x() + bar.get_width() / 2.0,
@@ -61,22 +84,12 @@ def generate_filing_trends(cursor):
             va="bottom",
             fontsize=9,
         )
-    plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, "filing_trends.png")
-    plt.savefig(path, dpi=150)
-    plt.close()
-    print(f"Saved: {path}")
-
-
-def generate_cpc_breakdown(cursor):
-    """Horizontal bar chart of top 10 CPC technology categories."""
-    cursor.execute("""
-        SELECT TOP 10 LEFT(cpc.value, 4) AS cpc_group, COUNT(*) AS patent_count
-        FROM PATENTS CROSS APPLY OPENJSON(cpc_codes) AS cpc
-        GROUP BY LEFT(cpc.value, 4)
-        ORDER BY patent_count DESC
-    """)
-    rows = cursor.fetchall()
+    fig.tight_layout()
+    return fig
+
+
+def render_cpc_breakdown(rows: list):
+    """Horizontal bar chart of top 10 CPC technology categories (top_cpc rows)."""
     cpc_labels = [r[0] for r in rows]
     cpc_counts = [r[1] for r in rows]
 
@@ -109,20 +122,129 @@ def generate_cpc_breakdown(cursor):
             va="center",
             fontsize=9,
         )
-    plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, "cpc_breakdown.png")
-    plt.savefig(path, dpi=150)
-    plt.close()
-    print(f"Saved: {path}")
+    fig.tight_layout()
+    return fig
 
 
-if __name__ == "__main__":
-    conn = get_connection()
-    cursor = conn.cursor()
+# Output name -> (dashboard result set, render function)
+CHARTS = {
+    "filing_trends": ("monthly_trend", render_filing_trends),
+    "cpc_breakdown": ("top_cpc", render_cpc_breakdown),
+}
+
 
-    generate_filing_trends(cursor)
-    generate_cpc_breakdown(cursor)
+def output_paths(name: str, formats: list[str], thumbnails: bool) -> list[str]:
+    """Files one chart renders to."""
+    paths = [os.path.join(OUTPUT_DIR, f"{name}.{fmt}") for fmt in formats]
+    if thumbnails:
+        paths.append(os.path.join(OUTPUT_DIR, f"{name}_thumb.png"))
+    return paths
 
-    cursor.close()
-    conn.close()
+
+def fingerprint(name: str, rows: list, formats: list[str], thumbnails: bool) -> str:
+    """Hash of everything a chart's files depend on."""
+    render = CHARTS[name][1]
+    payload = json.dumps(
+        [rows, inspect.getsource(render), formats, thumbnails, DPI, THUMBNAIL_DPI],
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_chart(name: str, rows: list, formats: list[str], thumbnails: bool) -> list[str]:
+    """Render one chart once and save it in every format (process pool worker)."""
+    fig = CHARTS[name][1](rows)
+    paths = output_paths(name, formats, thumbnails)
+    for fmt, path in zip(formats, paths):
+        fig.savefig(path, dpi=DPI, format=fmt)
+    if thumbnails:
+        fig.savefig(paths[-1], dpi=THUMBNAIL_DPI, format="png")
+    plt.close(fig)
+    return paths
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: dict) -> None:
+    with open(STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def render_changed(dashboard: dict, state: dict, formats: list[str], thumbnails: bool,
+                   force: bool) -> dict:
+    """Render charts whose fingerprint changed; returns the new fingerprints."""
+    fingerprints, todo = {}, []
+    for name, (result_set, _) in CHARTS.items():
+        rows = [list(row) for row in dashboard[result_set]]
+        fingerprints[name] = fingerprint(name, rows, formats, thumbnails)
+        unchanged = state.get("charts", {}).get(name) == fingerprints[name]
+        if force or not unchanged or not all(
+            os.path.exists(p) for p in output_paths(name, formats, thumbnails)
+        ):
+            todo.append((name, rows))
+        else:
+            print(f"Unchanged: {name}")
+
+    if len(todo) == 1:
+        name, rows = todo[0]
+        for path in render_chart(name, rows, formats, thumbnails):
+            print(f"Saved: {path}")
+    elif todo:
+        with ProcessPoolExecutor(max_workers=min(len(todo), MAX_WORKERS)) as pool:
+            futures = [pool.submit(render_chart, name, rows, formats, thumbnails)
+                       for name, rows in todo]
+            for future in futures:
+                for path in future.result():
+                    print(f"Saved: {path}")
+    return fingerprints
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formats", default="png",
+                        help="comma-separated output formats, e.g. png,svg (default png)")
+    parser.add_argument("--thumbnails", action="store_true",
+                        help=f"also save <chart>_thumb.png at {THUMBNAIL_DPI} dpi")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every chart even if its inputs are unchanged")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-query instead of using cached dashboard results")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"run under cProfile; write .prof and report to {PROFILE_DIR}")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="with --profile, also trace allocations (tracemalloc)")
+    args = parser.parse_args()
+    formats = [fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip()]
+
+    profiler = nullcontext()
+    if args.profile:
+        profiler = Profiler("generate_charts", PROFILE_DIR, trace_memory=args.profile_memory)
+
+    with profiler:
+        state = load_state()
+        conn = get_connection()
+        statements = StatementRegistry(conn)
+        cache = ResultCache(CACHE_DIR)
+        if args.refresh:
+            cache.invalidate()
+        # Every aggregate in one round trip and one PATENTS scan, or from the
+        # result cache (one version lookup) if no load has run since
+        with stage("fetch"):
+            dashboard = fetch_dashboard(statements, top_n=10, cache=cache)
+        statements.close()
+        conn.close()
+
+        with stage("render"):
+            fingerprints = render_changed(dashboard, state, formats, args.thumbnails, args.force)
+        save_state({"charts": fingerprints})
     print("Done.")
+
+
+if __name__ == "__main__":
+    main()
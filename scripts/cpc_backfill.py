@@ -3,19 +3,59 @@
 Collects AI & data patents by examiner-assigned CPC codes using the
 USPTO ODP API. Uses monthly windows with pagination for thorough coverage.
 
+Progress is kept per CPC code in SYNC_WATERMARKS (source "CPC:<code>"), so a
+re-run only fetches each code's delta: filings after its filing-date mark
+and late publications after its publication-date mark. A code added to
+CPC_CODES backfills from DATE_FROM on its own.
+
+To spread a large crawl over several machines or containers, enqueue the
+(code group, month, page range) work items into BACKFILL_TASKS once, then
+start any number of workers. Workers lease tasks, upsert, and mark them done
+in one transaction; tasks held by a crashed worker, or whose API requests
+failed, are re-leased once their lease expires (up to MAX_TASK_ATTEMPTS
+times). Queue mode does not move the watermarks.
+
+ELT mode (--elt) fetches each window's pages concurrently without parsing
+them in Python, lands them compressed in RAW_USPTO_PAGES and loads PATENTS
+with one set-based OPENJSON transform per window instead of per-patent
+MERGEs. After fixing the transform, --retransform
+rebuilds PATENTS from the stored pages without any API calls.
+
+On a monthly-partitioned PATENTS table (build_create_table_sql(
+partition_by_month=True)), --reload-month re-crawls one filing month,
+bulk-inserts it into PATENTS_STAGE and swaps it in with a partition
+TRUNCATE + INSERT instead of a MERGE per row. The swap drops rows the
+re-crawl did not find, so the reload aborts before touching the database
+if any page request fails or a code group has more matches than the page
+cap fetches.
+
 Usage:
-    python scripts/cpc_backfill.py
+    python scripts/cpc_backfill.py           # incremental, per-code watermarks
+    python scripts/cpc_backfill.py --full    # ignore watermarks, crawl DATE_FROM..DATE_TO
+    python scripts/cpc_backfill.py --enqueue # queue DATE_FROM..DATE_TO as BACKFILL_TASKS
+    python scripts/cpc_backfill.py --worker  # process queued tasks until drained
+    python scripts/cpc_backfill.py --elt     # incremental, landing raw pages (ELT)
+    python scripts/cpc_backfill.py --retransform  # re-run the transform, no API calls
+    python scripts/cpc_backfill.py --reload-month 2025-03  # partition-scoped reload
+    python scripts/cpc_backfill.py --profile # any mode, under cProfile
+
+Set INSTRUMENTATION=log (or jsonl:<path>) for per-request and per-batch timings.
+Watermark-driven runs also record their totals in SYNC_RUN_METRICS.
+--profile (plus --profile-memory for tracemalloc) runs under cProfile and
+writes a .prof file and a report with a fetch/parse/dedup/write/commit
+wall-clock breakdown to output/profiles/. cProfile sees the main thread
+only; page fetches in worker threads count toward fetch wall-clock time.
 
 Requires: pyodbc, python-dotenv
 """
 
-import json
+import argparse
 import os
+import socket
 import sys
 import time
 from datetime import date, timedelta
 
-import pyodbc
 from dotenv import load_dotenv
 
 # Add project root to path for tools/ imports
@@ -23,8 +63,41 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
 
-from tools.patent_search import search_by_cpc
-from tools.azure_sql_queries import build_upsert_query
+from tools.patent_record import Patent
+from tools.patent_search import (
+    attribute_patents,
+    build_coalesced_cpc_query,
+    clear_response_cache,
+    cpc_matches,
+    fetch_all_pages,
+    fetch_page,
+    get_quota_state,
+    plan_coalesced_queries,
+    set_raw_page_sink,
+)
+from tools.azure_sql_queries import (
+    build_claim_backfill_task_query,
+    build_complete_backfill_task_query,
+    build_enqueue_backfill_task_query,
+    build_heartbeat_backfill_task_query,
+    build_reload_month_sql,
+    build_requeue_expired_tasks_query,
+    build_stage_insert_query,
+    build_sync_log_insert_query,
+    build_sync_log_update_query,
+    build_upsert_query,
+    build_upsert_watermark_query,
+    get_backfill_progress_query,
+    get_patent_count_query,
+    get_watermarks_query,
+)
+from tools.db_connection import get_connection
+from tools.instrumentation import configure_from_env, timer
+from tools.profiling import Profiler, stage
+from tools.known_patents import KnownPatentIndex
+from tools.raw_pages import RawPageBuffer, land_and_transform, transform_raw_pages
+from tools.run_metrics import RunMetrics
+from tools.scheduler import SourceConfig, YieldScheduler, group_config
 
 # --- Configuration ---
 DATE_FROM = "2025-01-01"
@@ -33,6 +106,28 @@ MAX_PAGES_PER_WINDOW = 20  # 20 pages x 25 results = 500 max per window
 API_PAGE_SIZE = 25  # empirical max per page
 SLEEP_BETWEEN_CALLS = 0.5  # seconds
 CATEGORY = "cpc_collection"
+MAX_CODES_PER_QUERY = 5  # CPC prefixes OR'd into one coalesced query
+# Must match how PATENTS was created (build_create_table_sql(compress_abstract=...))
+COMPRESS_ABSTRACT = os.environ.get("PATENTS_COMPRESS_ABSTRACT", "").lower() in ("1", "true")
+
+# Quota-aware scheduling: per-code priority weights and per-run API call
+# budgets (omit a code for no budget). Remaining quota goes to the codes
+# currently yielding the most new patents per call; low-yield codes back off.
+CPC_SCHEDULE = {
+    "G06N": SourceConfig(priority=3.0),
+    "G06Q": SourceConfig(priority=2.0),
+    "G06V": SourceConfig(priority=1.5),
+    "G10L": SourceConfig(priority=1.0),
+    "G16H": SourceConfig(priority=1.0),
+}
+QUOTA_RESERVE = 50  # API calls of the reported quota to leave unused
+
+# Distributed (queue) mode
+PAGES_PER_TASK = 4  # pages per BACKFILL_TASKS work item
+LEASE_SECONDS = 300  # a task is re-leased if its worker is silent this long
+MAX_TASK_ATTEMPTS = 5  # after this many leases a task is marked failed
+
+PROFILE_DIR = os.path.join(PROJECT_ROOT, "output", "profiles")  # --profile output
 
 # CPC codes ordered by AI-specificity (highest priority first).
 # G06F sub-codes omitted — Lucene can't reliably query them due to
@@ -71,124 +166,517 @@ def generate_monthly_windows(start_date: str, end_date: str) -> list[tuple[str,
     return windows
 
 
-def get_connection() -> pyodbc.Connection:
-    """Connect to Azure SQL Database."""
-    return pyodbc.connect(
-        f"DRIVER={{ODBC Driver 18 for SQL Server}};"
-        f"SERVER={os.environ['AZURE_SQL_SERVER']};"
-        f"DATABASE={os.environ['AZURE_SQL_DATABASE']};"
-        f"UID={os.environ['AZURE_SQL_USER']};"
-        f"PWD={os.environ['AZURE_SQL_PASSWORD']};"
-        "Connection Timeout=120;"
-    )
+class FetchFailed(Exception):
+    """Raised when a USPTO page request fails (as opposed to an empty page)."""
 
 
-def collect_cpc_window(cpc_code: str, month_start: str, month_end: str) -> list[dict]:
-    """Collect all patents for one CPC code in one month window."""
-    all_results = []
-    seen_ids = set()
+def max_window_pages(cpc_codes: list[str]) -> int:
+    """Page cap of one window; a merged query covers several codes, so it scales."""
+    return MAX_PAGES_PER_WINDOW * len(cpc_codes)
 
-    for page in range(MAX_PAGES_PER_WINDOW):
-        offset = page * API_PAGE_SIZE
-        try:
-            results = search_by_cpc(
-                cpc_code,
-                limit=100,
-                filing_date_from=month_start,
-                filing_date_to=month_end,
-                start=offset,
-            )
-        except Exception as e:
-            print(f"    API error page {page}: {e}")
-            break
 
-        if not results:
-            break
+def collect_cpc_window(
+    cpc_codes: list[str],
+    month_start: str,
+    month_end: str,
+    by_publication: bool = False,
+    page_from: int = 0,
+    page_to: int = None,
+    on_page=None,
+) -> tuple[dict[str, list[Patent]], int]:
+    """Collect all patents for a group of CPC codes in one date window.
 
-        for patent in results:
-            pid = patent.get("patent_number", "")
-            if pid and pid not in seen_ids:
-                seen_ids.add(pid)
-                all_results.append(patent)
+    The codes are OR'd into one query and each patent is attributed back to
+    the codes it carries, so cross-classified patents cost one fetch. The
+    window applies to the filing date, or to the publication date when
+    by_publication is set. page_from/page_to (exclusive) restrict the crawl
+    to a page range, and on_page() is called after each page (heartbeats).
 
-        if len(results) < API_PAGE_SIZE:
+    Returns:
+        Tuple of (dict mapping each code to its patents, total match count
+        reported by the API); more matches than max_window_pages() covers
+        means the window was truncated
+
+    Raises:
+        FetchFailed: A page request failed, so the window is incomplete
+    """
+    by_code = {code: [] for code in cpc_codes}
+    seen_ids = set()
+    max_pages = max_window_pages(cpc_codes)
+    if page_to is not None:
+        max_pages = min(max_pages, page_to)
+    if by_publication:
+        query = build_coalesced_cpc_query(cpc_codes, publication_date_from=month_start,
+                                          publication_date_to=month_end)
+    else:
+        query = build_coalesced_cpc_query(cpc_codes, month_start, month_end)
+
+    total = 0
+    for page in range(page_from, max_pages):
+        patents, total = fetch_page(query, start=page * API_PAGE_SIZE)
+        if total is None:
+            raise FetchFailed(f"CPC:{'/'.join(cpc_codes)} {month_start}..{month_end} page {page}")
+
+        results = attribute_patents(patents, cpc_codes, lambda p, c: cpc_matches(p.cpc_codes, c))
+        for code, patents in results.items():
+            for patent in patents:
+                pid = patent.patent_number
+                if pid and (code, pid) not in seen_ids:
+                    seen_ids.add((code, pid))
+                    by_code[code].append(patent)
+
+        if on_page is not None:
+            on_page()
+        if (page + 1) * API_PAGE_SIZE >= total:
             break  # Last page
 
         time.sleep(SLEEP_BETWEEN_CALLS)
 
-    return all_results
+    return by_code, total
+
+
+def fetch_raw_cpc_window(
+    cpc_codes: list[str],
+    window_from: str,
+    window_to: str,
+    by_publication: bool = False,
+) -> tuple[int, int]:
+    """Fetch every page of a window for ELT mode, without parsing them.
+
+    The pages only reach the raw page sink (see tools/raw_pages.py); the
+    OPENJSON transform projects them and attributes each patent to its
+    CPC code in SQL.
+
+    Returns:
+        Tuple of (patents fetched, total match count reported by the API)
+
+    Raises:
+        FetchFailed: A page request failed, so the window is incomplete
+    """
+    if by_publication:
+        query = build_coalesced_cpc_query(cpc_codes, publication_date_from=window_from,
+                                          publication_date_to=window_to)
+    else:
+        query = build_coalesced_cpc_query(cpc_codes, window_from, window_to)
+    paged = fetch_all_pages(query, max_pages=max_window_pages(cpc_codes), parse=False)
+    if paged.failed:
+        raise FetchFailed(f"CPC:{'/'.join(cpc_codes)} {window_from}..{window_to}")
+    return min(paged.total_count, paged.pages * API_PAGE_SIZE), paged.total_count
+
+
+def load_patents(
+    cursor,
+    merge_sql: str,
+    by_code: dict[str, list[Patent]],
+    known: KnownPatentIndex,
+    cpc_counts: dict[str, int],
+) -> tuple[int, int]:
+    """MERGE a window's patents, skipping ones already stored unchanged.
+
+    Each patent is loaded once, tagged with its highest-priority code.
+
+    Returns:
+        Tuple of (patents merged, patents skipped)
+    """
+    loaded = skipped = 0
+    pending, queued = [], set()
+    with stage("dedup"):
+        for cpc_code, patents in by_code.items():
+            for p in patents:
+                if not p.patent_number:
+                    continue
+                cpc_counts[cpc_code] = cpc_counts.get(cpc_code, 0) + 1
+                if p.patent_number in queued or known.is_unchanged(p):
+                    skipped += 1
+                    continue
+                queued.add(p.patent_number)
+                pending.append((cpc_code, p))
+
+    with stage("write"), timer("db.upsert_batch", source="/".join(by_code)) as batch:
+        for cpc_code, p in pending:
+            try:
+                cursor.execute(merge_sql, p.to_db_params(f"CPC:{cpc_code}", CATEGORY))
+                known.add(p)
+                loaded += 1
+            except Exception as e:
+                print(f"    MERGE error {p.patent_number}: {e}")
+        batch.set(items=loaded, skipped=skipped)
+    return loaded, skipped
+
+
+def load_watermarks(cursor, full: bool) -> dict[str, list[str]]:
+    """[filing mark, publication mark] per CPC code; a mark is where the next delta starts."""
+    cursor.execute(get_watermarks_query())
+    stored = {r.source: r for r in cursor.fetchall()}
+    marks = {}
+    for code in CPC_CODES:
+        row = stored.get(f"CPC:{code}")
+        if row is None or full:
+            # New code (or forced re-crawl): the filing crawl covers everything
+            # published so far, so publications are tracked from today
+            marks[code] = [DATE_FROM, DATE_TO]
+        else:
+            marks[code] = [
+                str(row.filing_date_hwm or DATE_FROM),
+                str(row.publication_date_hwm or DATE_TO),
+            ]
+    return marks
+
+
+def plan_windows(marks: dict[str, list[str]]) -> list[tuple]:
+    """Plan (kind, codes, window_from, window_to) items from the watermarks.
+
+    Codes sharing a watermark are coalesced into one query per window.
+    Filing and publication deltas alike are split into monthly windows, so
+    no window's mark moves past more matches than the page cap fetches.
+    """
+    work = []
+    for kind, mark_index in (("filing", 0), ("publication", 1)):
+        by_mark = {}
+        for code in CPC_CODES:
+            by_mark.setdefault(marks[code][mark_index], []).append(code)
+        for mark, codes in sorted(by_mark.items()):
+            for group in plan_coalesced_queries(codes, MAX_CODES_PER_QUERY):
+                # Month windows start on the 1st; never re-crawl before the mark
+                work.extend((kind, group, max(w_from, mark), w_to)
+                            for w_from, w_to in generate_monthly_windows(mark, DATE_TO))
+    return work
+
+
+def reload_month(month: str) -> None:
+    """Re-crawl one filing month (YYYY-MM) and swap it into partitioned PATENTS."""
+    month_start = date.fromisoformat(f"{month}-01")
+    month_end = date(month_start.year + month_start.month // 12,
+                     month_start.month % 12 + 1, 1) - timedelta(days=1)
+
+    # The swap tombstones every cpc_collection row the crawl does not find,
+    # so a crawl that failed or hit the page cap must not reach it
+    rows, seen = [], set()
+    for group in plan_coalesced_queries(list(CPC_CODES), MAX_CODES_PER_QUERY):
+        try:
+            by_code, total = collect_cpc_window(group, month_start.isoformat(),
+                                                month_end.isoformat())
+        except FetchFailed as e:
+            sys.exit(f"Reload of {month} aborted, nothing changed: USPTO request failed ({e})")
+        collected = len({p.patent_number for patents in by_code.values() for p in patents})
+        if total > max_window_pages(group) * API_PAGE_SIZE:
+            sys.exit(f"Reload of {month} aborted, nothing changed: CPC:{'/'.join(group)} "
+                     f"has {total} matches, more than the {max_window_pages(group)}-page "
+                     f"cap fetches ({collected} collected)")
+        for code, patents in by_code.items():
+            for p in patents:
+                if p.patent_number not in seen:
+                    seen.add(p.patent_number)
+                    rows.append(p.to_db_params(f"CPC:{code}", CATEGORY))
 
+    conn = get_connection()
+    cursor = conn.cursor()
+    if rows:
+        cursor.fast_executemany = True
+        cursor.executemany(build_stage_insert_query(), rows)
+    cursor.execute(build_reload_month_sql(COMPRESS_ABSTRACT), (month_start.isoformat(),))
+    loaded = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"Reloaded {month}: {loaded} patents (partition truncate + bulk insert)")
 
-def main():
+
+class LeaseLost(Exception):
+    """Raised when another worker has taken over an expired task lease."""
+
+
+def enqueue_tasks() -> None:
+    """Queue one task per (code group, monthly window) for DATE_FROM..DATE_TO.
+
+    Each task initially covers the first PAGES_PER_TASK pages; the worker
+    that runs it enqueues the window's remaining page ranges once the total
+    match count is known.
+    """
     conn = get_connection()
     cursor = conn.cursor()
-    merge_sql = build_upsert_query()
-    windows = generate_monthly_windows(DATE_FROM, DATE_TO)
+    enqueue_sql = build_enqueue_backfill_task_query()
+    count = 0
+    for group in plan_coalesced_queries(list(CPC_CODES), MAX_CODES_PER_QUERY):
+        source = "CPC:" + ",".join(group)
+        for month_start, month_end in generate_monthly_windows(DATE_FROM, DATE_TO):
+            cursor.execute(enqueue_sql, (source, month_start, month_end, 0, PAGES_PER_TASK))
+            count += 1
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"Enqueued {count} window tasks ({DATE_FROM} to {DATE_TO})")
 
-    print(f"CPC Backfill: {len(windows)} monthly windows x {len(CPC_CODES)} codes")
-    print(f"Date range: {DATE_FROM} to {DATE_TO}\n")
 
-    grand_total = 0
-    global_seen = set()  # Dedup across all CPC codes
+def run_worker(worker_id: str) -> None:
+    """Lease and process BACKFILL_TASKS until the queue is drained."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    merge_sql = build_upsert_query(COMPRESS_ABSTRACT)
+    enqueue_sql = build_enqueue_backfill_task_query()
     cpc_counts = {}
+    total_loaded = total_skipped = tasks_done = 0
+    print(f"Worker {worker_id} started")
+
+    while True:
+        cursor.execute(build_claim_backfill_task_query(),
+                       (worker_id, LEASE_SECONDS, MAX_TASK_ATTEMPTS))
+        task = cursor.fetchone()
+        conn.commit()
+
+        if task is None:
+            cursor.execute(build_requeue_expired_tasks_query(), (MAX_TASK_ATTEMPTS,))
+            requeued = cursor.rowcount
+            conn.commit()
+            if requeued > 0:
+                continue
+            cursor.execute(get_backfill_progress_query())
+            statuses = {r.status for r in cursor.fetchall()}
+            if "leased" in statuses:
+                # Other workers still busy; their leases may yet expire
+                time.sleep(LEASE_SECONDS / 4)
+                continue
+            break
 
-    for cpc_code, description in CPC_CODES.items():
-        cpc_total = 0
-        print(f"{'='*60}")
-        print(f"CPC {cpc_code}: {description}")
-        print(f"{'='*60}")
+        codes = task.source.removeprefix("CPC:").split(",")
+        window_from, window_to = str(task.window_from), str(task.window_to)
+        # Workers run for hours; cache pages within a task only
+        clear_response_cache()
+
+        # The first task of a window fans the rest of its pages out to the
+        # queue. Its page 0 request is cached, so the crawl below reuses it.
+        if task.page_from == 0:
+            query = build_coalesced_cpc_query(codes, window_from, window_to)
+            _, total = fetch_page(query)
+            if total is None:
+                print(f"  Task {task.task_id}: API error, left for a retry after its lease")
+                continue
+            total_pages = min(-(-total // API_PAGE_SIZE), max_window_pages(codes))
+            for page_from in range(task.page_to, total_pages, PAGES_PER_TASK):
+                page_to = min(page_from + PAGES_PER_TASK, total_pages)
+                cursor.execute(enqueue_sql,
+                               (task.source, window_from, window_to, page_from, page_to))
+            conn.commit()
 
-        for month_start, month_end in windows:
-            patents = collect_cpc_window(cpc_code, month_start, month_end)
+        def heartbeat():
+            cursor.execute(build_heartbeat_backfill_task_query(),
+                           (LEASE_SECONDS, task.task_id, worker_id))
+            lost = cursor.rowcount == 0
+            conn.commit()
+            if lost:
+                raise LeaseLost(task.task_id)
 
-            loaded = 0
-            for p in patents:
-                pid = p.get("patent_number", "")
-                if not pid:
-                    continue
+        try:
+            with stage("fetch"):
+                by_code, _ = collect_cpc_window(codes, window_from, window_to,
+                                                page_from=task.page_from, page_to=task.page_to,
+                                                on_page=heartbeat)
+        except LeaseLost:
+            print(f"  Task {task.task_id}: lease lost, abandoning")
+            continue
+        except FetchFailed as e:
+            # Not completed: the lease expires and the task is claimed again,
+            # until MAX_TASK_ATTEMPTS marks it failed
+            print(f"  Task {task.task_id}: API error ({e}), left for a retry after its lease")
+            continue
+
+        known = KnownPatentIndex.from_db(cursor, window_from, window_to)
+        loaded, skipped = load_patents(cursor, merge_sql, by_code, known, cpc_counts)
+
+        # Data and completion commit together, or not at all
+        cursor.execute(build_complete_backfill_task_query(), (loaded, task.task_id, worker_id))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            print(f"  Task {task.task_id}: lease lost before commit, rolled back")
+            continue
+        with stage("commit"):
+            conn.commit()
 
-                global_seen.add(pid)
-
-                params = (
-                    pid,
-                    p.get("title", ""),
-                    p.get("abstract", ""),
-                    p.get("assignee", ""),
-                    json.dumps(p.get("inventors", [])),
-                    p.get("filing_date") or None,
-                    p.get("grant_date") or None,
-                    json.dumps(p.get("cpc_codes", [])),
-                    f"CPC:{cpc_code}",
-                    CATEGORY,
-                )
-                try:
-                    cursor.execute(merge_sql, params)
-                    loaded += 1
-                except Exception as e:
-                    print(f"    MERGE error {pid}: {e}")
+        tasks_done += 1
+        total_loaded += loaded
+        total_skipped += skipped
+        print(f"  Task {task.task_id} {task.source} {window_from[:7]} "
+              f"pages {task.page_from}-{task.page_to - 1}: {loaded} patents")
+
+    cursor.close()
+    conn.close()
+    print(f"Worker {worker_id} done: {tasks_done} tasks, {total_loaded} MERGEs, "
+          f"{total_skipped} skipped unchanged")
 
-            conn.commit()
-            cpc_total += loaded
-            if loaded > 0:
-                print(f"  {month_start[:7]}: {loaded} patents")
 
-        grand_total += cpc_total
-        cpc_counts[cpc_code] = cpc_total
-        print(f"  Subtotal: {cpc_total}\n")
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--full", action="store_true",
+                      help="ignore watermarks and crawl DATE_FROM..DATE_TO")
+    mode.add_argument("--enqueue", action="store_true",
+                      help="queue DATE_FROM..DATE_TO as BACKFILL_TASKS work items")
+    mode.add_argument("--worker", action="store_true",
+                      help="process queued BACKFILL_TASKS until drained")
+    mode.add_argument("--retransform", action="store_true",
+                      help="re-run the OPENJSON transform over all RAW_USPTO_PAGES")
+    mode.add_argument("--reload-month", metavar="YYYY-MM",
+                      help="re-crawl one filing month and swap its partition")
+    parser.add_argument("--elt", action="store_true",
+                        help="land raw pages and transform in SQL instead of MERGE per patent")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}",
+                        help="lease owner name (default: host:pid)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"run under cProfile; write .prof and report to {PROFILE_DIR}")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="with --profile, also trace allocations (tracemalloc)")
+    args = parser.parse_args()
+    configure_from_env()
+
+    if args.profile:
+        with Profiler("cpc_backfill", PROFILE_DIR, trace_memory=args.profile_memory):
+            run(args)
+    else:
+        run(args)
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run the mode selected on the command line."""
+    if args.enqueue:
+        enqueue_tasks()
+        return
+    if args.worker:
+        run_worker(args.worker_id)
+        return
+    if args.reload_month:
+        reload_month(args.reload_month)
+        return
+    if args.retransform:
+        conn = get_connection()
+        cursor = conn.cursor()
+        merged = transform_raw_pages(cursor, reprocess=True, compress_abstract=COMPRESS_ABSTRACT)
+        conn.commit()
+        cursor.close()
+        conn.close()
+        print(f"Re-transformed RAW_USPTO_PAGES: {merged} patents inserted or updated")
+        return
+    with RunMetrics("cpc_backfill_elt" if args.elt else "cpc_backfill") as metrics:
+        run_incremental(args, metrics)
+
+
+def run_incremental(args: argparse.Namespace, metrics: RunMetrics) -> None:
+    """Crawl each code's delta from its watermarks (--full: DATE_FROM..DATE_TO)."""
+    raw_pages = None
+    if args.elt:
+        raw_pages = RawPageBuffer()
+        set_raw_page_sink(raw_pages)
+
+    conn = get_connection()
+    cursor = metrics.track(conn.cursor())
+    metrics.begin(cursor)
+    merge_sql = build_upsert_query(COMPRESS_ABSTRACT)
+    watermark_sql = build_upsert_watermark_query()
+    marks = load_watermarks(cursor, args.full)
+    work = plan_windows(marks)
+    range_from = min(filing for filing, _ in marks.values())
+
+    print(f"CPC Backfill: {len(work)} coalesced window queries over {len(CPC_CODES)} codes")
+    print(f"Date range: {range_from} to {DATE_TO}\n")
+    for code, (filing_mark, publication_mark) in marks.items():
+        print(f"  CPC:{code}: filed from {filing_mark}, published from {publication_mark}")
+    print()
+
+    # Patents already stored unchanged (or loaded earlier this run under
+    # another CPC code) are skipped before any MERGE is sent
+    known = KnownPatentIndex.from_db(cursor, range_from, DATE_TO)
+    print(f"Known patents in range: {len(known)}\n")
+
+    # Each coalesced code group is one scheduler source; its windows stay in
+    # date order so watermarks only ever advance
+    scheduler = YieldScheduler(quota_reserve=QUOTA_RESERVE)
+    for item in work:
+        source = "/".join(item[1])
+        scheduler.configs[source] = group_config(CPC_SCHEDULE, item[1])
+        scheduler.add(source, item)
+
+    grand_total = 0
+    skipped = 0
+    fetched = 0  # ELT mode: patents fetched (not parsed, so not counted per code)
+    fetch_failed = False
+    cpc_counts = {code: 0 for code in CPC_CODES}
+
+    while (picked := scheduler.next_item()) is not None:
+        source, (kind, group, window_from, window_to) = picked
+        calls_before = get_quota_state()["calls"]
+        try:
+            with stage("fetch"):
+                if raw_pages is not None:
+                    window_fetched, total = fetch_raw_cpc_window(
+                        group, window_from, window_to, by_publication=(kind == "publication")
+                    )
+                else:
+                    by_code, total = collect_cpc_window(
+                        group, window_from, window_to, by_publication=(kind == "publication")
+                    )
+        except FetchFailed as e:
+            # Its marks stay put, so the next run fetches the window again;
+            # pages already buffered for it are not landed
+            if raw_pages is not None:
+                raw_pages.discard()
+            fetch_failed = True
+            print(f"  API error ({e}); stopping, {scheduler.pending()} more window(s) left")
+            break
+        if total > max_window_pages(group) * API_PAGE_SIZE:
+            print(f"  Warning: {source} {window_from}..{window_to} has {total} matches; "
+                  f"only the first {max_window_pages(group)} pages were fetched")
+
+        if raw_pages is not None:
+            fetched += window_fetched
+            with stage("write"), timer("db.elt_transform", source=source) as batch:
+                loaded = land_and_transform(cursor, raw_pages, f"CPC:{source}", CATEGORY,
+                                            COMPRESS_ABSTRACT)
+                batch.set(items=loaded)
+        else:
+            loaded, window_skipped = load_patents(cursor, merge_sql, by_code, known, cpc_counts)
+            skipped += window_skipped
+        scheduler.record(source, get_quota_state()["calls"] - calls_before, loaded)
+
+        # Advance the group's watermarks in the same transaction as its data
+        next_mark = window_to
+        if window_to < DATE_TO:
+            next_mark = (date.fromisoformat(window_to) + timedelta(days=1)).isoformat()
+        for cpc_code in group:
+            marks[cpc_code][0 if kind == "filing" else 1] = next_mark
+            cursor.execute(watermark_sql, (f"CPC:{cpc_code}", *marks[cpc_code]))
+        with stage("commit"):
+            conn.commit()
 
-    # Log to SYNC_LOG
+        grand_total += loaded
+        if loaded > 0:
+            label = window_from[:7] if kind == "filing" else f"published {window_from[:7]}"
+            print(f"  {'/'.join(group)} {label}: {loaded} patents")
+
+    # Work left over (budget or quota exhausted, or an API failure) resumes
+    # from the watermarks
+    deferred = scheduler.pending()
+    for row in scheduler.summary():
+        print(f"  {row['source']}: {row['calls']} calls, {row['new_patents']} new "
+              f"(yield {row['yield']}/call), {row['deferred']} windows deferred")
+    if deferred:
+        print(f"  Quota: {get_quota_state()}")
+
+    # Log to SYNC_LOG and SYNC_RUN_METRICS
+    status = "failed" if fetch_failed else "partial" if deferred else "completed"
     cursor.execute(
-        "INSERT INTO SYNC_LOG (filing_date_from, filing_date_to, "
-        "patents_loaded, search_topics, sync_status) "
-        "VALUES (?, ?, ?, ?, ?)",
-        (DATE_FROM, DATE_TO, grand_total,
-         ", ".join(f"CPC:{c}" for c in CPC_CODES), "completed"),
+        build_sync_log_insert_query(),
+        (range_from, DATE_TO, ", ".join(f"CPC:{c}" for c in CPC_CODES)),
     )
+    sync_id = cursor.fetchone()[0]
+    cursor.execute(build_sync_log_update_query(), (grand_total, status, sync_id))
+    # ELT mode sends every fetched patent to the transform
+    sent = grand_total if raw_pages is None else fetched
+    run = metrics.finish(cursor, sync_id, status, CATEGORY,
+                         rows_sent=sent, rows_skipped=skipped)
     conn.commit()
 
     # Final summary
-    cursor.execute("SELECT COUNT(*) FROM PATENTS")
-    total_in_db = cursor.fetchone()[0]
+    cursor.execute(*get_patent_count_query())
+    total_in_db = cursor.fetchone().total_patents
 
     cursor.close()
     conn.close()
@@ -196,11 +684,19 @@ def main():
     print(f"{'='*60}")
     print(f"CPC Collection Complete")
     print(f"{'='*60}")
-    print(f"  Unique patents seen: {len(global_seen)}")
     print(f"  Total MERGE operations: {grand_total}")
-    for code, count in cpc_counts.items():
-        print(f"    CPC:{code}: {count}")
+    print(f"  Skipped (already stored, unchanged): {skipped}")
+    if raw_pages is None:
+        for code, count in cpc_counts.items():
+            print(f"    CPC:{code}: {count}")
+    else:
+        print(f"  Fetched for the SQL transform: {fetched}")
     print(f"  Total patents in DB: {total_in_db}")
+    print(f"  Run: {run['duration_seconds']:.0f}s, {run['api_calls']} API calls "
+          f"({run['bytes_downloaded'] / 1e6:.1f} MB, {run['api_retries']} retries), "
+          f"{run['db_round_trips']} DB round trips, peak {run['peak_memory_mb']} MB")
+    print(f"  Rows: {run['rows_inserted']} inserted, {run['rows_updated']} updated, "
+          f"{run['rows_unchanged']} unchanged")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+"""Enrich stored patents with abstracts, grant dates and status codes.
+
+The search API returns neither abstracts nor (for most rows) grant dates,
+so loaded patents start out thin. This stage picks PATENTS rows that are
+missing either field and were never enriched, plus enriched rows whose
+status code has changed since (e.g. a pending application that granted),
+and fills them in from the per-application USPTO ODP endpoints.
+
+Each batch:
+  1. Resolves publication numbers to application numbers (get_patents,
+     25 per request; remembered in PATENT_ENRICHMENT for next time)
+  2. Fetches application details and abstracts concurrently under the
+     shared rate limiter (get_application_details)
+  3. Writes PATENTS and PATENT_ENRICHMENT with fast_executemany and commits
+
+Progress lives in PATENT_ENRICHMENT, so the stage is idempotent and can be
+stopped and re-run at any point; only unfinished rows are picked up again.
+Patents the API could not be reached for are left for the next run.
+
+Usage:
+    python scripts/enrich_patents.py              # enrich everything pending
+    python scripts/enrich_patents.py --limit 500  # stop after 500 patents
+
+Set INSTRUMENTATION=log (or jsonl:<path>) for per-request and per-batch timings.
+
+Requires: pyodbc, python-dotenv
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Add project root to path for tools/ imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+
+from tools.patent_search import get_application_details, get_patents, get_quota_state
+from tools.azure_sql_queries import (
+    build_enrichment_update_query,
+    build_upsert_enrichment_query,
+    get_enrichment_candidates_query,
+)
+from tools.db_connection import get_connection
+from tools.instrumentation import configure_from_env, timer
+from tools.statements import StatementRegistry
+
+# --- Configuration ---
+BATCH_SIZE = 100  # patents per fetch + commit
+MAX_WORKERS = 4  # concurrent application lookups (rate limiter still applies)
+QUOTA_RESERVE = 50  # API calls of the reported quota to leave unused
+# Must match how PATENTS was created (build_create_table_sql(compress_abstract=...))
+COMPRESS_ABSTRACT = os.environ.get("PATENTS_COMPRESS_ABSTRACT", "").lower() in ("1", "true")
+
+
+def resolve_application_numbers(candidates: list) -> dict[str, str]:
+    """Map each candidate patent_number to its application number.
+
+    Uses the number remembered from an earlier enrichment, the patent
+    number itself when it already is an application number, and a batched
+    get_patents() lookup for the remaining publication numbers.
+    """
+    resolved, lookup = {}, []
+    for patent_number, _, application_number in candidates:
+        digits = re.sub(r"[/,\s]", "", patent_number)
+        if application_number:
+            resolved[patent_number] = application_number
+        elif digits.isdigit():
+            resolved[patent_number] = digits
+        else:
+            lookup.append(patent_number)
+    for patent_number, patent in get_patents(lookup, max_workers=MAX_WORKERS).items():
+        if patent.application_number:
+            resolved[patent_number] = patent.application_number
+    return resolved
+
+
+def enrich_batch(cursor, candidates: list) -> tuple[int, int]:
+    """Fetch details for one batch and stage the writes (caller commits).
+
+    Returns:
+        Tuple of (patents enriched, patents left for a later run)
+    """
+    app_numbers = resolve_application_numbers(candidates)
+    details = get_application_details(app_numbers.values(), max_workers=MAX_WORKERS)
+
+    updates, marks = [], []
+    for patent_number, stored_status, _ in candidates:
+        app_number = app_numbers.get(patent_number)
+        found = details.get(app_number) if app_number else None
+        if found is None:
+            continue  # Unresolved, or any of its requests failed: retried next run
+        status = found["status_code"] if found["status_code"] is not None else stored_status
+        updates.append((found["abstract"], found["grant_date"], status, patent_number))
+        marks.append((patent_number, app_number, status,
+                      bool(found["abstract"]), bool(found["grant_date"])))
+
+    if updates:
+        with timer("db.upsert_batch", source="enrichment") as batch:
+            cursor.fast_executemany = True
+            cursor.executemany(build_enrichment_update_query(COMPRESS_ABSTRACT), updates)
+            cursor.executemany(build_upsert_enrichment_query(), marks)
+            batch.set(items=len(updates))
+    return len(updates), len(candidates) - len(updates)
+
+
+def quota_low() -> bool:
+    """True once the API-reported remaining quota is within the reserve."""
+    remaining = get_quota_state().get("remaining")
+    return remaining is not None and remaining <= QUOTA_RESERVE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=None,
+                        help="stop after this many candidate patents")
+    args = parser.parse_args()
+    configure_from_env()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    # Own cursor for the candidate query, so it stays prepared between batches
+    statements = StatementRegistry(conn)
+    candidates_sql = get_enrichment_candidates_query()
+
+    enriched = 0
+    deferred = 0
+    after = ""  # Keyset cursor: last patent_number handled this run
+    started = time.monotonic()
+
+    print("Patent enrichment: abstracts, grant dates, status codes\n")
+    while args.limit is None or enriched + deferred < args.limit:
+        if quota_low():
+            print(f"  Quota reserve reached: {get_quota_state()}")
+            break
+        size = BATCH_SIZE if args.limit is None else min(BATCH_SIZE, args.limit - enriched - deferred)
+        rows = statements.execute("enrichment_candidates", candidates_sql, (size, after)).fetchall()
+        candidates = [tuple(row) for row in rows]
+        if not candidates:
+            break
+
+        batch_enriched, batch_deferred = enrich_batch(cursor, candidates)
+        conn.commit()
+        enriched += batch_enriched
+        deferred += batch_deferred
+        after = candidates[-1][0]
+
+        minutes = max((time.monotonic() - started) / 60, 1e-9)
+        print(f"  ..{after}: {enriched} enriched, {deferred} deferred "
+              f"({enriched / minutes:.0f} rows/min)")
+
+    statements.close()
+    cursor.close()
+    conn.close()
+
+    minutes = max((time.monotonic() - started) / 60, 1e-9)
+    print(f"\n{'='*60}")
+    print(f"Enrichment Complete")
+    print(f"{'='*60}")
+    print(f"  Enriched: {enriched} ({enriched / minutes:.0f} rows/min)")
+    print(f"  Deferred to next run: {deferred}")
+    print(f"  USPTO calls: {get_quota_state()['calls']}")
+
+
+if __name__ == "__main__":
+    main()
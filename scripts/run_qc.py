@@ -0,0 +1,108 @@
+"""Run the pipeline QC checks in two round trips and print the results.
+
+Covers sql/08_qc_queries.sql without pasting it into the Query Editor:
+the dashboard aggregates (totals, date range, unique assignees, monthly
+trend, category mix, top CPC groups, top inventors) come from one batch
+that scans PATENTS once, and the data-quality checks (search topics,
+empty and duplicate patent numbers, SYNC_LOG history, sample rows) from a
+second. Each batch's result sets are read with cursor.nextset().
+
+Results are cached under .cache/analytics/ until PATENTS or SYNC_LOG
+changes (see tools/result_cache.py), so re-running between loads costs one
+version lookup per batch; --refresh bypasses the cache.
+
+With --stats it also lists the statements tagged by StatementRegistry
+(dashboard, enrichment candidates, ...) by plan-cache cost, from
+sys.dm_exec_query_stats (needs VIEW DATABASE STATE).
+
+Usage:
+    python scripts/run_qc.py            # top 10 CPC groups / inventors
+    python scripts/run_qc.py --top 25 --category cpc_collection --from 2025-06-01
+    python scripts/run_qc.py --stats    # also show the most expensive statements
+    python scripts/run_qc.py --refresh  # ignore cached results
+
+Requires: pyodbc, python-dotenv
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Add project root to path for tools/ imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+
+from tools.azure_sql_queries import DASHBOARD_RESULT_SETS, get_dashboard_query, get_qc_checks_query
+from tools.db_connection import get_connection
+from tools.result_cache import ResultCache
+from tools.statements import StatementRegistry
+
+# --- Configuration ---
+QC_CHECKS = ("patents_by_search_topic", "empty_patent_numbers (expect 0)",
+             "duplicate_patent_numbers (expect none)", "sync_log", "sample_patents")
+MAX_CELL_WIDTH = 60
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "analytics")
+
+
+def print_result_set(title: str, columns: list[str], rows: list) -> None:
+    """Print one result set as a plain-text table."""
+    cells = [[_cell(value) for value in row] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    print(f"\n-- {title} ({len(rows)} rows)")
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def _cell(value) -> str:
+    text = "NULL" if value is None else str(value)
+    return text if len(text) <= MAX_CELL_WIDTH else text[: MAX_CELL_WIDTH - 3] + "..."
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of top CPC groups and inventors (default 10)")
+    parser.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD",
+                        help="dashboard: earliest filing date")
+    parser.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD",
+                        help="dashboard: latest filing date")
+    parser.add_argument("--category", help="dashboard: only this load category")
+    parser.add_argument("--stats", action="store_true",
+                        help="list tagged statements by plan-cache cost")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-run the queries instead of using cached results")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    statements = StatementRegistry(conn)
+    cache = ResultCache(CACHE_DIR)
+    if args.refresh:
+        cache.invalidate()
+
+    print("Patent Intelligence QC")
+    batches = (
+        ("dashboard", get_dashboard_query(args.top, args.date_from, args.date_to, args.category),
+         DASHBOARD_RESULT_SETS),
+        ("qc_checks", get_qc_checks_query(), QC_CHECKS),
+    )
+    for name, (sql, params), titles in batches:
+        for title, (columns, rows) in zip(titles, cache.fetch(statements, name, sql, params)):
+            print_result_set(title, columns, rows)
+    print(f"\n(result cache: {cache.hits} hit(s), {cache.misses} miss(es))")
+
+    if args.stats:
+        rows = statements.stats()
+        columns = [column[0] for column in rows[0].cursor_description] if rows else ["statement_name"]
+        print_result_set("statement plan-cache stats", columns, rows)
+
+    statements.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
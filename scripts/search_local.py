@@ -0,0 +1,84 @@
+"""Search PATENTS titles and abstracts offline from a local index.
+
+The index (tools/local_search.py) lives in .cache/search_index.pickle.
+--sync brings it up to date from the PATENTS change feed: the first run
+reads every row, later runs only the rows inserted, updated or deleted
+since the last sync, so running it after each load keeps it current.
+Queries never touch the database.
+
+Query syntax is the search_by_title() syntax: bare terms (OR'd), "quoted
+phrases", AND / OR / NOT, parentheses and trailing * wildcards.
+
+Usage:
+    python scripts/search_local.py --sync                 # build or update the index
+    python scripts/search_local.py '"neural network" AND training'
+    python scripts/search_local.py 'lidar OR radar' --cpc G01S --from 2025-01-01 --top 50
+    python scripts/search_local.py --sync 'battery*'      # update, then search
+
+Requires: numpy, python-dotenv (plus pyodbc for --sync)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Add project root to path for tools/ imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+
+from tools.local_search import LocalSearchIndex
+
+# --- Configuration ---
+INDEX_PATH = os.path.join(PROJECT_ROOT, ".cache", "search_index.pickle")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("query", nargs="?", help="keyword query (search_by_title syntax)")
+    parser.add_argument("--sync", action="store_true",
+                        help="apply PATENTS changes since the last sync before searching")
+    parser.add_argument("--cpc", help="only patents with a CPC code starting with this prefix")
+    parser.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD",
+                        help="earliest filing date")
+    parser.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD",
+                        help="latest filing date")
+    parser.add_argument("--top", type=int, default=20, help="number of hits (default 20)")
+    parser.add_argument("--scoring", choices=("bm25", "tfidf"), default="bm25")
+    parser.add_argument("--index", default=INDEX_PATH, help=f"index file (default {INDEX_PATH})")
+    args = parser.parse_args()
+    if not (args.sync or args.query):
+        parser.error("give a query, --sync, or both")
+
+    index = LocalSearchIndex.load(args.index) if os.path.exists(args.index) else LocalSearchIndex()
+
+    if args.sync:
+        from tools.db_connection import get_connection  # pyodbc, only needed to sync
+
+        start = time.time()
+        conn = get_connection()
+        cursor = conn.cursor()
+        applied = index.sync(cursor)
+        cursor.close()
+        conn.close()
+        index.save(args.index)
+        print(f"Synced {applied} change(s) in {time.time() - start:.1f}s; "
+              f"{len(index)} patents indexed (token {index.token})")
+
+    if args.query:
+        if not len(index):
+            sys.exit(f"Index {args.index} is empty; run with --sync first")
+        start = time.time()
+        hits = index.search(args.query, limit=args.top, cpc=args.cpc,
+                            filing_date_from=args.date_from, filing_date_to=args.date_to,
+                            scoring=args.scoring)
+        print(f"{len(hits)} hit(s) in {(time.time() - start) * 1000:.0f} ms")
+        for hit in hits:
+            print(f"{hit.score:7.2f}  {hit.patent_number:<14} {hit.filing_date or '':<10}  {hit.title}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Copy the tools/ modules the Azure Function uses into azure_function/shared/.
+
+The Function app deploys azure_function/ on its own, so the tools/ modules
+it imports live there as byte-for-byte copies. Every change to one of
+those modules must reach both trees; run this after editing them, and
+--check before deploying (or in CI) to catch a copy that was missed.
+
+The mirrored modules are the ones already present in azure_function/shared/
+(shared/__init__.py is its own file and never copied). To mirror a new
+module, copy it there once; from then on it is kept in sync.
+
+Usage:
+    python scripts/sync_shared.py          # copy changed modules
+    python scripts/sync_shared.py --check  # list out-of-date copies, exit 1 if any
+
+Requires: nothing beyond the standard library
+"""
+
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- Configuration ---
+TOOLS_DIR = os.path.join(PROJECT_ROOT, "tools")
+SHARED_DIR = os.path.join(PROJECT_ROOT, "azure_function", "shared")
+
+
+def mirrored_modules() -> list[str]:
+    """File names of the tools/ modules copied into azure_function/shared/."""
+    return sorted(
+        name for name in os.listdir(SHARED_DIR)
+        if name.endswith(".py") and name != "__init__.py"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true",
+                        help="only report copies that differ from tools/; exit 1 if any")
+    args = parser.parse_args()
+
+    stale = []
+    for name in mirrored_modules():
+        source = os.path.join(TOOLS_DIR, name)
+        if not os.path.exists(source):
+            sys.exit(f"azure_function/shared/{name} has no tools/{name} to mirror")
+        if not filecmp.cmp(source, os.path.join(SHARED_DIR, name), shallow=False):
+            stale.append(name)
+
+    if args.check:
+        for name in stale:
+            print(f"Out of date: azure_function/shared/{name}")
+        if stale:
+            sys.exit(f"{len(stale)} shared module(s) differ from tools/; "
+                     f"run python scripts/sync_shared.py")
+        print(f"All {len(mirrored_modules())} shared modules match tools/")
+        return
+
+    for name in stale:
+        shutil.copyfile(os.path.join(TOOLS_DIR, name), os.path.join(SHARED_DIR, name))
+        print(f"Copied: tools/{name} -> azure_function/shared/{name}")
+    if not stale:
+        print("Shared modules already up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,15 +9,29 @@ CREATE TABLE PATENTS (
     filing_date DATE,
     grant_date DATE,
     cpc_codes NVARCHAR(MAX),       -- JSON array stored as string
+    status_code INT,               -- USPTO applicationStatusCode
     search_query NVARCHAR(200),
     category NVARCHAR(100),
+    row_hash BIGINT,               -- Patent.row_hash content fingerprint
+    row_version ROWVERSION,        -- Change feed position (get_changes_since)
     created_at DATETIME2 DEFAULT GETDATE(),
     updated_at DATETIME2 DEFAULT GETDATE()
 );
 
+-- Add columns to tables created before they existed
+IF COL_LENGTH('PATENTS', 'row_hash') IS NULL
+    ALTER TABLE PATENTS ADD row_hash BIGINT;
+IF COL_LENGTH('PATENTS', 'status_code') IS NULL
+    ALTER TABLE PATENTS ADD status_code INT;
+IF COL_LENGTH('PATENTS', 'row_version') IS NULL
+    ALTER TABLE PATENTS ADD row_version ROWVERSION;
+
 -- Indexes for common query patterns
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENTS_ASSIGNEE')
     CREATE INDEX IX_PATENTS_ASSIGNEE ON PATENTS (assignee);
 
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENTS_FILING_DATE')
     CREATE INDEX IX_PATENTS_FILING_DATE ON PATENTS (filing_date);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENTS_ROW_VERSION')
+    CREATE INDEX IX_PATENTS_ROW_VERSION ON PATENTS (row_version);
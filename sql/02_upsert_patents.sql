@@ -9,27 +9,33 @@ USING (SELECT
     ? AS filing_date,
     ? AS grant_date,
     ? AS cpc_codes,
+    ? AS status_code,
     ? AS search_query,
-    ? AS category
+    ? AS category,
+    ? AS row_hash
 ) AS source
 ON target.patent_number = source.patent_number
-WHEN MATCHED THEN UPDATE SET
+WHEN MATCHED AND (target.row_hash IS NULL OR target.row_hash <> source.row_hash)
+THEN UPDATE SET
     title = source.title,
-    abstract = source.abstract,
+    abstract = COALESCE(NULLIF(source.abstract, ''), target.abstract),
     assignee = source.assignee,
     inventors = source.inventors,
     filing_date = source.filing_date,
-    grant_date = source.grant_date,
+    grant_date = COALESCE(source.grant_date, target.grant_date),
     cpc_codes = source.cpc_codes,
+    status_code = source.status_code,
     search_query = source.search_query,
     category = source.category,
+    row_hash = source.row_hash,
     updated_at = GETDATE()
 WHEN NOT MATCHED THEN INSERT (
     patent_number, title, abstract, assignee, inventors,
-    filing_date, grant_date, cpc_codes, search_query, category,
-    created_at, updated_at
+    filing_date, grant_date, cpc_codes, status_code, search_query, category,
+    row_hash, created_at, updated_at
 ) VALUES (
     source.patent_number, source.title, source.abstract, source.assignee,
     source.inventors, source.filing_date, source.grant_date, source.cpc_codes,
-    source.search_query, source.category, GETDATE(), GETDATE()
+    source.status_code, source.search_query, source.category, source.row_hash,
+    GETDATE(), GETDATE()
 );
@@ -1,5 +1,6 @@
 -- QC Verification Queries for Patent Intelligence Pipeline
 -- Run these in Azure Portal > SQL Query Editor to validate pipeline output
+-- (or run python scripts/run_qc.py: the same checks in two batched round trips)
 
 -- QC 1: Total patents, date range, assignee count
 SELECT COUNT(*) AS total_patents,
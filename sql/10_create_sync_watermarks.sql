@@ -0,0 +1,8 @@
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'SYNC_WATERMARKS')
+CREATE TABLE SYNC_WATERMARKS (
+    source NVARCHAR(200) NOT NULL PRIMARY KEY,  -- Topic text or 'CPC:<code>'
+    filing_date_hwm DATE,
+    publication_date_hwm DATE,
+    updated_at DATETIME2 DEFAULT GETDATE()
+);
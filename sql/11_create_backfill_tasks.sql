@@ -0,0 +1,23 @@
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'BACKFILL_TASKS')
+CREATE TABLE BACKFILL_TASKS (
+    task_id INT IDENTITY(1,1) PRIMARY KEY,
+    source NVARCHAR(200) NOT NULL,      -- e.g. 'CPC:G06N,G06Q' (coalesced codes)
+    window_from DATE NOT NULL,
+    window_to DATE NOT NULL,
+    page_from INT NOT NULL,
+    page_to INT NOT NULL,               -- exclusive
+    status NVARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending/leased/done/failed
+    lease_owner NVARCHAR(100),
+    lease_expires_at DATETIME2,
+    heartbeat_at DATETIME2,
+    attempts INT NOT NULL DEFAULT 0,
+    patents_loaded INT,
+    created_at DATETIME2 DEFAULT GETDATE(),
+    completed_at DATETIME2,
+    CONSTRAINT UQ_BACKFILL_TASKS UNIQUE (source, window_from, window_to, page_from)
+);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_BACKFILL_TASKS_STATUS')
+    CREATE INDEX IX_BACKFILL_TASKS_STATUS
+    ON BACKFILL_TASKS (status, lease_expires_at) INCLUDE (attempts);
@@ -0,0 +1,10 @@
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'PATENT_ENRICHMENT')
+CREATE TABLE PATENT_ENRICHMENT (
+    patent_number NVARCHAR(50) NOT NULL PRIMARY KEY,
+    application_number NVARCHAR(20),
+    status_code INT,               -- PATENTS.status_code when enriched
+    has_abstract BIT,
+    has_grant_date BIT,
+    enriched_at DATETIME2 DEFAULT GETDATE()
+);
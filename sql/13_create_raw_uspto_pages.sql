@@ -0,0 +1,16 @@
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'RAW_USPTO_PAGES')
+CREATE TABLE RAW_USPTO_PAGES (
+    page_id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    source NVARCHAR(200) NOT NULL,     -- e.g. 'CPC:G06N/G06Q'
+    category NVARCHAR(100) NOT NULL,
+    query NVARCHAR(MAX) NOT NULL,      -- Lucene query that produced the page
+    start_offset INT NOT NULL,
+    payload VARBINARY(MAX) NOT NULL,   -- COMPRESS(response JSON)
+    fetched_at DATETIME2 DEFAULT GETDATE(),
+    transformed_at DATETIME2 NULL
+);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_RAW_USPTO_PAGES_PENDING')
+    CREATE INDEX IX_RAW_USPTO_PAGES_PENDING ON RAW_USPTO_PAGES (page_id)
+    WHERE transformed_at IS NULL;
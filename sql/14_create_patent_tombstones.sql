@@ -0,0 +1,18 @@
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'PATENT_TOMBSTONES')
+CREATE TABLE PATENT_TOMBSTONES (
+    tombstone_id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    patent_number NVARCHAR(50) NOT NULL,
+    deleted_version ROWVERSION,
+    deleted_at DATETIME2 DEFAULT GETDATE()
+);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENT_TOMBSTONES_VERSION')
+    CREATE INDEX IX_PATENT_TOMBSTONES_VERSION ON PATENT_TOMBSTONES (deleted_version);
+
+-- CREATE TRIGGER must start its own batch, hence EXEC
+IF NOT EXISTS (SELECT * FROM sys.triggers WHERE name = 'TR_PATENTS_TOMBSTONE')
+    EXEC('CREATE TRIGGER TR_PATENTS_TOMBSTONE ON PATENTS AFTER DELETE AS
+        SET NOCOUNT ON;
+        INSERT INTO PATENT_TOMBSTONES (patent_number)
+        SELECT patent_number FROM deleted;');
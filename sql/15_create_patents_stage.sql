@@ -0,0 +1,21 @@
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'PATENTS_STAGE')
+CREATE TABLE PATENTS_STAGE (
+    stage_id BIGINT IDENTITY(1,1),
+    patent_number NVARCHAR(50) NOT NULL,
+    title NVARCHAR(500),
+    abstract NVARCHAR(MAX),
+    assignee NVARCHAR(300),
+    inventors NVARCHAR(MAX),
+    filing_date DATE,
+    grant_date DATE,
+    cpc_codes NVARCHAR(MAX),
+    status_code INT,
+    search_query NVARCHAR(200),
+    category NVARCHAR(100),
+    row_hash BIGINT,
+    stage_month AS ISNULL(
+        DATEFROMPARTS(YEAR(filing_date), MONTH(filing_date), 1),
+        CONVERT(DATE, '19000101', 112)
+    ) PERSISTED
+);
@@ -0,0 +1,21 @@
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'SYNC_RUN_METRICS')
+CREATE TABLE SYNC_RUN_METRICS (
+    run_id INT IDENTITY(1,1) PRIMARY KEY,
+    run_type NVARCHAR(50) NOT NULL,    -- 'daily_sync', 'cpc_backfill', ...
+    sync_id INT NULL,                  -- SYNC_LOG row of the run, if any
+    started_at DATETIME2 NOT NULL,
+    duration_seconds FLOAT NOT NULL,
+    api_calls INT,
+    bytes_downloaded BIGINT,
+    api_retries INT,
+    db_round_trips INT,
+    rows_inserted INT,
+    rows_updated INT,
+    rows_unchanged INT,
+    peak_memory_mb FLOAT,
+    run_status NVARCHAR(20)
+);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_SYNC_RUN_METRICS_TYPE')
+    CREATE INDEX IX_SYNC_RUN_METRICS_TYPE ON SYNC_RUN_METRICS (run_type, run_id);
@@ -0,0 +1,85 @@
+-- QC Queries for Run Performance (SYNC_RUN_METRICS)
+-- Run these in Azure Portal > SQL Query Editor after a sync or backfill.
+-- A run is flagged when it is @threshold times worse than the median of
+-- the previous @window runs of the same run_type.
+
+DECLARE @threshold FLOAT = 1.5;
+DECLARE @window INT = 10;
+
+-- QC 1: Most recent runs
+SELECT TOP 20
+    run_id, run_type, sync_id, started_at, run_status,
+    duration_seconds, api_calls, api_retries,
+    CAST(bytes_downloaded / 1048576.0 AS DECIMAL(10, 1)) AS mb_downloaded,
+    db_round_trips, rows_inserted, rows_updated, rows_unchanged, peak_memory_mb
+FROM SYNC_RUN_METRICS
+ORDER BY run_id DESC;
+
+-- QC 2: Runs slower than the trailing median duration
+SELECT r.run_id, r.run_type, r.started_at, r.duration_seconds,
+    prev.median_seconds,
+    CAST(r.duration_seconds / prev.median_seconds AS DECIMAL(6, 2)) AS slowdown
+FROM SYNC_RUN_METRICS r
+CROSS APPLY (
+    SELECT DISTINCT PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY p.duration_seconds)
+        OVER () AS median_seconds
+    FROM (
+        SELECT TOP (@window) duration_seconds
+        FROM SYNC_RUN_METRICS
+        WHERE run_type = r.run_type AND run_id < r.run_id
+        ORDER BY run_id DESC
+    ) p
+) prev
+WHERE prev.median_seconds > 0
+    AND r.duration_seconds > @threshold * prev.median_seconds
+ORDER BY r.run_id DESC;
+
+-- QC 3: Throughput regressions (seconds per API call vs trailing median)
+-- Unlike QC 2, a run that was slow only because it did more work is not flagged
+SELECT r.run_id, r.run_type, r.started_at, r.api_calls,
+    CAST(r.duration_seconds / r.api_calls AS DECIMAL(8, 3)) AS seconds_per_call,
+    CAST(prev.median_per_call AS DECIMAL(8, 3)) AS median_per_call
+FROM SYNC_RUN_METRICS r
+CROSS APPLY (
+    SELECT DISTINCT PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY p.per_call)
+        OVER () AS median_per_call
+    FROM (
+        SELECT TOP (@window) duration_seconds / api_calls AS per_call
+        FROM SYNC_RUN_METRICS
+        WHERE run_type = r.run_type AND run_id < r.run_id AND api_calls > 0
+        ORDER BY run_id DESC
+    ) p
+) prev
+WHERE r.api_calls > 0 AND prev.median_per_call > 0
+    AND r.duration_seconds / r.api_calls > @threshold * prev.median_per_call
+ORDER BY r.run_id DESC;
+
+-- QC 4: Peak memory regressions
+SELECT r.run_id, r.run_type, r.started_at, r.peak_memory_mb, prev.median_mb
+FROM SYNC_RUN_METRICS r
+CROSS APPLY (
+    SELECT DISTINCT PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY p.peak_memory_mb)
+        OVER () AS median_mb
+    FROM (
+        SELECT TOP (@window) peak_memory_mb
+        FROM SYNC_RUN_METRICS
+        WHERE run_type = r.run_type AND run_id < r.run_id AND peak_memory_mb IS NOT NULL
+        ORDER BY run_id DESC
+    ) p
+) prev
+WHERE prev.median_mb > 0
+    AND r.peak_memory_mb > @threshold * prev.median_mb
+ORDER BY r.run_id DESC;
+
+-- QC 5: Retry and round-trip trend by run type (last 30 days)
+SELECT run_type, COUNT(*) AS runs,
+    AVG(duration_seconds) AS avg_seconds,
+    SUM(api_retries) AS total_retries,
+    AVG(db_round_trips) AS avg_round_trips,
+    SUM(rows_inserted) AS inserted,
+    SUM(rows_updated) AS updated,
+    SUM(rows_unchanged) AS unchanged
+FROM SYNC_RUN_METRICS
+WHERE started_at >= DATEADD(day, -30, GETDATE())
+GROUP BY run_type
+ORDER BY run_type;
@@ -0,0 +1,12 @@
+
+-- Full-text search (get_contains_search_query / get_freetext_search_query)
+IF NOT EXISTS (SELECT * FROM sys.fulltext_catalogs WHERE name = 'FTC_PATENTS')
+    CREATE FULLTEXT CATALOG FTC_PATENTS;
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'UX_PATENTS_FULLTEXT_KEY')
+    CREATE UNIQUE INDEX UX_PATENTS_FULLTEXT_KEY ON PATENTS (patent_number);
+
+IF NOT EXISTS (SELECT * FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('PATENTS'))
+    CREATE FULLTEXT INDEX ON PATENTS (title LANGUAGE 1033, abstract LANGUAGE 1033)
+    KEY INDEX UX_PATENTS_FULLTEXT_KEY ON FTC_PATENTS
+    WITH (CHANGE_TRACKING = AUTO, STOPLIST = SYSTEM);
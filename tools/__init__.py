@@ -2,24 +2,112 @@
 
 This module exports the public API for patent search, Azure SQL query builders,
 and analysis workflow functions.
+
+Modules with optional dependencies are not re-exported, so importing the
+package needs neither: import tools.db_connection (pyodbc) and
+tools.local_search (numpy) directly.
 """
 
+from tools.patent_record import Patent
+
 from tools.patent_search import (
     search_by_assignee,
     search_by_title,
+    search_by_titles,
+    search_by_cpcs,
+    search_all_by_titles,
+    fetch_all_pages,
+    fetch_page,
+    plan_coalesced_queries,
     get_patent,
+    get_patents,
+    get_application_details,
+    get_quota_state,
+    clear_response_cache,
+    set_raw_page_sink,
 )
 
 from tools.azure_sql_queries import (
     build_create_table_sql,
     build_upsert_query,
+    build_create_fulltext_index_sql,
     get_trends_query,
     get_top_inventors_query,
     get_cpc_breakdown_query,
+    get_contains_search_query,
+    get_freetext_search_query,
+    build_contains_condition,
+    get_dashboard_query,
+    get_qc_checks_query,
+    get_statement_stats_query,
+    DASHBOARD_RESULT_SETS,
     build_create_sync_log_sql,
     get_last_sync_date_query,
+    get_known_patents_query,
+    build_sync_log_insert_query,
+    build_sync_log_update_query,
+    build_create_watermarks_sql,
+    get_watermarks_query,
+    build_upsert_watermark_query,
+    build_create_backfill_tasks_sql,
+    build_enqueue_backfill_task_query,
+    build_claim_backfill_task_query,
+    build_heartbeat_backfill_task_query,
+    build_complete_backfill_task_query,
+    build_requeue_expired_tasks_query,
+    get_backfill_progress_query,
+    build_create_enrichment_sql,
+    get_enrichment_candidates_query,
+    build_enrichment_update_query,
+    build_upsert_enrichment_query,
+    build_create_raw_pages_sql,
+    build_insert_raw_page_query,
+    build_transform_raw_pages_sql,
+    build_create_tombstones_sql,
+    get_changes_since,
+    next_change_token,
+    get_data_version_query,
+    build_split_partition_sql,
+    build_drop_partitions_before_sql,
+    build_create_stage_sql,
+    build_stage_insert_query,
+    build_reload_month_sql,
+    build_set_compression_sql,
+    get_size_report_query,
+    build_create_run_metrics_sql,
+    build_insert_run_metrics_query,
+    get_run_row_changes_query,
+    CHANGE_FEED_START,
+)
+
+from tools.known_patents import KnownPatentIndex
+
+from tools.instrumentation import (
+    configure_from_env,
+    add_sink,
+    clear_sinks,
+    remove_sink,
+    timer,
+    count,
+    LogSink,
+    JsonLinesSink,
+    AppInsightsSink,
 )
 
+from tools.raw_pages import RawPageBuffer, land_and_transform, transform_raw_pages
+
+from tools.run_metrics import RunMetrics
+
+from tools.profiling import Profiler, stage
+
+from tools.statements import StatementRegistry
+
+from tools.analytics import fetch_dashboard, read_result_sets
+
+from tools.result_cache import ResultCache
+
+from tools.scheduler import SourceConfig, YieldScheduler
+
 # AI & Data processing CPC codes (most relevant technology areas)
 AI_DATA_CPC_CODES = {
     "G06N": "AI/ML computing — neural networks, machine learning",
@@ -31,18 +119,104 @@ AI_DATA_CPC_CODES = {
 }
 
 __all__ = [
+    # Patent record
+    "Patent",
     # Patent search functions
     "search_by_assignee",
     "search_by_title",
+    "search_by_titles",
+    "search_by_cpcs",
+    "search_all_by_titles",
+    "fetch_all_pages",
+    "fetch_page",
+    "plan_coalesced_queries",
     "get_patent",
+    "get_patents",
+    "get_application_details",
+    "get_quota_state",
+    "clear_response_cache",
+    "set_raw_page_sink",
     # Azure SQL query builders
     "build_create_table_sql",
     "build_upsert_query",
+    "build_create_fulltext_index_sql",
     "get_trends_query",
     "get_top_inventors_query",
     "get_cpc_breakdown_query",
+    "get_contains_search_query",
+    "get_freetext_search_query",
+    "build_contains_condition",
+    "get_dashboard_query",
+    "get_qc_checks_query",
+    "get_statement_stats_query",
+    "DASHBOARD_RESULT_SETS",
     "build_create_sync_log_sql",
     "get_last_sync_date_query",
+    "get_known_patents_query",
+    "build_sync_log_insert_query",
+    "build_sync_log_update_query",
+    "build_create_watermarks_sql",
+    "get_watermarks_query",
+    "build_upsert_watermark_query",
+    "build_create_backfill_tasks_sql",
+    "build_enqueue_backfill_task_query",
+    "build_claim_backfill_task_query",
+    "build_heartbeat_backfill_task_query",
+    "build_complete_backfill_task_query",
+    "build_requeue_expired_tasks_query",
+    "get_backfill_progress_query",
+    "build_create_enrichment_sql",
+    "get_enrichment_candidates_query",
+    "build_enrichment_update_query",
+    "build_upsert_enrichment_query",
+    "build_create_raw_pages_sql",
+    "build_insert_raw_page_query",
+    "build_transform_raw_pages_sql",
+    "build_create_tombstones_sql",
+    "get_changes_since",
+    "next_change_token",
+    "get_data_version_query",
+    "build_split_partition_sql",
+    "build_drop_partitions_before_sql",
+    "build_create_stage_sql",
+    "build_stage_insert_query",
+    "build_reload_month_sql",
+    "build_set_compression_sql",
+    "get_size_report_query",
+    "build_create_run_metrics_sql",
+    "build_insert_run_metrics_query",
+    "get_run_row_changes_query",
+    "CHANGE_FEED_START",
+    # Known-patent index
+    "KnownPatentIndex",
+    # Instrumentation
+    "configure_from_env",
+    "add_sink",
+    "clear_sinks",
+    "remove_sink",
+    "timer",
+    "count",
+    "LogSink",
+    "JsonLinesSink",
+    "AppInsightsSink",
+    # ELT raw page landing
+    "RawPageBuffer",
+    "land_and_transform",
+    "transform_raw_pages",
+    # Per-run metrics
+    "RunMetrics",
+    # Profiling
+    "Profiler",
+    "stage",
+    # Prepared statements
+    "StatementRegistry",
+    # Dashboard analytics
+    "fetch_dashboard",
+    "read_result_sets",
+    "ResultCache",
+    # Quota-aware scheduler
+    "SourceConfig",
+    "YieldScheduler",
     # Constants
     "AI_DATA_CPC_CODES",
 ]
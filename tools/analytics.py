@@ -0,0 +1,71 @@
+"""Dashboard aggregates fetched in one round trip.
+
+get_dashboard_query() returns every dashboard aggregate as a separate
+result set of one batch; fetch_dashboard() runs it as a registered
+statement and walks the result sets with cursor.nextset(). Used by
+output/generate_charts.py and scripts/run_qc.py.
+
+Pass a ResultCache to serve repeat loads without touching PATENTS.
+
+Usage:
+    statements = StatementRegistry(conn)
+    dashboard = fetch_dashboard(statements, category="cpc_collection",
+                                cache=ResultCache(cache_dir))
+    dashboard["summary"][0].total_patents
+    for row in dashboard["monthly_trend"]:
+        print(row.filing_month, row.patent_count)
+"""
+from typing import Optional
+
+from .azure_sql_queries import DASHBOARD_RESULT_SETS, get_dashboard_query
+from .statements import StatementRegistry
+
+
+def read_result_sets(cursor) -> list[tuple[list[str], list]]:
+    """Fetch every result set of the last executed batch.
+
+    Returns:
+        List of (column names, rows), one per result set, in batch order
+    """
+    result_sets = []
+    while True:
+        if cursor.description is not None:
+            columns = [column[0] for column in cursor.description]
+            result_sets.append((columns, cursor.fetchall()))
+        if not cursor.nextset():
+            return result_sets
+
+
+def fetch_dashboard(
+    statements: StatementRegistry,
+    top_n: int = 10,
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+    cache=None,
+) -> dict[str, list]:
+    """Run the dashboard batch and return its rows by aggregate name.
+
+    Args:
+        statements: Registry of the connection to query
+        top_n: Number of top CPC groups and inventors
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
+        cache: Optional ResultCache; while the data version token is
+            unchanged the results come from it without scanning PATENTS
+
+    Returns:
+        Dict mapping each DASHBOARD_RESULT_SETS name to its rows
+    """
+    sql, params = get_dashboard_query(top_n, filing_date_from, filing_date_to, category)
+    if cache is not None:
+        result_sets = cache.fetch(statements, "dashboard", sql, params)
+    else:
+        result_sets = read_result_sets(statements.execute("dashboard", sql, params))
+    if len(result_sets) != len(DASHBOARD_RESULT_SETS):
+        raise RuntimeError(
+            f"Dashboard batch returned {len(result_sets)} result sets, "
+            f"expected {len(DASHBOARD_RESULT_SETS)}"
+        )
+    return {name: rows for name, (_, rows) in zip(DASHBOARD_RESULT_SETS, result_sets)}
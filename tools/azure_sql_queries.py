@@ -4,6 +4,7 @@ This module provides functions to generate T-SQL queries for:
 - Creating the PATENTS table with proper indexes
 - Upserting patent records using MERGE
 - Analyzing filing trends, inventors, and CPC codes
+- Ranked full-text search (CONTAINSTABLE / FREETEXTTABLE)
 - JSON handling via OPENJSON and CROSS APPLY
 
 Key T-SQL adaptations from Snowflake:
@@ -15,50 +16,239 @@ Key T-SQL adaptations from Snowflake:
     TIMESTAMP             -> DATETIME2
 """
 import json
+from datetime import date
+from typing import Optional
 
+from .query_syntax import query_tokens, words
 
-def build_create_table_sql() -> str:
+
+# Monthly partitioning of PATENTS (build_create_table_sql(partition_by_month=True))
+PARTITION_FUNCTION = "PF_PATENTS_FILING_MONTH"
+PARTITION_SCHEME = "PS_PATENTS_FILING_MONTH"
+
+# Full-text search over title and abstract (build_create_table_sql(full_text=True))
+FULLTEXT_CATALOG = "FTC_PATENTS"
+FULLTEXT_KEY_INDEX = "UX_PATENTS_FULLTEXT_KEY"
+
+
+def build_create_table_sql(
+    partition_by_month: bool = False,
+    partition_from: str = "2020-01-01",
+    partition_to: Optional[str] = None,
+    data_compression: Optional[str] = None,
+    compress_abstract: bool = False,
+    full_text: bool = False,
+) -> str:
     """Generate T-SQL CREATE TABLE statement for PATENTS table.
 
+    With partition_by_month the table is created on a monthly RANGE RIGHT
+    partition scheme over a persisted filing_month column (the 1st of the
+    filing month, 1900-01-01 when unknown), clustered on (filing_month,
+    patent_number), and every index is partition-aligned so single months
+    can be truncated and reloaded (see build_reload_month_sql()). Aligned
+    indexes cannot enforce patent_number uniqueness on its own; the MERGE
+    keeps it unique. An existing unpartitioned table is left as is.
+
+    data_compression applies ROW or PAGE compression to the table and its
+    indexes (use build_set_compression_sql() for an existing table). It
+    does not reach off-row NVARCHAR(MAX) values, so compress_abstract
+    additionally stores the abstract GZip-compressed in abstract_gz, with
+    abstract kept as a computed DECOMPRESS() column: reads are unchanged,
+    and writers pass compress_abstract=True to their builders. An existing
+    table's abstracts are converted in place.
+
+    full_text adds a full-text catalog and index on title and abstract for
+    the ranked search builders (get_contains_search_query(),
+    get_freetext_search_query()); see build_create_fulltext_index_sql().
+
+    Args:
+        partition_by_month: Create PATENTS on a monthly partition scheme
+        partition_from: First partition boundary (YYYY-MM-DD, a month start)
+        partition_to: Last boundary (default: the month after the current one);
+            add later months with build_split_partition_sql()
+        data_compression: None, "ROW" or "PAGE"
+        compress_abstract: Store abstracts through COMPRESS()
+        full_text: Create the full-text catalog and index
+
     Returns:
         T-SQL DDL string with table creation and index statements
+
+    Raises:
+        ValueError: If full_text is combined with partition_by_month or
+            compress_abstract
     """
-    return """
+    if full_text and (partition_by_month or compress_abstract):
+        raise ValueError(
+            "full_text cannot be combined with partition_by_month (no aligned "
+            "unique key index) or compress_abstract (abstract is computed)"
+        )
+    key = "patent_number NVARCHAR(50) NOT NULL PRIMARY KEY,"
+    abstract = "abstract NVARCHAR(MAX),"
+    partition_ddl = partition_columns = on_scheme = number_index = abstract_migration = ""
+    with_compression = _compression_clause(data_compression)
+    if compress_abstract:
+        abstract = (
+            "abstract_gz VARBINARY(MAX),    -- COMPRESS()ed abstract\n"
+            "    abstract AS CAST(DECOMPRESS(abstract_gz) AS NVARCHAR(MAX)),"
+        )
+        abstract_migration = """IF COL_LENGTH('PATENTS', 'abstract_gz') IS NULL
+BEGIN
+    ALTER TABLE PATENTS ADD abstract_gz VARBINARY(MAX);
+    EXEC('UPDATE PATENTS SET abstract_gz = COMPRESS(abstract) WHERE abstract IS NOT NULL;
+        ALTER TABLE PATENTS DROP COLUMN abstract;
+        ALTER TABLE PATENTS ADD abstract AS CAST(DECOMPRESS(abstract_gz) AS NVARCHAR(MAX));');
+END;
+"""
+    if partition_by_month:
+        if partition_to is None:
+            today = date.today()
+            partition_to = date(today.year + today.month // 12, today.month % 12 + 1, 1).isoformat()
+        boundaries = ",\n        ".join(
+            f"'{month}'" for month in _month_starts(partition_from, partition_to)
+        )
+        partition_ddl = f"""
+IF NOT EXISTS (SELECT * FROM sys.partition_functions WHERE name = '{PARTITION_FUNCTION}')
+    CREATE PARTITION FUNCTION {PARTITION_FUNCTION} (DATE)
+    AS RANGE RIGHT FOR VALUES (
+        {boundaries}
+    );
+
+IF NOT EXISTS (SELECT * FROM sys.partition_schemes WHERE name = '{PARTITION_SCHEME}')
+    CREATE PARTITION SCHEME {PARTITION_SCHEME}
+    AS PARTITION {PARTITION_FUNCTION} ALL TO ([PRIMARY]);
+"""
+        key = "patent_number NVARCHAR(50) NOT NULL,"
+        partition_columns = f""",
+    filing_month AS ISNULL(
+        DATEFROMPARTS(YEAR(filing_date), MONTH(filing_date), 1),
+        CONVERT(DATE, '19000101', 112)
+    ) PERSISTED NOT NULL,          -- Partitioning column
+    CONSTRAINT PK_PATENTS PRIMARY KEY CLUSTERED (filing_month, patent_number)"""
+        on_scheme = f" ON {PARTITION_SCHEME} (filing_month)"
+        number_index = f"""
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENTS_NUMBER')
+    CREATE INDEX IX_PATENTS_NUMBER ON PATENTS (patent_number){with_compression}{on_scheme};
+"""
+    return f"""{partition_ddl}
 IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'PATENTS')
 CREATE TABLE PATENTS (
-    patent_number NVARCHAR(50) NOT NULL PRIMARY KEY,
+    {key}
     title NVARCHAR(500),
-    abstract NVARCHAR(MAX),
+    {abstract}
     assignee NVARCHAR(300),
     inventors NVARCHAR(MAX),       -- JSON array stored as string
     filing_date DATE,
     grant_date DATE,
     cpc_codes NVARCHAR(MAX),       -- JSON array stored as string
+    status_code INT,               -- USPTO applicationStatusCode
     search_query NVARCHAR(200),
     category NVARCHAR(100),
+    row_hash BIGINT,               -- Patent.row_hash content fingerprint
+    row_version ROWVERSION,        -- Change feed position (get_changes_since)
     created_at DATETIME2 DEFAULT GETDATE(),
-    updated_at DATETIME2 DEFAULT GETDATE()
-);
+    updated_at DATETIME2 DEFAULT GETDATE(){partition_columns}
+){on_scheme}{with_compression};
 
+-- Add columns to tables created before they existed
+IF COL_LENGTH('PATENTS', 'row_hash') IS NULL
+    ALTER TABLE PATENTS ADD row_hash BIGINT;
+IF COL_LENGTH('PATENTS', 'status_code') IS NULL
+    ALTER TABLE PATENTS ADD status_code INT;
+IF COL_LENGTH('PATENTS', 'row_version') IS NULL
+    ALTER TABLE PATENTS ADD row_version ROWVERSION;
+{abstract_migration}
 -- Indexes for common query patterns
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENTS_ASSIGNEE')
-    CREATE INDEX IX_PATENTS_ASSIGNEE ON PATENTS (assignee);
+    CREATE INDEX IX_PATENTS_ASSIGNEE ON PATENTS (assignee){with_compression}{on_scheme};
 
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENTS_FILING_DATE')
-    CREATE INDEX IX_PATENTS_FILING_DATE ON PATENTS (filing_date);
+    CREATE INDEX IX_PATENTS_FILING_DATE ON PATENTS (filing_date){with_compression}{on_scheme};
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENTS_ROW_VERSION')
+    CREATE INDEX IX_PATENTS_ROW_VERSION ON PATENTS (row_version){with_compression}{on_scheme};
+{number_index}{build_create_fulltext_index_sql(data_compression) if full_text else ""}"""
+
+
+def _compression_level(data_compression: str) -> str:
+    """Validated DATA_COMPRESSION setting (NONE, ROW or PAGE)."""
+    if data_compression.upper() not in ("NONE", "ROW", "PAGE"):
+        raise ValueError(f"data_compression must be NONE, ROW or PAGE, not {data_compression!r}")
+    return data_compression.upper()
+
+
+def _compression_clause(data_compression: Optional[str]) -> str:
+    """WITH (DATA_COMPRESSION = ...) clause for DDL, or "" for none."""
+    if data_compression is None:
+        return ""
+    return f" WITH (DATA_COMPRESSION = {_compression_level(data_compression)})"
+
+
+def _abstract_write(compress_abstract: bool) -> tuple[str, str]:
+    """(stored abstract column, value wrapper format) for write builders."""
+    if compress_abstract:
+        return "abstract_gz", "COMPRESS({})"
+    return "abstract", "{}"
+
+
+def _month_starts(date_from: str, date_to: str) -> list[str]:
+    """First-of-month dates from date_from's month through date_to's month."""
+    d = date.fromisoformat(date_from).replace(day=1)
+    end = date.fromisoformat(date_to)
+    months = []
+    while d <= end:
+        months.append(d.isoformat())
+        d = date(d.year + d.month // 12, d.month % 12 + 1, 1)
+    return months
+
+
+def build_create_fulltext_index_sql(data_compression: Optional[str] = None) -> str:
+    """Full-text catalog and index on PATENTS title and abstract.
+
+    The index needs a unique single-column key index; the primary key
+    constraint is system-named, so a unique index on patent_number is
+    added for it. CHANGE_TRACKING AUTO keeps the index current as loads
+    write PATENTS, a few seconds behind the commit. Not available on a
+    monthly-partitioned table or with compress_abstract (see
+    build_create_table_sql()).
+
+    Full-text DDL cannot run inside a user transaction; execute it with
+    autocommit on.
+
+    Args:
+        data_compression: None, "ROW" or "PAGE" for the key index
+
+    Returns:
+        T-SQL DDL string
+    """
+    return f"""
+-- Full-text search (get_contains_search_query / get_freetext_search_query)
+IF NOT EXISTS (SELECT * FROM sys.fulltext_catalogs WHERE name = '{FULLTEXT_CATALOG}')
+    CREATE FULLTEXT CATALOG {FULLTEXT_CATALOG};
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = '{FULLTEXT_KEY_INDEX}')
+    CREATE UNIQUE INDEX {FULLTEXT_KEY_INDEX} ON PATENTS (patent_number){_compression_clause(data_compression)};
+
+IF NOT EXISTS (SELECT * FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('PATENTS'))
+    CREATE FULLTEXT INDEX ON PATENTS (title LANGUAGE 1033, abstract LANGUAGE 1033)
+    KEY INDEX {FULLTEXT_KEY_INDEX} ON {FULLTEXT_CATALOG}
+    WITH (CHANGE_TRACKING = AUTO, STOPLIST = SYSTEM);
 """
 
 
-def build_upsert_query() -> str:
+def build_upsert_query(compress_abstract: bool = False) -> str:
     """Generate T-SQL MERGE template for upserting patent records.
 
     This returns a parameterized MERGE statement for use with pyodbc.
-    Parameters are passed via ? placeholders.
+    Parameters are passed via ? placeholders, in Patent.to_db_params() order.
+    Rows whose row_hash is unchanged are matched but not rewritten, and an
+    empty incoming abstract or grant date never overwrites an enriched one.
+    Pass compress_abstract=True for a table created with it.
 
     Returns:
         T-SQL MERGE statement with parameter placeholders
     """
-    return """
+    column, stored = _abstract_write(compress_abstract)
+    return f"""
 MERGE INTO PATENTS AS target
 USING (SELECT
     ? AS patent_number,
@@ -69,113 +259,215 @@ USING (SELECT
     ? AS filing_date,
     ? AS grant_date,
     ? AS cpc_codes,
+    ? AS status_code,
     ? AS search_query,
-    ? AS category
+    ? AS category,
+    ? AS row_hash
 ) AS source
 ON target.patent_number = source.patent_number
-WHEN MATCHED THEN UPDATE SET
+WHEN MATCHED AND (target.row_hash IS NULL OR target.row_hash <> source.row_hash)
+THEN UPDATE SET
     title = source.title,
-    abstract = source.abstract,
+    {column} = COALESCE({stored.format("NULLIF(source.abstract, '')")}, target.{column}),
     assignee = source.assignee,
     inventors = source.inventors,
     filing_date = source.filing_date,
-    grant_date = source.grant_date,
+    grant_date = COALESCE(source.grant_date, target.grant_date),
     cpc_codes = source.cpc_codes,
+    status_code = source.status_code,
     search_query = source.search_query,
     category = source.category,
+    row_hash = source.row_hash,
     updated_at = GETDATE()
 WHEN NOT MATCHED THEN INSERT (
-    patent_number, title, abstract, assignee, inventors,
-    filing_date, grant_date, cpc_codes, search_query, category,
-    created_at, updated_at
+    patent_number, title, {column}, assignee, inventors,
+    filing_date, grant_date, cpc_codes, status_code, search_query, category,
+    row_hash, created_at, updated_at
 ) VALUES (
-    source.patent_number, source.title, source.abstract, source.assignee,
+    source.patent_number, source.title, {stored.format("source.abstract")}, source.assignee,
     source.inventors, source.filing_date, source.grant_date, source.cpc_codes,
-    source.search_query, source.category, GETDATE(), GETDATE()
+    source.status_code, source.search_query, source.category, source.row_hash,
+    GETDATE(), GETDATE()
 );
 """
 
 
-def get_patent_count_query() -> str:
-    """Query to get total patent count and date range.
+def get_known_patents_query() -> str:
+    """Query for (patent_number, row_hash) of patents in a filing date range.
+
+    Feeds KnownPatentIndex so unchanged patents can be skipped before any
+    MERGE is sent. Parameters: filing_date_from, filing_date_to.
 
     Returns:
-        T-SQL query string
+        Parameterized T-SQL query string
     """
     return """
+SELECT patent_number, row_hash
+FROM PATENTS
+WHERE filing_date BETWEEN ? AND ?;
+"""
+
+
+# Read queries share these optional filters. Only the filters actually
+# supplied are emitted, still as parameters, so each combination gets its
+# own cached plan (a handful of variants) and a date range can seek on
+# IX_PATENTS_FILING_DATE instead of scanning past catch-all predicates.
+def _filter_where(
+    filing_date_from: Optional[str],
+    filing_date_to: Optional[str],
+    category: Optional[str],
+    alias: str = "",
+) -> tuple[str, tuple]:
+    """(WHERE predicates, params) for the supplied filters; "1 = 1" if none."""
+    predicates, params = [], []
+    if filing_date_from:
+        predicates.append(f"{alias}filing_date >= ?")
+        params.append(filing_date_from)
+    if filing_date_to:
+        predicates.append(f"{alias}filing_date <= ?")
+        params.append(filing_date_to)
+    if category:
+        predicates.append(f"{alias}category = ?")
+        params.append(category)
+    return "\n    AND ".join(predicates) or "1 = 1", tuple(params)
+
+
+def get_patent_count_query(
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+) -> tuple[str, tuple]:
+    """Query to get total patent count and date range.
+
+    Args:
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
+
+    Returns:
+        Tuple of (T-SQL query string, params)
+    """
+    where, where_params = _filter_where(filing_date_from, filing_date_to, category)
+    sql = f"""
 SELECT
     COUNT(*) AS total_patents,
     MIN(filing_date) AS earliest_filing,
     MAX(filing_date) AS latest_filing,
     COUNT(DISTINCT assignee) AS unique_assignees
-FROM PATENTS;
+FROM PATENTS
+WHERE {where};
 """
+    return sql, where_params
 
 
-def get_trends_query() -> str:
+def get_trends_query(
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+) -> tuple[str, tuple]:
     """Query for patent filing trends by year.
 
+    Args:
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
+
     Returns:
-        T-SQL query string
+        Tuple of (T-SQL query string, params)
     """
-    return """
+    where, where_params = _filter_where(filing_date_from, filing_date_to, category)
+    sql = f"""
 SELECT
     YEAR(filing_date) AS filing_year,
     COUNT(*) AS patent_count
 FROM PATENTS
 WHERE filing_date IS NOT NULL
+    AND {where}
 GROUP BY YEAR(filing_date)
 ORDER BY filing_year;
 """
+    return sql, where_params
 
 
-def get_top_inventors_query(top_n: int = 10) -> str:
+def get_top_inventors_query(
+    top_n: int = 10,
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+) -> tuple[str, tuple]:
     """Query for most prolific inventors using OPENJSON to parse JSON array.
 
     Args:
         top_n: Number of top inventors to return
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
 
     Returns:
-        T-SQL query string using CROSS APPLY OPENJSON
+        Tuple of (T-SQL query string using CROSS APPLY OPENJSON, params)
     """
-    return f"""
-SELECT TOP {top_n}
+    where, where_params = _filter_where(filing_date_from, filing_date_to, category)
+    sql = f"""
+SELECT TOP (?)
     inventor.value AS inventor_name,
     COUNT(*) AS patent_count
 FROM PATENTS
 CROSS APPLY OPENJSON(inventors) AS inventor
+WHERE {where}
 GROUP BY inventor.value
 ORDER BY patent_count DESC;
 """
+    return sql, (top_n,) + where_params
 
 
-def get_cpc_breakdown_query(top_n: int = 10) -> str:
+def get_cpc_breakdown_query(
+    top_n: int = 10,
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+) -> tuple[str, tuple]:
     """Query for technology category breakdown using OPENJSON.
 
     Args:
         top_n: Number of top CPC codes to return
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
 
     Returns:
-        T-SQL query string using CROSS APPLY OPENJSON
+        Tuple of (T-SQL query string using CROSS APPLY OPENJSON, params)
     """
-    return f"""
-SELECT TOP {top_n}
+    where, where_params = _filter_where(filing_date_from, filing_date_to, category)
+    sql = f"""
+SELECT TOP (?)
     LEFT(cpc.value, 4) AS cpc_group,
     COUNT(*) AS patent_count
 FROM PATENTS
 CROSS APPLY OPENJSON(cpc_codes) AS cpc
+WHERE {where}
 GROUP BY LEFT(cpc.value, 4)
 ORDER BY patent_count DESC;
 """
+    return sql, (top_n,) + where_params
 
 
-def get_assignee_comparison_query() -> str:
+def get_assignee_comparison_query(
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+) -> tuple[str, tuple]:
     """Query to compare patent activity across assignees.
 
+    Args:
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
+
     Returns:
-        T-SQL query string
+        Tuple of (T-SQL query string, params)
     """
-    return """
+    where, where_params = _filter_where(filing_date_from, filing_date_to, category)
+    sql = f"""
 SELECT
     assignee,
     COUNT(*) AS total_patents,
@@ -183,16 +475,389 @@ SELECT
     MAX(filing_date) AS latest_filing,
     COUNT(DISTINCT YEAR(filing_date)) AS active_years
 FROM PATENTS
+WHERE {where}
 GROUP BY assignee
 ORDER BY total_patents DESC;
 """
+    return sql, where_params
+
+
+def get_contains_search_query(
+    condition: str,
+    page_size: int = 50,
+    after: Optional[tuple] = None,
+    cpc: Optional[str] = None,
+    assignee: Optional[str] = None,
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+) -> tuple[str, tuple]:
+    """Ranked full-text search (CONTAINSTABLE) over title and abstract.
+
+    Needs the full-text index (build_create_table_sql(full_text=True)).
+    Unlike LIKE '%term%', which scans every row, the condition is resolved
+    in the full-text index and only matching rows are joined back.
+
+    Usage:
+        condition = build_contains_condition('"neural network" AND training')
+        after = None
+        while True:
+            sql, params = get_contains_search_query(condition, after=after, cpc="G06N")
+            rows = cursor.execute(sql, params).fetchall()
+            if not rows:
+                break
+            process(rows)
+            after = (rows[-1].rank, rows[-1].patent_number)
+
+    Args:
+        condition: CONTAINS search condition (see build_contains_condition())
+        page_size: Maximum rows per page
+        after: (rank, patent_number) of the previous page's last row, or None
+            for the first page
+        cpc: Only patents with a CPC code starting with this prefix
+            (whitespace-insensitive), or None
+        assignee: Only assignees starting with this name, or None
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
+
+    Returns:
+        Tuple of (T-SQL query, params); rows are ordered by rank descending,
+        then patent_number
+    """
+    return _ranked_search_query(
+        "CONTAINSTABLE", condition, page_size, after, cpc, assignee,
+        filing_date_from, filing_date_to, category,
+    )
+
+
+def get_freetext_search_query(
+    text: str,
+    page_size: int = 50,
+    after: Optional[tuple] = None,
+    cpc: Optional[str] = None,
+    assignee: Optional[str] = None,
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+) -> tuple[str, tuple]:
+    """Ranked natural-language search (FREETEXTTABLE) over title and abstract.
+
+    Matches any inflection or thesaurus form of any word in text, ranked by
+    relevance; no query syntax. Filters and keyset pagination are as for
+    get_contains_search_query().
+
+    Args:
+        text: Free text, e.g. "battery thermal management for vehicles"
+        page_size: Maximum rows per page
+        after: (rank, patent_number) of the previous page's last row, or None
+        cpc: Only patents with a CPC code starting with this prefix, or None
+        assignee: Only assignees starting with this name, or None
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
+
+    Returns:
+        Tuple of (T-SQL query, params)
+    """
+    return _ranked_search_query(
+        "FREETEXTTABLE", text, page_size, after, cpc, assignee,
+        filing_date_from, filing_date_to, category,
+    )
+
+
+def _ranked_search_query(
+    function: str,
+    search: str,
+    page_size: int,
+    after: Optional[tuple],
+    cpc: Optional[str],
+    assignee: Optional[str],
+    filing_date_from: Optional[str],
+    filing_date_to: Optional[str],
+    category: Optional[str],
+) -> tuple[str, tuple]:
+    """CONTAINSTABLE / FREETEXTTABLE search with filters and a (rank, key) keyset."""
+    after_rank, after_patent = after if after else (None, None)
+    where, where_params = _filter_where(filing_date_from, filing_date_to, category, "p.")
+    sql = f"""
+DECLARE @search NVARCHAR(4000) = ?, @cpc NVARCHAR(50) = REPLACE(?, ' ', ''),
+    @assignee NVARCHAR(300) = ?, @after_rank INT = ?, @after_patent NVARCHAR(50) = ?;
+SELECT TOP (?)
+    ft.[RANK] AS [rank], p.patent_number, p.title, p.assignee, p.filing_date,
+    p.cpc_codes, p.category
+FROM {function}(PATENTS, (title, abstract), @search) AS ft
+JOIN PATENTS AS p ON p.patent_number = ft.[KEY]
+WHERE {where}
+    AND (@assignee IS NULL OR p.assignee LIKE @assignee + N'%')
+    AND (@cpc IS NULL OR EXISTS (
+        SELECT 1 FROM OPENJSON(p.cpc_codes) AS code
+        WHERE REPLACE(code.value, ' ', '') LIKE @cpc + N'%'
+    ))
+    AND (@after_rank IS NULL
+        OR ft.[RANK] < @after_rank
+        OR (ft.[RANK] = @after_rank AND p.patent_number > @after_patent))
+ORDER BY ft.[RANK] DESC, p.patent_number;
+"""
+    params = (
+        search, cpc or None, assignee or None, after_rank, after_patent, page_size,
+    ) + where_params
+    return sql, params
+
+
+def build_contains_condition(keywords: str) -> str:
+    """Translate a search_by_title() keyword query into a CONTAINS condition.
+
+    Keeps the query semantics of title_matches(): bare terms are OR'd and
+    matched in any inflection (FORMSOF(INFLECTIONAL, ...), the server-side
+    plural folding), "quoted phrases" stay exact phrases, trailing *
+    wildcards become prefix terms and field: prefixes are dropped. A bare
+    NOT clause excludes from the rest of its group ("a b NOT c" becomes
+    "(a OR b) AND NOT c").
+
+    Args:
+        keywords: Keyword query as passed to search_by_title()
+
+    Returns:
+        CONTAINS search condition string
+
+    Raises:
+        ValueError: If the query cannot be expressed, e.g. it has no
+            positive term (CONTAINS can only exclude from a match)
+    """
+    return _ContainsCondition(keywords).translate()
+
+
+class _ContainsCondition:
+    """Recursive-descent translator mirroring patent_search._KeywordQuery."""
+
+    def __init__(self, keywords: str):
+        self.keywords = keywords
+        self.tokens = query_tokens(keywords)
+        self.pos = 0
+
+    def translate(self) -> str:
+        condition = self._or_expr()
+        if self.pos < len(self.tokens):
+            self._fail("unbalanced ')'")
+        return condition
+
+    def _fail(self, reason: str):
+        raise ValueError(f"Cannot express {self.keywords!r} as a CONTAINS condition: {reason}")
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _or_expr(self) -> str:
+        positive, negative = [], []
+        while self._peek() not in (None, ")"):
+            if self._peek() == "OR":
+                self.pos += 1
+                continue
+            if self._peek() == "NOT":
+                self.pos += 1
+                negative.append(self._and_expr())
+                continue
+            positive.append(self._and_expr())
+        if not positive:
+            self._fail("no positive term")
+        condition = positive[0] if len(positive) == 1 else f"({' OR '.join(positive)})"
+        if negative:
+            condition = f"({condition}{''.join(f' AND NOT {clause}' for clause in negative)})"
+        return condition
+
+    def _and_expr(self) -> str:
+        terms = [self._unary()]
+        while self._peek() == "AND":
+            self.pos += 1
+            terms.append(self._unary())
+        included = [term for negated, term in terms if not negated]
+        if not included:
+            self._fail("NOT without a positive term to exclude from")
+        condition = " AND ".join(included)
+        condition += "".join(f" AND NOT {term}" for negated, term in terms if negated)
+        return f"({condition})" if len(terms) > 1 else condition
+
+    def _unary(self) -> tuple[bool, str]:
+        if self._peek() == "NOT":
+            self.pos += 1
+            negated, term = self._unary()
+            return not negated, term
+        return False, self._primary()
+
+    def _primary(self) -> str:
+        token = self._peek()
+        if token is None:
+            self._fail("missing term")
+        self.pos += 1
+        if token == "(":
+            condition = self._or_expr()
+            if self._peek() == ")":
+                self.pos += 1
+            return condition
+        if not token.startswith('"') and ":" in token:
+            token = token.split(":", 1)[1]
+        terms = words(token)
+        if not terms:
+            self._fail(f"no searchable words in {token!r}")
+        if token.startswith('"'):
+            return f'"{" ".join(terms)}"'
+        if token.endswith("*"):
+            return f'"{" ".join(terms)}*"'
+        forms = [f"FORMSOF(INFLECTIONAL, {term})" for term in terms]
+        return forms[0] if len(forms) == 1 else f"({' OR '.join(forms)})"
+
+
+DASHBOARD_RESULT_SETS = ("summary", "monthly_trend", "category_mix", "top_cpc", "top_inventors")
+
+
+def get_dashboard_query(
+    top_n: int = 10,
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    category: Optional[str] = None,
+) -> tuple[str, tuple]:
+    """One batch computing every dashboard aggregate from a single PATENTS scan.
+
+    The columns the aggregates need are copied into a temp table once; each
+    aggregate is then a separate result set, in DASHBOARD_RESULT_SETS order
+    (read them with cursor.nextset()):
+
+        summary:       total_patents, earliest_filing, latest_filing, unique_assignees
+        monthly_trend: filing_month ('yyyy-MM'), patent_count
+        category_mix:  category, patent_count
+        top_cpc:       cpc_group, patent_count (top_n)
+        top_inventors: inventor_name, patent_count (top_n)
+
+    Args:
+        top_n: Number of top CPC groups and inventors to return
+        filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+        filing_date_to: Latest filing date (YYYY-MM-DD), or None
+        category: Only this load category, or None for all
+
+    Returns:
+        Tuple of (T-SQL batch string returning five result sets, params)
+    """
+    where, where_params = _filter_where(filing_date_from, filing_date_to, category)
+    sql = f"""
+SET NOCOUNT ON;
+DECLARE @top_n INT = ?;
+SELECT filing_date, category, assignee, inventors, cpc_codes
+INTO #dashboard
+FROM PATENTS
+WHERE {where};
+
+SELECT
+    COUNT(*) AS total_patents,
+    MIN(filing_date) AS earliest_filing,
+    MAX(filing_date) AS latest_filing,
+    COUNT(DISTINCT assignee) AS unique_assignees
+FROM #dashboard;
+
+SELECT CONVERT(CHAR(7), filing_date, 126) AS filing_month, COUNT(*) AS patent_count
+FROM #dashboard
+WHERE filing_date IS NOT NULL
+GROUP BY CONVERT(CHAR(7), filing_date, 126)
+ORDER BY filing_month;
+
+SELECT category, COUNT(*) AS patent_count
+FROM #dashboard
+GROUP BY category
+ORDER BY patent_count DESC;
+
+SELECT TOP (@top_n) LEFT(cpc.value, 4) AS cpc_group, COUNT(*) AS patent_count
+FROM #dashboard
+CROSS APPLY OPENJSON(cpc_codes) AS cpc
+GROUP BY LEFT(cpc.value, 4)
+ORDER BY patent_count DESC;
+
+SELECT TOP (@top_n) inventor.value AS inventor_name, COUNT(*) AS patent_count
+FROM #dashboard
+CROSS APPLY OPENJSON(inventors) AS inventor
+GROUP BY inventor.value
+ORDER BY patent_count DESC;
+
+DROP TABLE #dashboard;
+"""
+    return sql, (top_n,) + where_params
+
+
+def get_qc_checks_query(sample_size: int = 10) -> tuple[str, tuple]:
+    """The data-quality checks of sql/08_qc_queries.sql as one batch.
+
+    Covers what get_dashboard_query() does not, one result set each:
+    patents by search topic, empty patent numbers, duplicate patent
+    numbers, SYNC_LOG history and a sample of the newest filings.
+
+    Args:
+        sample_size: Number of sample patents to return
+
+    Returns:
+        Tuple of (T-SQL batch string returning five result sets, params)
+    """
+    sql = """
+SET NOCOUNT ON;
+SELECT search_query, COUNT(*) AS cnt
+FROM PATENTS GROUP BY search_query ORDER BY cnt DESC;
+
+SELECT COUNT(*) AS empty_ids FROM PATENTS
+WHERE patent_number IS NULL OR patent_number = '';
+
+SELECT patent_number, COUNT(*) AS cnt
+FROM PATENTS GROUP BY patent_number HAVING COUNT(*) > 1;
+
+SELECT * FROM SYNC_LOG ORDER BY sync_date DESC;
+
+SELECT TOP (?) patent_number, title, assignee, filing_date, search_query, category
+FROM PATENTS ORDER BY filing_date DESC;
+"""
+    return sql, (sample_size,)
+
+
+def get_statement_stats_query(top_n: int = 20) -> tuple[str, tuple]:
+    """Plan-cache statistics for statements run through a StatementRegistry.
+
+    Registered statements carry a "/* stmt:<name> */" tag, which is how
+    they are found in sys.dm_exec_query_stats; the tag may follow the
+    parameter declarations sp_prepare puts in front of the text. Statements
+    of a multi-statement batch are summed under the batch's name. Needs
+    VIEW DATABASE STATE.
+
+    Args:
+        top_n: Number of statements to return, most total elapsed time first
+
+    Returns:
+        Tuple of (T-SQL query string, params)
+    """
+    sql = """
+SELECT TOP (?)
+    SUBSTRING(st.text, tag.name_at, CHARINDEX(N' */', st.text, tag.name_at) - tag.name_at)
+        AS statement_name,
+    SUM(qs.execution_count) AS executions,
+    COUNT(DISTINCT qs.plan_handle) AS cached_plans,
+    SUM(qs.total_elapsed_time) / 1000.0 AS total_elapsed_ms,
+    SUM(qs.total_worker_time) / 1000.0 AS total_cpu_ms,
+    SUM(qs.total_elapsed_time) / 1000.0 / NULLIF(SUM(qs.execution_count), 0) AS avg_elapsed_ms,
+    SUM(qs.total_logical_reads) AS total_logical_reads,
+    MAX(qs.last_execution_time) AS last_execution_time
+FROM sys.dm_exec_query_stats AS qs
+CROSS APPLY sys.dm_exec_sql_text(qs.sql_handle) AS st
+CROSS APPLY (SELECT CHARINDEX(N'/* stmt:', st.text) + 8 AS name_at) AS tag
+WHERE tag.name_at > 8
+    AND st.text NOT LIKE N'%sys.dm_exec_query_stats%'
+GROUP BY SUBSTRING(st.text, tag.name_at, CHARINDEX(N' */', st.text, tag.name_at) - tag.name_at)
+ORDER BY total_elapsed_ms DESC;
+"""
+    return sql, (top_n,)
 
 
 def build_create_sync_log_sql() -> str:
     """Generate T-SQL CREATE TABLE statement for SYNC_LOG table.
 
     Tracks daily sync runs: when they happened, what date range was covered,
-    how many patents were loaded, and which topics were searched.
+    how many patents were loaded, and which topics were searched. A run that
+    stops early (time budget) stays 'partial'; where to resume is kept per
+    source in SYNC_WATERMARKS.
 
     Returns:
         T-SQL DDL string with table creation
@@ -214,8 +879,8 @@ CREATE TABLE SYNC_LOG (
 def get_last_sync_date_query() -> str:
     """Query to get the last successful sync date.
 
-    Returns the most recent filing_date_to from a completed sync,
-    used as the starting point for the next daily sync run.
+    Returns the most recent filing_date_to from a completed sync. Only
+    used to seed SYNC_WATERMARKS; runs resume from the watermarks.
 
     Returns:
         T-SQL query string
@@ -224,8 +889,1102 @@ def get_last_sync_date_query() -> str:
 SELECT TOP 1
     filing_date_to AS last_sync_date,
     sync_date,
-    patents_loaded
+    patents_loaded,
+    sync_status
 FROM SYNC_LOG
 WHERE sync_status = 'completed'
-ORDER BY sync_date DESC;
+ORDER BY sync_id DESC;
+"""
+
+
+def build_sync_log_insert_query() -> str:
+    """Parameterized INSERT that opens a SYNC_LOG row and returns its sync_id.
+
+    Parameters: filing_date_from, filing_date_to, search_topics. The row
+    starts as 'partial' with 0 patents loaded.
+
+    Returns:
+        T-SQL INSERT ... OUTPUT statement
+    """
+    return """
+INSERT INTO SYNC_LOG (
+    filing_date_from, filing_date_to, patents_loaded, search_topics, sync_status
+)
+OUTPUT INSERTED.sync_id
+VALUES (?, ?, 0, ?, 'partial');
+"""
+
+
+def build_sync_log_update_query() -> str:
+    """Parameterized UPDATE recording sync progress on a SYNC_LOG row.
+
+    Parameters: patents_loaded, sync_status, sync_id. Run it in the same
+    transaction as the window's MERGEs so the count matches committed data.
+
+    Returns:
+        T-SQL UPDATE statement
+    """
+    return """
+UPDATE SYNC_LOG
+SET patents_loaded = ?,
+    sync_status = ?
+WHERE sync_id = ?;
+"""
+
+
+def build_create_watermarks_sql() -> str:
+    """Generate T-SQL CREATE TABLE statement for SYNC_WATERMARKS table.
+
+    One row per source (a title topic, or "CPC:<code>"), holding two
+    high-water marks: filings up to filing_date_hwm and publications up to
+    publication_date_hwm have been synced. Each run fetches only the delta
+    past these marks, so new sources backfill independently and late
+    publications of old filings are still picked up.
+
+    Returns:
+        T-SQL DDL string with table creation
+    """
+    return """
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'SYNC_WATERMARKS')
+CREATE TABLE SYNC_WATERMARKS (
+    source NVARCHAR(200) NOT NULL PRIMARY KEY,  -- Topic text or 'CPC:<code>'
+    filing_date_hwm DATE,
+    publication_date_hwm DATE,
+    updated_at DATETIME2 DEFAULT GETDATE()
+);
+"""
+
+
+def get_watermarks_query() -> str:
+    """Query for the high-water marks of every source.
+
+    Returns:
+        T-SQL query string
+    """
+    return """
+SELECT source, filing_date_hwm, publication_date_hwm
+FROM SYNC_WATERMARKS;
+"""
+
+
+def build_upsert_watermark_query() -> str:
+    """Parameterized MERGE that sets the high-water marks of one source.
+
+    Parameters: source, filing_date_hwm, publication_date_hwm. Run it in the
+    same transaction as the data it covers.
+
+    Returns:
+        T-SQL MERGE statement
+    """
+    return """
+MERGE INTO SYNC_WATERMARKS AS target
+USING (SELECT
+    ? AS source,
+    ? AS filing_date_hwm,
+    ? AS publication_date_hwm
+) AS src
+ON target.source = src.source
+WHEN MATCHED THEN UPDATE SET
+    filing_date_hwm = src.filing_date_hwm,
+    publication_date_hwm = src.publication_date_hwm,
+    updated_at = GETDATE()
+WHEN NOT MATCHED THEN INSERT (source, filing_date_hwm, publication_date_hwm, updated_at)
+VALUES (src.source, src.filing_date_hwm, src.publication_date_hwm, GETDATE());
+"""
+
+
+def build_create_backfill_tasks_sql() -> str:
+    """Generate T-SQL CREATE TABLE statement for BACKFILL_TASKS table.
+
+    A work queue for running the CPC backfill from several machines at once.
+    Each task is one (source, date window, page range). Workers lease tasks
+    with build_claim_backfill_task_query(), keep the lease alive with
+    heartbeats, and mark them done in the same transaction as their data.
+    A task whose lease expires (crashed worker) is claimable again.
+
+    Returns:
+        T-SQL DDL string with table creation and index statements
+    """
+    return """
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'BACKFILL_TASKS')
+CREATE TABLE BACKFILL_TASKS (
+    task_id INT IDENTITY(1,1) PRIMARY KEY,
+    source NVARCHAR(200) NOT NULL,      -- e.g. 'CPC:G06N,G06Q' (coalesced codes)
+    window_from DATE NOT NULL,
+    window_to DATE NOT NULL,
+    page_from INT NOT NULL,
+    page_to INT NOT NULL,               -- exclusive
+    status NVARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending/leased/done/failed
+    lease_owner NVARCHAR(100),
+    lease_expires_at DATETIME2,
+    heartbeat_at DATETIME2,
+    attempts INT NOT NULL DEFAULT 0,
+    patents_loaded INT,
+    created_at DATETIME2 DEFAULT GETDATE(),
+    completed_at DATETIME2,
+    CONSTRAINT UQ_BACKFILL_TASKS UNIQUE (source, window_from, window_to, page_from)
+);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_BACKFILL_TASKS_STATUS')
+    CREATE INDEX IX_BACKFILL_TASKS_STATUS
+    ON BACKFILL_TASKS (status, lease_expires_at) INCLUDE (attempts);
+"""
+
+
+def build_enqueue_backfill_task_query() -> str:
+    """Parameterized, idempotent insert of one backfill task.
+
+    Parameters: source, window_from, window_to, page_from, page_to.
+    Re-enqueueing an existing (source, window, page_from) is a no-op.
+
+    Returns:
+        T-SQL MERGE statement
+    """
+    return """
+MERGE INTO BACKFILL_TASKS WITH (HOLDLOCK) AS target
+USING (SELECT
+    ? AS source,
+    ? AS window_from,
+    ? AS window_to,
+    ? AS page_from,
+    ? AS page_to
+) AS src
+ON target.source = src.source
+    AND target.window_from = src.window_from
+    AND target.window_to = src.window_to
+    AND target.page_from = src.page_from
+WHEN NOT MATCHED THEN INSERT (source, window_from, window_to, page_from, page_to)
+VALUES (src.source, src.window_from, src.window_to, src.page_from, src.page_to);
+"""
+
+
+def build_claim_backfill_task_query() -> str:
+    """Parameterized lease of the next available backfill task.
+
+    READPAST skips rows other workers hold locked and UPDLOCK keeps two
+    workers from claiming the same row, so concurrent claims never block
+    or collide. Pending tasks and tasks whose lease expired are claimable.
+
+    Parameters: lease_owner, lease_seconds, max_attempts.
+
+    Returns:
+        T-SQL UPDATE ... OUTPUT statement (no row when the queue is drained)
+    """
+    return """
+UPDATE TOP (1) BACKFILL_TASKS WITH (READPAST, UPDLOCK, ROWLOCK)
+SET status = 'leased',
+    lease_owner = ?,
+    lease_expires_at = DATEADD(SECOND, ?, SYSUTCDATETIME()),
+    heartbeat_at = SYSUTCDATETIME(),
+    attempts = attempts + 1
+OUTPUT
+    inserted.task_id,
+    inserted.source,
+    inserted.window_from,
+    inserted.window_to,
+    inserted.page_from,
+    inserted.page_to
+WHERE attempts < ?
+    AND (status = 'pending'
+         OR (status = 'leased' AND lease_expires_at < SYSUTCDATETIME()));
+"""
+
+
+def build_heartbeat_backfill_task_query() -> str:
+    """Parameterized lease extension for a task the worker still owns.
+
+    Parameters: lease_seconds, task_id, lease_owner. Zero rows affected
+    means the lease was lost (expired and re-claimed by another worker).
+
+    Returns:
+        T-SQL UPDATE statement
+    """
+    return """
+UPDATE BACKFILL_TASKS
+SET lease_expires_at = DATEADD(SECOND, ?, SYSUTCDATETIME()),
+    heartbeat_at = SYSUTCDATETIME()
+WHERE task_id = ? AND lease_owner = ? AND status = 'leased';
+"""
+
+
+def build_complete_backfill_task_query() -> str:
+    """Parameterized completion of a leased backfill task.
+
+    Parameters: patents_loaded, task_id, lease_owner. Run it in the same
+    transaction as the task's upserts; zero rows affected means the lease
+    was lost and the transaction should be rolled back.
+
+    Returns:
+        T-SQL UPDATE statement
+    """
+    return """
+UPDATE BACKFILL_TASKS
+SET status = 'done',
+    patents_loaded = ?,
+    completed_at = GETDATE(),
+    lease_owner = NULL,
+    lease_expires_at = NULL
+WHERE task_id = ? AND lease_owner = ? AND status = 'leased';
+"""
+
+
+def build_requeue_expired_tasks_query() -> str:
+    """Parameterized sweep returning expired leases to the queue.
+
+    Tasks that have used up max_attempts are marked 'failed' instead.
+    Parameters: max_attempts.
+
+    Returns:
+        T-SQL UPDATE statement
+    """
+    return """
+UPDATE BACKFILL_TASKS
+SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+    lease_owner = NULL,
+    lease_expires_at = NULL
+WHERE status = 'leased' AND lease_expires_at < SYSUTCDATETIME();
+"""
+
+
+def get_backfill_progress_query() -> str:
+    """Query for backfill queue progress by task status.
+
+    Returns:
+        T-SQL query string
+    """
+    return """
+SELECT
+    status,
+    COUNT(*) AS tasks,
+    SUM(patents_loaded) AS patents_loaded,
+    MIN(window_from) AS earliest_window,
+    MAX(window_to) AS latest_window
+FROM BACKFILL_TASKS
+GROUP BY status;
+"""
+
+
+def build_create_enrichment_sql() -> str:
+    """Generate T-SQL CREATE TABLE statement for PATENT_ENRICHMENT table.
+
+    Records which patents the enrichment stage has already looked up (and at
+    which status code), so enrichment is idempotent and resumable: a patent
+    is only revisited when its status code changes.
+
+    Returns:
+        T-SQL DDL string with table creation
+    """
+    return """
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'PATENT_ENRICHMENT')
+CREATE TABLE PATENT_ENRICHMENT (
+    patent_number NVARCHAR(50) NOT NULL PRIMARY KEY,
+    application_number NVARCHAR(20),
+    status_code INT,               -- PATENTS.status_code when enriched
+    has_abstract BIT,
+    has_grant_date BIT,
+    enriched_at DATETIME2 DEFAULT GETDATE()
+);
+"""
+
+
+def get_enrichment_candidates_query() -> str:
+    """Keyset-paged query for patents that need enrichment.
+
+    Selects patents missing an abstract or grant date that were never
+    enriched, plus previously enriched patents whose status code has since
+    changed. Parameters: batch_size, after_patent_number ('' to start).
+
+    Returns:
+        Parameterized T-SQL query string
+    """
+    return """
+SELECT TOP (?)
+    p.patent_number,
+    p.status_code,
+    e.application_number
+FROM PATENTS AS p
+LEFT JOIN PATENT_ENRICHMENT AS e ON e.patent_number = p.patent_number
+WHERE p.patent_number > ?
+    AND (
+        (e.patent_number IS NULL
+            AND (p.abstract IS NULL OR p.abstract = '' OR p.grant_date IS NULL))
+        OR (e.patent_number IS NOT NULL
+            AND ISNULL(e.status_code, -1) <> ISNULL(p.status_code, -1))
+    )
+ORDER BY p.patent_number;
+"""
+
+
+def build_enrichment_update_query(compress_abstract: bool = False) -> str:
+    """Parameterized UPDATE writing enriched fields back to PATENTS.
+
+    Parameters: abstract, grant_date, status_code, patent_number. Empty
+    values keep what is stored. row_hash is left alone: it fingerprints the
+    search-derived columns, so syncs keep skipping unchanged patents.
+    Intended for cursor.executemany() with fast_executemany. Pass
+    compress_abstract=True for a table created with it.
+
+    Returns:
+        T-SQL UPDATE statement
+    """
+    column, stored = _abstract_write(compress_abstract)
+    return f"""
+UPDATE PATENTS
+SET {column} = COALESCE({stored.format("NULLIF(?, '')")}, {column}),
+    grant_date = COALESCE(?, grant_date),
+    status_code = COALESCE(?, status_code),
+    updated_at = GETDATE()
+WHERE patent_number = ?;
+"""
+
+
+def build_upsert_enrichment_query() -> str:
+    """Parameterized MERGE recording that a patent has been enriched.
+
+    Parameters: patent_number, application_number, status_code,
+    has_abstract, has_grant_date. Intended for cursor.executemany().
+
+    Returns:
+        T-SQL MERGE statement
+    """
+    return """
+MERGE INTO PATENT_ENRICHMENT AS target
+USING (SELECT
+    ? AS patent_number,
+    ? AS application_number,
+    ? AS status_code,
+    ? AS has_abstract,
+    ? AS has_grant_date
+) AS source
+ON target.patent_number = source.patent_number
+WHEN MATCHED THEN UPDATE SET
+    application_number = source.application_number,
+    status_code = source.status_code,
+    has_abstract = source.has_abstract,
+    has_grant_date = source.has_grant_date,
+    enriched_at = GETDATE()
+WHEN NOT MATCHED THEN INSERT (
+    patent_number, application_number, status_code,
+    has_abstract, has_grant_date, enriched_at
+) VALUES (
+    source.patent_number, source.application_number, source.status_code,
+    source.has_abstract, source.has_grant_date, GETDATE()
+);
+"""
+
+
+def build_create_raw_pages_sql() -> str:
+    """Generate T-SQL CREATE TABLE statement for RAW_USPTO_PAGES table.
+
+    ELT landing table: each USPTO search response page is stored as
+    returned, GZip-compressed with COMPRESS(), so PATENTS can be rebuilt
+    from it by build_transform_raw_pages_sql() without calling the API.
+
+    Returns:
+        T-SQL DDL string with table creation and index statements
+    """
+    return """
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'RAW_USPTO_PAGES')
+CREATE TABLE RAW_USPTO_PAGES (
+    page_id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    source NVARCHAR(200) NOT NULL,     -- e.g. 'CPC:G06N/G06Q'
+    category NVARCHAR(100) NOT NULL,
+    query NVARCHAR(MAX) NOT NULL,      -- Lucene query that produced the page
+    start_offset INT NOT NULL,
+    payload VARBINARY(MAX) NOT NULL,   -- COMPRESS(response JSON)
+    fetched_at DATETIME2 DEFAULT GETDATE(),
+    transformed_at DATETIME2 NULL
+);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_RAW_USPTO_PAGES_PENDING')
+    CREATE INDEX IX_RAW_USPTO_PAGES_PENDING ON RAW_USPTO_PAGES (page_id)
+    WHERE transformed_at IS NULL;
+"""
+
+
+def build_insert_raw_page_query() -> str:
+    """Parameterized INSERT landing one compressed USPTO response page.
+
+    Parameters: source, category, query, start_offset, response JSON text.
+    Intended for cursor.executemany().
+
+    Returns:
+        T-SQL INSERT statement
+    """
+    return """
+INSERT INTO RAW_USPTO_PAGES (source, category, query, start_offset, payload)
+VALUES (?, ?, ?, ?, COMPRESS(?));
+"""
+
+
+def build_transform_raw_pages_sql(reprocess: bool = False, compress_abstract: bool = False) -> str:
+    """Set-based OPENJSON transform from RAW_USPTO_PAGES into PATENTS.
+
+    Mirrors _format_uspto_patent() in T-SQL: decompresses each page, shreds
+    patentFileWrapperDataBag with OPENJSON, rebuilds the inventors and CPC
+    JSON arrays, keeps the newest page's copy of each patent, and MERGEs the
+    result. Only rows whose projected columns differ are updated; they get
+    a NULL row_hash so the next Python load re-fingerprints them. Enriched
+    abstracts and grant dates are kept, and search_query/category are only
+    set on insert. A coalesced CPC source ("CPC:G06N/G06Q") is attributed
+    like attribute_patents() does: search_query is the first of its codes
+    that prefixes one of the patent's CPC codes, else the first code.
+    Returns one row: patents_merged.
+
+    Args:
+        reprocess: Re-run over every stored page (e.g. after fixing the
+            transform) instead of only pages not transformed yet
+        compress_abstract: PATENTS was created with compress_abstract
+
+    Returns:
+        T-SQL batch string (no parameters)
+    """
+    pending = "" if reprocess else "\n        AND transformed_at IS NULL"
+    column, stored = _abstract_write(compress_abstract)
+    return f"""
+SET NOCOUNT ON;
+DECLARE @upto BIGINT = (SELECT MAX(page_id) FROM RAW_USPTO_PAGES);
+
+WITH pages AS (
+    SELECT page_id, source, category,
+        CAST(DECOMPRESS(payload) AS NVARCHAR(MAX)) AS body
+    FROM RAW_USPTO_PAGES
+    WHERE page_id <= @upto{pending}
+),
+apps AS (
+    SELECT pg.page_id, pg.source, pg.category, a.*
+    FROM pages AS pg
+    CROSS APPLY OPENJSON(pg.body, '$.patentFileWrapperDataBag') WITH (
+        application_number NVARCHAR(50) '$.applicationNumberText',
+        publication_number NVARCHAR(50) '$.applicationMetaData.earliestPublicationNumber',
+        title NVARCHAR(MAX) '$.applicationMetaData.inventionTitle',
+        assignee NVARCHAR(MAX) '$.applicationMetaData.applicantBag[0].applicantNameText',
+        filing_date_text NVARCHAR(30) '$.applicationMetaData.filingDate',
+        grant_date_text NVARCHAR(30) '$.applicationMetaData.grantDate',
+        status_code INT '$.applicationMetaData.applicationStatusCode',
+        inventor_bag NVARCHAR(MAX) '$.applicationMetaData.inventorBag' AS JSON,
+        cpc_bag NVARCHAR(MAX) '$.applicationMetaData.cpcClassificationBag' AS JSON
+    ) AS a
+),
+projected AS (
+    SELECT
+        COALESCE(NULLIF(publication_number, ''), application_number) AS patent_number,
+        LEFT(ISNULL(title, ''), 500) AS title,
+        LEFT(ISNULL(assignee, ''), 300) AS assignee,
+        ISNULL((
+            SELECT '[' + STRING_AGG(
+                CAST('"' + STRING_ESCAPE(JSON_VALUE(i.value, '$.inventorNameText'), 'json')
+                    + '"' AS NVARCHAR(MAX)), ', '
+            ) WITHIN GROUP (ORDER BY CAST(i.[key] AS INT)) + ']'
+            FROM OPENJSON(inventor_bag) AS i
+            WHERE JSON_VALUE(i.value, '$.inventorNameText') <> ''
+        ), '[]') AS inventors,
+        TRY_CONVERT(DATE, LEFT(filing_date_text, 10)) AS filing_date,
+        TRY_CONVERT(DATE, LEFT(grant_date_text, 10)) AS grant_date,
+        ISNULL((
+            SELECT '[' + STRING_AGG(
+                CAST('"' + STRING_ESCAPE(x.code, 'json') + '"' AS NVARCHAR(MAX)), ', '
+            ) WITHIN GROUP (ORDER BY CAST(c.[key] AS INT)) + ']'
+            FROM OPENJSON(cpc_bag) AS c
+            CROSS APPLY (SELECT CASE c.type
+                WHEN 1 THEN c.value  -- plain string entry
+                ELSE JSON_VALUE(c.value, '$.cpcClassificationText')
+            END AS code) AS x
+            WHERE x.code <> ''
+        ), '[]') AS cpc_codes,
+        status_code,
+        LEFT(COALESCE(
+            (
+                SELECT TOP (1) 'CPC:' + g.value
+                FROM STRING_SPLIT(STUFF(source, 1, 4, ''), '/', 1) AS g
+                WHERE source LIKE 'CPC:%' AND EXISTS (
+                    SELECT * FROM OPENJSON(cpc_bag) AS c
+                    WHERE UPPER(REPLACE(CASE c.type
+                        WHEN 1 THEN c.value
+                        ELSE JSON_VALUE(c.value, '$.cpcClassificationText')
+                    END, ' ', '')) LIKE UPPER(g.value) + '%'
+                )
+                ORDER BY g.ordinal
+            ),
+            CASE WHEN source LIKE 'CPC:%/%'
+                THEN LEFT(source, CHARINDEX('/', source) - 1)
+                ELSE source
+            END
+        ), 200) AS search_query,
+        category,
+        ROW_NUMBER() OVER (
+            PARTITION BY COALESCE(NULLIF(publication_number, ''), application_number)
+            ORDER BY page_id DESC
+        ) AS rn
+    FROM apps
+    WHERE COALESCE(NULLIF(publication_number, ''), application_number) <> ''
+)
+MERGE INTO PATENTS AS target
+USING (SELECT * FROM projected WHERE rn = 1) AS src
+ON target.patent_number = src.patent_number
+WHEN MATCHED AND EXISTS (
+    SELECT src.title, src.assignee, src.inventors, src.filing_date,
+        ISNULL(src.grant_date, target.grant_date), src.cpc_codes, src.status_code
+    EXCEPT
+    SELECT target.title, target.assignee, target.inventors, target.filing_date,
+        target.grant_date, target.cpc_codes, target.status_code
+)
+THEN UPDATE SET
+    title = src.title,
+    assignee = src.assignee,
+    inventors = src.inventors,
+    filing_date = src.filing_date,
+    grant_date = COALESCE(src.grant_date, target.grant_date),
+    cpc_codes = src.cpc_codes,
+    status_code = src.status_code,
+    row_hash = NULL,
+    updated_at = GETDATE()
+WHEN NOT MATCHED THEN INSERT (
+    patent_number, title, {column}, assignee, inventors,
+    filing_date, grant_date, cpc_codes, status_code, search_query, category,
+    row_hash, created_at, updated_at
+) VALUES (
+    src.patent_number, src.title, {stored.format("N''")}, src.assignee, src.inventors,
+    src.filing_date, src.grant_date, src.cpc_codes, src.status_code,
+    src.search_query, src.category, NULL, GETDATE(), GETDATE()
+);
+
+DECLARE @merged INT = @@ROWCOUNT;
+
+UPDATE RAW_USPTO_PAGES
+SET transformed_at = GETDATE()
+WHERE page_id <= @upto{pending};
+
+SELECT @merged AS patents_merged;
+"""
+
+
+# Change-feed token that precedes every change (rowversion 0)
+CHANGE_FEED_START = "0x0000000000000000"
+
+
+def build_create_tombstones_sql() -> str:
+    """Generate T-SQL for the PATENT_TOMBSTONES table and its delete trigger.
+
+    Every row deleted from PATENTS leaves a tombstone whose rowversion comes
+    from the same database counter as PATENTS.row_version, so deletes and
+    upserts interleave correctly in get_changes_since().
+
+    Returns:
+        T-SQL DDL string with table, index and trigger creation
+    """
+    return """
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'PATENT_TOMBSTONES')
+CREATE TABLE PATENT_TOMBSTONES (
+    tombstone_id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    patent_number NVARCHAR(50) NOT NULL,
+    deleted_version ROWVERSION,
+    deleted_at DATETIME2 DEFAULT GETDATE()
+);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PATENT_TOMBSTONES_VERSION')
+    CREATE INDEX IX_PATENT_TOMBSTONES_VERSION ON PATENT_TOMBSTONES (deleted_version);
+
+-- CREATE TRIGGER must start its own batch, hence EXEC
+IF NOT EXISTS (SELECT * FROM sys.triggers WHERE name = 'TR_PATENTS_TOMBSTONE')
+    EXEC('CREATE TRIGGER TR_PATENTS_TOMBSTONE ON PATENTS AFTER DELETE AS
+        SET NOCOUNT ON;
+        INSERT INTO PATENT_TOMBSTONES (patent_number)
+        SELECT patent_number FROM deleted;');
+"""
+
+
+def get_changes_since(token: str = CHANGE_FEED_START, page_size: int = 1000) -> tuple[str, tuple]:
+    """Keyset page of PATENTS changes after a change-feed token.
+
+    Returns inserted/updated rows (operation 'upsert', current column
+    values) and deletes (operation 'delete', patent_number only) in
+    rowversion order. Versions at or above MIN_ACTIVE_ROWVERSION() are
+    held back until their transactions commit, so no change is skipped.
+    Both branches seek on a rowversion index, so a read costs O(changes).
+
+    Usage:
+        token = CHANGE_FEED_START  # or the consumer's saved token
+        while True:
+            sql, params = get_changes_since(token)
+            rows = cursor.execute(sql, params).fetchall()
+            if not rows:
+                break
+            process(rows)
+            token = next_change_token(rows, token)
+
+    Args:
+        token: Last token returned by next_change_token() ("0x" + 16 hex digits)
+        page_size: Maximum changes per page
+
+    Returns:
+        Tuple of (T-SQL query, parameters) for cursor.execute()
+    """
+    version = bytes.fromhex(token.removeprefix("0x").zfill(16))
+    sql = """
+SELECT TOP (?)
+    change_version, operation, patent_number, title, abstract, assignee,
+    inventors, filing_date, grant_date, cpc_codes, status_code, updated_at
+FROM (
+    SELECT
+        row_version AS change_version,
+        'upsert' AS operation,
+        patent_number, title, abstract, assignee, inventors,
+        filing_date, grant_date, cpc_codes, status_code, updated_at
+    FROM PATENTS
+    WHERE row_version > CAST(? AS BINARY(8))
+        AND row_version < MIN_ACTIVE_ROWVERSION()
+    UNION ALL
+    SELECT
+        deleted_version, 'delete', patent_number, NULL, NULL, NULL, NULL,
+        NULL, NULL, NULL, NULL, deleted_at
+    FROM PATENT_TOMBSTONES
+    WHERE deleted_version > CAST(? AS BINARY(8))
+        AND deleted_version < MIN_ACTIVE_ROWVERSION()
+) AS changes
+ORDER BY change_version;
+"""
+    return sql, (page_size, version, version)
+
+
+def next_change_token(rows: list, token: str = CHANGE_FEED_START) -> str:
+    """Token to pass to get_changes_since() after processing a page.
+
+    Args:
+        rows: Rows returned for the page (change_version first)
+        token: Token the page was read with (returned unchanged if empty)
+
+    Returns:
+        Change-feed token string ("0x" + 16 hex digits)
+    """
+    if not rows:
+        return token
+    return "0x" + bytes(rows[-1][0]).hex()
+
+
+def get_data_version_query() -> tuple[str, tuple]:
+    """Cheap version token of the loaded data, keying the analytics cache.
+
+    PATENTS.row_version and PATENT_TOMBSTONES.deleted_version come from
+    the database rowversion counter, so their maxima move on every insert,
+    update and delete, whichever loader wrote the row (syncs, backfill
+    queue workers, enrichment, ELT transforms). The latest SYNC_LOG row is
+    added for the QC sync history. Each part is one seek on an index.
+
+    Returns:
+        Tuple of (T-SQL query returning max_row_version, max_deleted_version,
+        sync_id, patents_loaded, sync_status; params)
+    """
+    sql = """
+SELECT
+    (SELECT CONVERT(BIGINT, MAX(row_version)) FROM PATENTS) AS max_row_version,
+    (SELECT CONVERT(BIGINT, MAX(deleted_version)) FROM PATENT_TOMBSTONES) AS max_deleted_version,
+    s.sync_id, s.patents_loaded, s.sync_status
+FROM (SELECT 1 AS one) AS anchor
+OUTER APPLY (
+    SELECT TOP (1) sync_id, patents_loaded, sync_status
+    FROM SYNC_LOG
+    ORDER BY sync_id DESC
+) AS s;
+"""
+    return sql, ()
+
+
+def build_split_partition_sql() -> str:
+    """Add a monthly partition boundary ahead of incoming data.
+
+    Sliding-window maintenance for partitioned PATENTS: run monthly to add
+    next month's boundary while its partition is still empty (a cheap,
+    metadata-only split). Does nothing if the boundary exists.
+    Parameter: month (YYYY-MM-01).
+
+    Returns:
+        T-SQL batch string
+    """
+    return """
+DECLARE @month DATE = ?;
+IF NOT EXISTS (
+    SELECT * FROM sys.partition_range_values AS rv
+    JOIN sys.partition_functions AS pf ON pf.function_id = rv.function_id
+    WHERE pf.name = '{function}' AND CAST(rv.value AS DATE) = @month
+)
+BEGIN
+    ALTER PARTITION SCHEME {scheme} NEXT USED [PRIMARY];
+    ALTER PARTITION FUNCTION {function}() SPLIT RANGE (@month);
+END;
+""".format(function=PARTITION_FUNCTION, scheme=PARTITION_SCHEME)
+
+
+def build_drop_partitions_before_sql() -> str:
+    """Truncate and merge away monthly partitions older than a cutoff.
+
+    Sliding-window retention for partitioned PATENTS: whole months before
+    the cutoff are removed with partition TRUNCATE (no row-by-row delete),
+    tombstoned for the change feed (TRUNCATE fires no trigger), and their
+    boundaries merged. The first partition (unknown filing dates and
+    anything before the first boundary) is kept. Parameter: cutoff
+    (YYYY-MM-01, a partition boundary).
+
+    Returns:
+        T-SQL batch string
+    """
+    return """
+SET NOCOUNT ON;
+DECLARE @cutoff DATE = ?;
+DECLARE @last INT = $PARTITION.{function}(@cutoff) - 1;
+DECLARE @first DATE = (
+    SELECT CAST(rv.value AS DATE) FROM sys.partition_range_values AS rv
+    JOIN sys.partition_functions AS pf ON pf.function_id = rv.function_id
+    WHERE pf.name = '{function}' AND rv.boundary_id = 1
+);
+
+IF @last >= 2
+BEGIN
+    INSERT INTO PATENT_TOMBSTONES (patent_number)
+    SELECT patent_number FROM PATENTS
+    WHERE filing_month >= @first AND filing_month < @cutoff;
+
+    DECLARE @truncate NVARCHAR(200) = N'TRUNCATE TABLE PATENTS WITH (PARTITIONS (2 TO '
+        + CAST(@last AS NVARCHAR(10)) + N'));';
+    EXEC sp_executesql @truncate;
+
+    DECLARE @boundary DATE;
+    WHILE 1 = 1
+    BEGIN
+        SET @boundary = (
+            SELECT MIN(CAST(rv.value AS DATE)) FROM sys.partition_range_values AS rv
+            JOIN sys.partition_functions AS pf ON pf.function_id = rv.function_id
+            WHERE pf.name = '{function}'
+        );
+        IF @boundary IS NULL OR @boundary >= @cutoff BREAK;
+        ALTER PARTITION FUNCTION {function}() MERGE RANGE (@boundary);
+    END;
+END;
+""".format(function=PARTITION_FUNCTION)
+
+
+def build_create_stage_sql() -> str:
+    """Generate T-SQL CREATE TABLE statement for the PATENTS_STAGE table.
+
+    Heap that a partition-scoped reload bulk-inserts into (see
+    build_stage_insert_query()) before build_reload_month_sql() swaps the
+    month's rows into PATENTS.
+
+    Returns:
+        T-SQL DDL string with table creation
+    """
+    return """
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'PATENTS_STAGE')
+CREATE TABLE PATENTS_STAGE (
+    stage_id BIGINT IDENTITY(1,1),
+    patent_number NVARCHAR(50) NOT NULL,
+    title NVARCHAR(500),
+    abstract NVARCHAR(MAX),
+    assignee NVARCHAR(300),
+    inventors NVARCHAR(MAX),
+    filing_date DATE,
+    grant_date DATE,
+    cpc_codes NVARCHAR(MAX),
+    status_code INT,
+    search_query NVARCHAR(200),
+    category NVARCHAR(100),
+    row_hash BIGINT,
+    stage_month AS ISNULL(
+        DATEFROMPARTS(YEAR(filing_date), MONTH(filing_date), 1),
+        CONVERT(DATE, '19000101', 112)
+    ) PERSISTED
+);
+"""
+
+
+def build_stage_insert_query() -> str:
+    """Parameterized INSERT into PATENTS_STAGE, in Patent.to_db_params() order.
+
+    Intended for cursor.executemany() with fast_executemany.
+
+    Returns:
+        T-SQL INSERT statement
+    """
+    return """
+INSERT INTO PATENTS_STAGE (
+    patent_number, title, abstract, assignee, inventors, filing_date,
+    grant_date, cpc_codes, status_code, search_query, category, row_hash
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+def build_reload_month_sql(compress_abstract: bool = False) -> str:
+    """Replace one filing month of partitioned PATENTS with the staged rows.
+
+    Truncates the month's partition and bulk-inserts the newest staged copy
+    of each patent filed that month, instead of a MERGE per row. Enriched
+    abstracts, grant dates and created_at survive the reload. Rows of other
+    categories (loaded by other sources) are carried over unchanged; rows
+    of the staged categories that the re-crawl no longer finds are
+    tombstoned. Staged patents whose filing month moved here are removed
+    from their old partition without leaving a tombstone. Run in one transaction (the caller commits).
+    Parameter: month (YYYY-MM-01, a partition boundary). Returns one row:
+    patents_loaded. Pass compress_abstract=True for a table created with it.
+
+    Returns:
+        T-SQL batch string
+    """
+    column, stored = _abstract_write(compress_abstract)
+    return """
+SET NOCOUNT ON;
+DECLARE @month DATE = ?;
+IF NOT EXISTS (
+    SELECT * FROM sys.partition_range_values AS rv
+    JOIN sys.partition_functions AS pf ON pf.function_id = rv.function_id
+    WHERE pf.name = '{function}' AND CAST(rv.value AS DATE) = @month
+)
+    THROW 50000, 'Reload month is not a PATENTS partition boundary', 1;
+
+DECLARE @truncate NVARCHAR(200) = N'TRUNCATE TABLE PATENTS WITH (PARTITIONS ('
+    + CAST($PARTITION.{function}(@month) AS NVARCHAR(10)) + N'));';
+
+-- Keep only the newest staged copy of each patent
+WITH ranked AS (
+    SELECT ROW_NUMBER() OVER (PARTITION BY patent_number ORDER BY stage_id DESC) AS rn
+    FROM PATENTS_STAGE
+    WHERE stage_month = @month
+)
+DELETE FROM ranked WHERE rn > 1;
+
+-- Current rows of the month, plus staged patents stored under another month
+DECLARE @kept TABLE (
+    patent_number NVARCHAR(50) PRIMARY KEY,
+    filing_month DATE,
+    title NVARCHAR(500),
+    abstract NVARCHAR(MAX),
+    assignee NVARCHAR(300),
+    inventors NVARCHAR(MAX),
+    filing_date DATE,
+    grant_date DATE,
+    cpc_codes NVARCHAR(MAX),
+    status_code INT,
+    search_query NVARCHAR(200),
+    category NVARCHAR(100),
+    row_hash BIGINT,
+    created_at DATETIME2,
+    updated_at DATETIME2,
+    staged BIT,
+    carry_over BIT
+);
+INSERT INTO @kept
+SELECT
+    p.patent_number, p.filing_month, p.title, p.abstract, p.assignee,
+    p.inventors, p.filing_date, p.grant_date, p.cpc_codes, p.status_code,
+    p.search_query, p.category, p.row_hash, p.created_at, p.updated_at,
+    CASE WHEN s.patent_number IS NULL THEN 0 ELSE 1 END,
+    CASE WHEN s.patent_number IS NULL AND NOT EXISTS (
+        SELECT * FROM PATENTS_STAGE
+        WHERE stage_month = @month AND ISNULL(category, '') = ISNULL(p.category, '')
+    ) THEN 1 ELSE 0 END
+FROM PATENTS AS p
+LEFT JOIN PATENTS_STAGE AS s
+    ON s.patent_number = p.patent_number AND s.stage_month = @month
+WHERE p.filing_month = @month OR s.patent_number IS NOT NULL;
+
+-- TRUNCATE fires no trigger, so tombstone re-crawled rows that disappeared
+INSERT INTO PATENT_TOMBSTONES (patent_number)
+SELECT patent_number FROM @kept
+WHERE filing_month = @month AND staged = 0 AND carry_over = 0;
+
+-- Moved rows are re-inserted below, so drop the tombstones the delete
+-- trigger leaves for them (readers never see them before the commit)
+DECLARE @before BINARY(8) = @@DBTS;
+DELETE p FROM PATENTS AS p
+JOIN @kept AS k ON k.patent_number = p.patent_number
+WHERE k.staged = 1 AND p.filing_month <> @month;
+
+DELETE t FROM PATENT_TOMBSTONES AS t
+JOIN @kept AS k ON k.patent_number = t.patent_number
+WHERE t.deleted_version > @before AND k.staged = 1 AND k.filing_month <> @month;
+
+EXEC sp_executesql @truncate;
+
+INSERT INTO PATENTS (
+    patent_number, title, {column}, assignee, inventors,
+    filing_date, grant_date, cpc_codes, status_code, search_query, category,
+    row_hash, created_at, updated_at
+)
+SELECT
+    s.patent_number, s.title, {new_abstract},
+    s.assignee, s.inventors, s.filing_date, COALESCE(s.grant_date, k.grant_date),
+    s.cpc_codes, s.status_code, s.search_query, s.category,
+    s.row_hash, ISNULL(k.created_at, GETDATE()), GETDATE()
+FROM PATENTS_STAGE AS s
+LEFT JOIN @kept AS k ON k.patent_number = s.patent_number
+WHERE s.stage_month = @month;
+
+DECLARE @loaded INT = @@ROWCOUNT;
+
+INSERT INTO PATENTS (
+    patent_number, title, {column}, assignee, inventors,
+    filing_date, grant_date, cpc_codes, status_code, search_query, category,
+    row_hash, created_at, updated_at
+)
+SELECT
+    patent_number, title, {kept_abstract}, assignee, inventors,
+    filing_date, grant_date, cpc_codes, status_code, search_query, category,
+    row_hash, created_at, updated_at
+FROM @kept
+WHERE carry_over = 1;
+
+DELETE FROM PATENTS_STAGE WHERE stage_month = @month;
+
+SELECT @loaded AS patents_loaded;
+""".format(
+        function=PARTITION_FUNCTION,
+        column=column,
+        new_abstract=stored.format("COALESCE(NULLIF(s.abstract, ''), k.abstract)"),
+        kept_abstract=stored.format("abstract"),
+    )
+
+
+def build_set_compression_sql(data_compression: str = "PAGE") -> str:
+    """Rebuild an existing PATENTS table and its indexes with data compression.
+
+    Args:
+        data_compression: "NONE", "ROW" or "PAGE"
+
+    Returns:
+        T-SQL ALTER INDEX statement
+    """
+    return f"""
+ALTER INDEX ALL ON PATENTS REBUILD{_compression_clause(data_compression)};
+"""
+
+
+def get_size_report_query(data_compression: str = "PAGE") -> str:
+    """Bytes per PATENTS row now versus with compression applied.
+
+    One row per index and partition from sp_estimate_data_compression_savings
+    (in-row data only), plus an 'abstract (COMPRESS)' row comparing average
+    abstract bytes stored plainly and through COMPRESS(), since row/page
+    compression does not reach off-row NVARCHAR(MAX) values.
+
+    Args:
+        data_compression: Setting to estimate ("NONE", "ROW" or "PAGE")
+
+    Returns:
+        T-SQL batch string returning index_name, partition_number, row_count,
+        current_compression, bytes_per_row_now, bytes_per_row_compressed
+    """
+    level = _compression_level(data_compression)
+    return f"""
+SET NOCOUNT ON;
+DECLARE @estimate TABLE (
+    object_name SYSNAME,
+    schema_name SYSNAME,
+    index_id INT,
+    partition_number INT,
+    current_kb BIGINT,
+    requested_kb BIGINT,
+    sample_current_kb BIGINT,
+    sample_requested_kb BIGINT
+);
+INSERT INTO @estimate
+EXEC sp_estimate_data_compression_savings 'dbo', 'PATENTS', NULL, NULL, '{level}';
+
+SELECT
+    ISNULL(i.name, 'heap') AS index_name,
+    e.partition_number,
+    ps.row_count,
+    p.data_compression_desc AS current_compression,
+    e.current_kb * 1024.0 / NULLIF(ps.row_count, 0) AS bytes_per_row_now,
+    e.requested_kb * 1024.0 / NULLIF(ps.row_count, 0) AS bytes_per_row_compressed
+FROM @estimate AS e
+JOIN sys.indexes AS i
+    ON i.object_id = OBJECT_ID('PATENTS') AND i.index_id = e.index_id
+JOIN sys.dm_db_partition_stats AS ps
+    ON ps.object_id = i.object_id AND ps.index_id = i.index_id
+    AND ps.partition_number = e.partition_number
+JOIN sys.partitions AS p ON p.partition_id = ps.partition_id
+UNION ALL
+SELECT
+    'abstract (COMPRESS)',
+    NULL,
+    COUNT(*),
+    CASE WHEN COL_LENGTH('PATENTS', 'abstract_gz') IS NULL THEN 'NONE' ELSE 'GZIP' END,
+    AVG(CAST(DATALENGTH(abstract) AS FLOAT)),
+    AVG(CAST(DATALENGTH(COMPRESS(abstract)) AS FLOAT))
+FROM PATENTS
+WHERE abstract <> ''
+ORDER BY index_name, partition_number;
+"""
+
+
+def build_create_run_metrics_sql() -> str:
+    """Generate T-SQL CREATE TABLE statement for SYNC_RUN_METRICS table.
+
+    One row per daily sync invocation or backfill run, for spotting
+    performance regressions (see sql/17_run_metrics_qc.sql).
+
+    Returns:
+        T-SQL DDL string with table creation and index statements
+    """
+    return """
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'SYNC_RUN_METRICS')
+CREATE TABLE SYNC_RUN_METRICS (
+    run_id INT IDENTITY(1,1) PRIMARY KEY,
+    run_type NVARCHAR(50) NOT NULL,    -- 'daily_sync', 'cpc_backfill', ...
+    sync_id INT NULL,                  -- SYNC_LOG row of the run, if any
+    started_at DATETIME2 NOT NULL,
+    duration_seconds FLOAT NOT NULL,
+    api_calls INT,
+    bytes_downloaded BIGINT,
+    api_retries INT,
+    db_round_trips INT,
+    rows_inserted INT,
+    rows_updated INT,
+    rows_unchanged INT,
+    peak_memory_mb FLOAT,
+    run_status NVARCHAR(20)
+);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_SYNC_RUN_METRICS_TYPE')
+    CREATE INDEX IX_SYNC_RUN_METRICS_TYPE ON SYNC_RUN_METRICS (run_type, run_id);
+"""
+
+
+def build_insert_run_metrics_query() -> str:
+    """Parameterized INSERT of one SYNC_RUN_METRICS row.
+
+    Parameters: run_type, sync_id, started_at, duration_seconds, api_calls,
+    bytes_downloaded, api_retries, db_round_trips, rows_inserted,
+    rows_updated, rows_unchanged, peak_memory_mb, run_status.
+
+    Returns:
+        T-SQL INSERT statement
+    """
+    return """
+INSERT INTO SYNC_RUN_METRICS (
+    run_type, sync_id, started_at, duration_seconds, api_calls,
+    bytes_downloaded, api_retries, db_round_trips, rows_inserted,
+    rows_updated, rows_unchanged, peak_memory_mb, run_status
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+def get_run_row_changes_query() -> str:
+    """Rows a run inserted and updated, found via the rowversion index.
+
+    Counts PATENTS rows of the run's category written after the run's
+    starting rowversion; rows created after the run started were inserted,
+    the rest updated. Parameters: run_started_at (server time),
+    start_version (8-byte rowversion), category.
+
+    Returns:
+        Parameterized T-SQL query returning rows_inserted, rows_updated
+    """
+    return """
+DECLARE @started_at DATETIME2 = ?;
+SELECT
+    ISNULL(SUM(CASE WHEN created_at >= @started_at THEN 1 ELSE 0 END), 0) AS rows_inserted,
+    ISNULL(SUM(CASE WHEN created_at < @started_at THEN 1 ELSE 0 END), 0) AS rows_updated
+FROM PATENTS
+WHERE row_version > CAST(? AS BINARY(8))
+    AND category = ?;
 """
@@ -0,0 +1,197 @@
+"""Lightweight timers and counters for the search and load hot paths.
+
+Instrumentation is off until a sink is installed; while off, timer() hands
+back a shared no-op context manager and count() returns immediately, so the
+hooks left in hot loops cost one list check. Sinks receive plain event
+dicts:
+
+    {"type": "timer", "name": "uspto.request", "seconds": 0.412,
+     "items": 25, "items_per_sec": 60.7, "status": 200, "bytes": 48213}
+    {"type": "count", "name": "uspto.rate_limited", "value": 1}
+
+Available sinks: LogSink (one log line per event), JsonLinesSink (append
+to a .jsonl file), AppInsightsSink (Application Insights custom metrics,
+needs azure-monitor-opentelemetry). configure_from_env() installs them from
+the INSTRUMENTATION environment variable, a comma-separated list of
+"log", "jsonl:<path>" and "appinsights".
+
+Usage:
+    with timer("db.upsert_batch", source=topic) as t:
+        ...
+        t.set(items=rows_loaded)
+    count("uspto.rate_limited")
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+_sinks: list = []
+_logger = logging.getLogger("patent_instrumentation")
+
+
+def enabled() -> bool:
+    """True when at least one sink is installed."""
+    return bool(_sinks)
+
+
+def add_sink(sink) -> None:
+    """Install a sink: any object with an emit(event: dict) method."""
+    _sinks.append(sink)
+
+
+def remove_sink(sink) -> None:
+    """Uninstall a sink added with add_sink()."""
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def clear_sinks() -> None:
+    """Remove all sinks (turns instrumentation off)."""
+    _sinks.clear()
+
+
+def configure_from_env(var: str = "INSTRUMENTATION") -> None:
+    """Install sinks named in an environment variable (see module docstring)."""
+    for spec in filter(None, (s.strip() for s in os.environ.get(var, "").split(","))):
+        if spec == "log":
+            add_sink(LogSink())
+        elif spec.startswith("jsonl:"):
+            add_sink(JsonLinesSink(spec.split(":", 1)[1]))
+        elif spec == "appinsights":
+            add_sink(AppInsightsSink())
+        else:
+            raise ValueError(f"Unknown {var} sink: {spec!r}")
+
+
+def count(name: str, value: float = 1, **tags) -> None:
+    """Record a counter increment."""
+    if not _sinks:
+        return
+    _emit({"type": "count", "name": name, "value": value, **tags})
+
+
+def timer(name: str, **tags):
+    """Context manager timing a block; call .set() on it to attach fields.
+
+    An integer "items" field also produces items_per_sec.
+    """
+    if not _sinks:
+        return _NULL_TIMER
+    return _Timer(name, tags)
+
+
+class _Timer:
+    __slots__ = ("name", "fields", "_started")
+
+    def __init__(self, name: str, fields: dict):
+        self.name = name
+        self.fields = fields
+
+    def set(self, **fields) -> None:
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._started
+        event = {"type": "timer", "name": self.name, "seconds": round(seconds, 6), **self.fields}
+        if "items" in self.fields and seconds > 0:
+            event["items_per_sec"] = round(self.fields["items"] / seconds, 1)
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        _emit(event)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def set(self, **fields) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _emit(event: dict) -> None:
+    for sink in _sinks:
+        try:
+            sink.emit(event)
+        except Exception as e:  # Telemetry must never break a sync
+            _logger.warning(f"Instrumentation sink {type(sink).__name__} failed: {e}")
+
+
+class LogSink:
+    """Writes each event as one log line."""
+
+    def __init__(self, level: int = logging.INFO):
+        self.level = level
+
+    def emit(self, event: dict) -> None:
+        fields = " ".join(f"{k}={v}" for k, v in event.items() if k not in ("type", "name"))
+        _logger.log(self.level, f"[{event['type']}] {event['name']} {fields}")
+
+
+class JsonLinesSink:
+    """Appends each event as a JSON line (with a timestamp) to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, event: dict) -> None:
+        line = json.dumps({"ts": time.time(), **event}, default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+class AppInsightsSink:
+    """Sends events to Application Insights as custom metrics.
+
+    Timers become a "<name>.seconds" histogram (plus a "<name>.items"
+    counter when items is set) and counters a "<name>" counter; string
+    fields become metric dimensions. Uses the connection string in
+    APPLICATIONINSIGHTS_CONNECTION_STRING.
+    """
+
+    def __init__(self):
+        try:
+            from azure.monitor.opentelemetry import configure_azure_monitor
+            from opentelemetry import metrics
+        except ImportError as e:
+            raise ImportError(
+                "AppInsightsSink requires azure-monitor-opentelemetry "
+                "(pip install azure-monitor-opentelemetry)"
+            ) from e
+        configure_azure_monitor()
+        self._meter = metrics.get_meter("patent_intelligence")
+        self._instruments = {}
+        self._lock = threading.Lock()
+
+    def emit(self, event: dict) -> None:
+        dimensions = {k: v for k, v in event.items() if isinstance(v, str) and k not in ("type", "name")}
+        if event["type"] == "timer":
+            self._instrument(f"{event['name']}.seconds", histogram=True).record(
+                event["seconds"], attributes=dimensions
+            )
+            if "items" in event:
+                self._instrument(f"{event['name']}.items").add(event["items"], attributes=dimensions)
+        else:
+            self._instrument(event["name"]).add(event["value"], attributes=dimensions)
+
+    def _instrument(self, name: str, histogram: bool = False):
+        with self._lock:
+            if name not in self._instruments:
+                create = self._meter.create_histogram if histogram else self._meter.create_counter
+                self._instruments[name] = create(name)
+            return self._instruments[name]
@@ -0,0 +1,573 @@
+"""Offline full-text search over PATENTS titles and abstracts.
+
+A LocalSearchIndex is fed from the PATENTS change feed (get_changes_since):
+the first sync indexes every row, later syncs apply only the rows changed
+since the saved token, including deletes. Once saved, it answers queries
+with no database or network access.
+
+Postings are NumPy arrays in CSR layout. Per term, a slice of document ids;
+per posting, a slice of word positions (the term frequency is the slice
+length), used for phrase matching. Each sync indexes its changed rows
+into a new segment and masks out their old postings; compact() merges the
+segments back into one. Scores (Okapi BM25, or TF-IDF) are accumulated
+over whole posting arrays at once.
+
+Queries use the search_by_title() syntax described in patent_search.py:
+bare terms OR'd by default, "quoted phrases" matched as contiguous words,
+AND / OR / NOT, parentheses, field: prefixes (ignored) and trailing *
+wildcards, with the same plural folding as title_matches(). A phrase
+never spans from the title into the abstract.
+
+Usage:
+    index = LocalSearchIndex.load(path) if os.path.exists(path) else LocalSearchIndex()
+    index.sync(cursor)  # apply changes since the last sync
+    index.save(path)
+    for hit in index.search('"neural network" AND training', cpc="G06N",
+                            filing_date_from="2025-01-01"):
+        print(f"{hit.score:.2f} {hit.patent_number} {hit.title}")
+"""
+import bisect
+import json
+import os
+import pickle
+from datetime import date
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .azure_sql_queries import CHANGE_FEED_START, get_changes_since, next_change_token
+from .query_syntax import normalized_words, query_tokens
+
+# Changed rows indexed per segment while syncing
+SEGMENT_ROWS = 50_000
+
+# Merge segments once a sync leaves more than this many, or when more than
+# this fraction of indexed documents are stale versions
+MAX_SEGMENTS = 8
+MAX_DEAD_FRACTION = 0.2
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_FORMAT_VERSION = 1
+_EPOCH = date(1970, 1, 1)
+_NO_DATE = np.iinfo(np.int32).min
+_POSITION_SPAN = 1 << 32  # phrase keys: posting * span + position
+
+
+class SearchHit(NamedTuple):
+    """One ranked search result."""
+
+    patent_number: str
+    title: str
+    filing_date: Optional[str]
+    score: float
+
+
+class _Segment(NamedTuple):
+    """CSR postings for the documents indexed by one sync (or a merge)."""
+
+    term_ptr: np.ndarray   # term id -> slice of doc_ids (shorter if the vocabulary grew since)
+    doc_ids: np.ndarray    # int32, ascending within each term
+    pos_ptr: np.ndarray    # posting -> slice of positions
+    positions: np.ndarray  # int32 word positions
+
+    def postings(self, term_id: int) -> tuple[int, int]:
+        if term_id + 1 >= len(self.term_ptr):
+            return 0, 0
+        return int(self.term_ptr[term_id]), int(self.term_ptr[term_id + 1])
+
+
+class LocalSearchIndex:
+    """Inverted index of PATENTS titles and abstracts, kept current from the change feed."""
+
+    def __init__(self):
+        self.token = CHANGE_FEED_START
+        self._vocab = {}   # term -> term id
+        self._terms = []   # term id -> term
+        self._segments = []
+        self._numbers = []  # doc id -> patent number
+        self._titles = []
+        self._cpcs = []    # doc id -> tuple of normalized CPC codes
+        self._lengths = np.zeros(0, np.float32)
+        self._filing_days = np.zeros(0, np.int32)
+        self._live = np.zeros(0, bool)
+        self._doc_of = {}  # patent number -> live doc id
+        self._sorted_terms = None
+        self._cpc_index = None
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    # --- Updates ---
+
+    def sync(self, cursor, page_size: int = 5000) -> int:
+        """Apply every PATENTS change since the last sync.
+
+        Args:
+            cursor: pyodbc cursor on the patents database
+            page_size: Changes read per round trip
+
+        Returns:
+            Number of changes applied (upserts and deletes)
+        """
+        pending = {}  # patent number -> latest upserted row
+        applied = 0
+        while True:
+            sql, params = get_changes_since(self.token, page_size)
+            rows = cursor.execute(sql, params).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                pending.pop(row.patent_number, None)
+                self._remove(row.patent_number)
+                if row.operation == "upsert":
+                    pending[row.patent_number] = row
+            self.token = next_change_token(rows, self.token)
+            applied += len(rows)
+            if len(pending) >= SEGMENT_ROWS:
+                self.add(pending.values())
+                pending = {}
+        if pending:
+            self.add(pending.values())
+
+        dead = len(self._numbers) - len(self._doc_of)
+        if len(self._segments) > MAX_SEGMENTS or dead > MAX_DEAD_FRACTION * len(self._numbers):
+            self.compact()
+        return applied
+
+    def add(self, rows) -> None:
+        """Index (or re-index) rows as one new segment.
+
+        Args:
+            rows: Objects with patent_number, title, abstract, cpc_codes
+                (JSON array text or list) and filing_date attributes, e.g.
+                change-feed or PATENTS rows
+        """
+        occ_terms, occ_docs, occ_pos = [], [], []
+        lengths, days = [], []
+        # Keep the last version of a patent listed more than once
+        for row in {row.patent_number: row for row in rows}.values():
+            self._remove(row.patent_number)
+            doc = len(self._numbers)
+            title_words = normalized_words(row.title)
+            abstract_words = normalized_words(row.abstract)
+            # Leave a gap so no phrase matches across the title/abstract boundary
+            positions = list(range(len(title_words)))
+            positions += range(len(title_words) + 1, len(title_words) + 1 + len(abstract_words))
+            for word, position in zip(title_words + abstract_words, positions):
+                occ_terms.append(self._term_id(word))
+                occ_docs.append(doc)
+                occ_pos.append(position)
+
+            self._numbers.append(row.patent_number)
+            self._titles.append(row.title or "")
+            self._cpcs.append(_cpc_codes(row.cpc_codes))
+            self._doc_of[row.patent_number] = doc
+            lengths.append(len(positions))
+            days.append(_day_number(row.filing_date))
+        if not lengths:
+            return
+
+        self._segments.append(_build_segment(
+            np.array(occ_terms, np.int32), np.array(occ_docs, np.int32),
+            np.array(occ_pos, np.int32), len(self._terms),
+        ))
+        self._lengths = np.concatenate([self._lengths, np.array(lengths, np.float32)])
+        self._filing_days = np.concatenate([self._filing_days, np.array(days, np.int32)])
+        self._live = np.concatenate([self._live, np.ones(len(lengths), bool)])
+        self._cpc_index = None
+
+    def compact(self) -> None:
+        """Merge all segments into one and drop stale document versions."""
+        live = self._live
+        remap = (np.cumsum(live) - 1).astype(np.int32)
+        terms, docs, tfs, positions = [], [], [], []
+        for segment in self._segments:
+            term_of = np.repeat(
+                np.arange(len(segment.term_ptr) - 1, dtype=np.int32), np.diff(segment.term_ptr)
+            )
+            keep = np.flatnonzero(live[segment.doc_ids])
+            terms.append(term_of[keep])
+            docs.append(remap[segment.doc_ids[keep]])
+            tfs.append(np.diff(segment.pos_ptr)[keep])
+            positions.append(_gather(segment.pos_ptr, segment.positions, keep)[1])
+
+        if self._segments:
+            terms, docs, tfs = np.concatenate(terms), np.concatenate(docs), np.concatenate(tfs)
+            # Segments hold ascending doc ids, so a stable sort on term keeps
+            # every term's documents in order
+            order = np.argsort(terms, kind="stable")
+            _, merged_positions = _gather(_ptr(tfs), np.concatenate(positions), order)
+            self._segments = [_Segment(
+                term_ptr=_ptr(np.bincount(terms, minlength=len(self._terms))),
+                doc_ids=docs[order],
+                pos_ptr=_ptr(tfs[order]),
+                positions=merged_positions,
+            )]
+
+        kept = np.flatnonzero(live)
+        self._numbers = [self._numbers[i] for i in kept]
+        self._titles = [self._titles[i] for i in kept]
+        self._cpcs = [self._cpcs[i] for i in kept]
+        self._lengths = self._lengths[kept]
+        self._filing_days = self._filing_days[kept]
+        self._live = np.ones(len(kept), bool)
+        self._doc_of = {number: doc for doc, number in enumerate(self._numbers)}
+        self._cpc_index = None
+
+    # --- Search ---
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        cpc: Optional[str] = None,
+        filing_date_from: Optional[str] = None,
+        filing_date_to: Optional[str] = None,
+        scoring: str = "bm25",
+    ) -> list[SearchHit]:
+        """Rank documents matching a keyword query.
+
+        Args:
+            query: Keyword query in search_by_title() syntax
+            limit: Maximum number of hits
+            cpc: Only patents with a CPC code starting with this prefix
+                (whitespace-insensitive, as cpc_matches())
+            filing_date_from: Earliest filing date (YYYY-MM-DD), or None
+            filing_date_to: Latest filing date (YYYY-MM-DD), or None
+            scoring: "bm25" or "tfidf"
+
+        Returns:
+            Hits by descending score (ties in index order)
+        """
+        if scoring not in ("bm25", "tfidf"):
+            raise ValueError(f"Unknown scoring: {scoring!r}")
+        if limit < 1:
+            return []
+        evaluator = _MaskQuery(self, query_tokens(query))
+        mask = evaluator.evaluate() & self._live
+        if cpc:
+            mask &= self.cpc_mask(cpc)
+        if filing_date_from or filing_date_to:
+            mask &= self.date_mask(filing_date_from, filing_date_to)
+
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+        scores = self._score(evaluator.scoring_terms, scoring)[candidates]
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        order = np.lexsort((candidates, -scores))[:limit]
+        return [
+            SearchHit(
+                patent_number=self._numbers[doc],
+                title=self._titles[doc],
+                filing_date=_iso_date(self._filing_days[doc]),
+                score=float(score),
+            )
+            for doc, score in zip(candidates[order], scores[order])
+        ]
+
+    def term_mask(self, term_ids) -> np.ndarray:
+        """Documents containing any of the given term ids."""
+        mask = np.zeros(len(self._numbers), bool)
+        for term_id in term_ids:
+            for segment in self._segments:
+                start, end = segment.postings(term_id)
+                mask[segment.doc_ids[start:end]] = True
+        return mask
+
+    def phrase_mask(self, words: list[str]) -> np.ndarray:
+        """Documents containing the normalized words as a contiguous run."""
+        mask = np.zeros(len(self._numbers), bool)
+        term_ids = [self._vocab.get(word) for word in words]
+        if not words or None in term_ids:
+            return mask
+        if len(term_ids) == 1:
+            return self.term_mask(term_ids)
+
+        for segment in self._segments:
+            slices = [segment.postings(term_id) for term_id in term_ids]
+            candidates = segment.doc_ids[slices[0][0]:slices[0][1]]
+            for start, end in slices[1:]:
+                candidates = np.intersect1d(candidates, segment.doc_ids[start:end], assume_unique=True)
+            if not len(candidates):
+                continue
+            # Key each occurrence as (candidate rank, position - offset in
+            # phrase); a key present for every word is a phrase match
+            keys = None
+            for offset, (start, end) in enumerate(slices):
+                postings = start + np.searchsorted(segment.doc_ids[start:end], candidates)
+                owner, positions = _gather(segment.pos_ptr, segment.positions, postings)
+                word_keys = owner * _POSITION_SPAN + (positions.astype(np.int64) - offset + len(slices))
+                keys = word_keys if keys is None else np.intersect1d(keys, word_keys)
+            mask[candidates[np.unique(keys // _POSITION_SPAN)]] = True
+        return mask
+
+    def prefix_terms(self, prefix: str) -> list[int]:
+        """Term ids of every indexed term starting with prefix."""
+        if self._sorted_terms is None or len(self._sorted_terms) != len(self._terms):
+            self._sorted_terms = sorted(self._terms)
+        lo = bisect.bisect_left(self._sorted_terms, prefix)
+        hi = bisect.bisect_left(self._sorted_terms, prefix + "\uffff")
+        return [self._vocab[term] for term in self._sorted_terms[lo:hi]]
+
+    def cpc_mask(self, prefix: str) -> np.ndarray:
+        """Documents with a CPC code starting with prefix."""
+        if self._cpc_index is None:
+            by_code = {}
+            for doc, codes in enumerate(self._cpcs):
+                for code in codes:
+                    by_code.setdefault(code, []).append(doc)
+            codes = sorted(by_code)
+            self._cpc_index = (codes, [np.array(by_code[code], np.int32) for code in codes])
+        codes, docs = self._cpc_index
+        prefix = "".join(prefix.split()).upper()
+        lo = bisect.bisect_left(codes, prefix)
+        hi = bisect.bisect_left(codes, prefix + "\uffff")
+        mask = np.zeros(len(self._numbers), bool)
+        if hi > lo:
+            mask[np.concatenate(docs[lo:hi])] = True
+        return mask
+
+    def date_mask(self, date_from: Optional[str], date_to: Optional[str]) -> np.ndarray:
+        """Documents filed within [date_from, date_to]; undated ones never match."""
+        mask = self._filing_days != _NO_DATE
+        if date_from:
+            mask &= self._filing_days >= _day_number(date_from)
+        if date_to:
+            mask &= self._filing_days <= _day_number(date_to)
+        return mask
+
+    # --- Persistence ---
+
+    def save(self, path: str) -> None:
+        """Write the index (compacted if stale versions remain) atomically."""
+        if len(self._segments) > 1 or len(self._doc_of) < len(self._numbers):
+            self.compact()
+        state = {
+            "version": _FORMAT_VERSION,
+            "token": self.token,
+            "terms": self._terms,
+            "segments": [tuple(segment) for segment in self._segments],
+            "numbers": self._numbers,
+            "titles": self._titles,
+            "cpcs": self._cpcs,
+            "lengths": self._lengths,
+            "filing_days": self._filing_days,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalSearchIndex":
+        """Read an index written by save()."""
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported index format {state.get('version')!r}")
+        index = cls()
+        index.token = state["token"]
+        index._terms = state["terms"]
+        index._vocab = {term: term_id for term_id, term in enumerate(index._terms)}
+        index._segments = [_Segment(*segment) for segment in state["segments"]]
+        index._numbers = state["numbers"]
+        index._titles = state["titles"]
+        index._cpcs = state["cpcs"]
+        index._lengths = state["lengths"]
+        index._filing_days = state["filing_days"]
+        index._live = np.ones(len(index._numbers), bool)
+        index._doc_of = {number: doc for doc, number in enumerate(index._numbers)}
+        return index
+
+    # --- Internals ---
+
+    def _term_id(self, word: str) -> int:
+        term_id = self._vocab.get(word)
+        if term_id is None:
+            term_id = self._vocab[word] = len(self._terms)
+            self._terms.append(word)
+        return term_id
+
+    def _remove(self, patent_number: str) -> None:
+        doc = self._doc_of.pop(patent_number, None)
+        if doc is not None:
+            self._live[doc] = False
+
+    def _score(self, term_ids: set, scoring: str) -> np.ndarray:
+        scores = np.zeros(len(self._numbers), np.float32)
+        n_docs = len(self._doc_of)
+        if not n_docs:
+            return scores
+        avg_length = max(float(self._lengths[self._live].mean()), 1.0)
+        for term_id in term_ids:
+            slices = [(segment, *segment.postings(term_id)) for segment in self._segments]
+            df = sum(int(np.count_nonzero(self._live[s.doc_ids[start:end]]))
+                     for s, start, end in slices)
+            if not df:
+                continue
+            if scoring == "bm25":
+                idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            else:
+                idf = np.log(1.0 + n_docs / df)
+            for segment, start, end in slices:
+                # A term's documents are unique within a segment, and a live
+                # document is in exactly one segment: plain fancy-index adds
+                docs = segment.doc_ids[start:end]
+                tf = (segment.pos_ptr[start + 1:end + 1] - segment.pos_ptr[start:end]).astype(np.float32)
+                if scoring == "bm25":
+                    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self._lengths[docs] / avg_length)
+                    scores[docs] += idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+                else:
+                    scores[docs] += idf * (1.0 + np.log(tf))
+        return scores
+
+
+class _MaskQuery:
+    """search_by_title() query evaluated to a document mask (cf. _KeywordQuery)."""
+
+    def __init__(self, index: LocalSearchIndex, tokens: list[str]):
+        self.index = index
+        self.tokens = tokens
+        self.pos = 0
+        self.negated = False
+        self.scoring_terms = set()  # term ids of non-negated clauses
+
+    def evaluate(self) -> np.ndarray:
+        if not self.tokens:
+            return np.zeros(len(self.index._numbers), bool)
+        return self._or_expr()
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _or_expr(self) -> np.ndarray:
+        # Lucene default operator is OR; a bare NOT clause excludes instead.
+        positive, negative = [], []
+        while self._peek() not in (None, ")"):
+            if self._peek() == "OR":
+                self.pos += 1
+                continue
+            if self._peek() == "NOT":
+                self.pos += 1
+                negative.append(self._negated(self._and_expr))
+                continue
+            positive.append(self._and_expr())
+        result = np.logical_or.reduce(positive) if positive else np.ones(len(self.index._numbers), bool)
+        for mask in negative:
+            result &= ~mask
+        return result
+
+    def _and_expr(self) -> np.ndarray:
+        result = self._unary()
+        while self._peek() == "AND":
+            self.pos += 1
+            result = self._unary() & result
+        return result
+
+    def _unary(self) -> np.ndarray:
+        if self._peek() == "NOT":
+            self.pos += 1
+            return ~self._negated(self._unary)
+        return self._primary()
+
+    def _negated(self, parse) -> np.ndarray:
+        self.negated = not self.negated
+        try:
+            return parse()
+        finally:
+            self.negated = not self.negated
+
+    def _primary(self) -> np.ndarray:
+        token = self._peek()
+        if token is None:
+            return np.zeros(len(self.index._numbers), bool)
+        self.pos += 1
+        if token == "(":
+            result = self._or_expr()
+            if self._peek() == ")":
+                self.pos += 1
+            return result
+        if token.startswith('"'):
+            phrase = normalized_words(token)
+            self._scores(self.index._vocab.get(word) for word in phrase)
+            return self.index.phrase_mask(phrase)
+        if ":" in token:
+            token = token.split(":", 1)[1]
+        if token.endswith("*"):
+            term_ids = self.index.prefix_terms(token[:-1].lower())
+        else:
+            term_ids = [self.index._vocab.get(word) for word in normalized_words(token)]
+        self._scores(term_ids)
+        return self.index.term_mask(t for t in term_ids if t is not None)
+
+    def _scores(self, term_ids) -> None:
+        if not self.negated:
+            self.scoring_terms.update(t for t in term_ids if t is not None)
+
+
+def _cpc_codes(value) -> tuple:
+    """Normalized CPC codes from a JSON array string (as stored) or a list."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = []
+    return tuple("".join(str(code).split()).upper() for code in value or ())
+
+
+def _day_number(value) -> int:
+    """Days since 1970-01-01 for a date, datetime or YYYY-MM-DD string."""
+    if not value:
+        return _NO_DATE
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    elif hasattr(value, "date"):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def _iso_date(day: int) -> Optional[str]:
+    if day == _NO_DATE:
+        return None
+    return date.fromordinal(_EPOCH.toordinal() + int(day)).isoformat()
+
+
+def _ptr(lengths: np.ndarray) -> np.ndarray:
+    """CSR offsets (length + 1) from per-row lengths."""
+    ptr = np.zeros(len(lengths) + 1, np.int64)
+    np.cumsum(lengths, out=ptr[1:])
+    return ptr
+
+
+def _gather(ptr: np.ndarray, values: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate the CSR slices of the given rows.
+
+    Returns:
+        Tuple of (index into rows of each value's row, values)
+    """
+    starts, lengths = ptr[rows], ptr[rows + 1] - ptr[rows]
+    owner = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+    within = np.arange(int(lengths.sum()), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owner, values[np.repeat(starts, lengths) + within]
+
+
+def _build_segment(terms: np.ndarray, docs: np.ndarray, positions: np.ndarray, n_terms: int) -> _Segment:
+    """CSR segment from one entry per word occurrence."""
+    order = np.lexsort((positions, docs, terms))
+    terms, docs, positions = terms[order], docs[order], positions[order]
+    # A posting starts wherever the (term, doc) pair changes
+    changed = (terms[1:] != terms[:-1]) | (docs[1:] != docs[:-1])
+    starts = np.flatnonzero(np.r_[len(terms) > 0, changed])
+    pos_ptr = np.append(starts, len(positions)).astype(np.int64)
+    return _Segment(
+        term_ptr=_ptr(np.bincount(terms[starts], minlength=n_terms)),
+        doc_ids=docs[starts],
+        pos_ptr=pos_ptr,
+        positions=positions,
+    )
@@ -24,19 +24,210 @@ For precise searches, use these techniques:
      - search_by_cpc("E05B47")  -> electronic locks specifically
      - CPC codes eliminate keyword ambiguity entirely
 """
+import html
 import json
 import os
+import re
+import threading
+import time
 import urllib.parse
 import urllib.request
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, NamedTuple, Optional
+from xml.etree import ElementTree
+
+from .instrumentation import count, timer
+from .patent_record import Patent
+from .query_syntax import normalize_token, normalized_words, query_tokens, words
 
 
 # USPTO Open Data Portal API
 USPTO_ODP_API = "https://api.uspto.gov/api/v1/patent/applications/search"
+USPTO_ODP_APPLICATION_API = "https://api.uspto.gov/api/v1/patent/applications"
 
 # Google Patents API (fallback)
 GOOGLE_PATENTS_API = "https://patents.google.com/xhr/query"
 
+# Max topics/CPC prefixes OR'd into one coalesced query. Keeps the Lucene
+# query short while still collapsing heavily overlapping result sets.
+MAX_COALESCED_TERMS = 5
+
+# ODP field used for publication-date (late publication) deltas
+PUBLICATION_DATE_FIELD = "applicationMetaData.earliestPublicationDate"
+
+# ODP returns at most this many rows per page regardless of `rows`
+API_PAGE_SIZE = 25
+
+# Shared request rate for every USPTO call made by this process
+USPTO_CALLS_PER_SECOND = float(os.environ.get("USPTO_CALLS_PER_SECOND", "2"))
+
+# Retries for rate-limited (429) and server-error (5xx) responses
+USPTO_MAX_RETRIES = 2
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1/rate seconds apart."""
+
+    def __init__(self, calls_per_second: float):
+        self.interval = 1.0 / calls_per_second if calls_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the caller may make its next request."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (e.g. after HTTP 429)."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+class QuotaState:
+    """USPTO quota as last reported by the API's rate-limit headers."""
+
+    # Header spellings seen across API gateways, most specific first
+    _REMAINING = ("X-RateLimit-Remaining", "RateLimit-Remaining")
+    _LIMIT = ("X-RateLimit-Limit", "RateLimit-Limit")
+    _RESET = ("X-RateLimit-Reset", "RateLimit-Reset")
+
+    def __init__(self):
+        self.calls = 0
+        self.remaining = None
+        self.limit = None
+        self.reset_seconds = None
+        self._lock = threading.Lock()
+
+    def record_call(self, headers) -> None:
+        """Count one request and read its rate-limit headers, if present."""
+        with self._lock:
+            self.calls += 1
+            if headers is None:
+                return
+            remaining = _first_int_header(headers, self._REMAINING)
+            if remaining is not None:
+                self.remaining = remaining
+            limit = _first_int_header(headers, self._LIMIT)
+            if limit is not None:
+                self.limit = limit
+            reset = _first_int_header(headers, self._RESET)
+            if reset is not None:
+                self.reset_seconds = reset
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "remaining": self.remaining,
+                "limit": self.limit,
+                "reset_seconds": self.reset_seconds,
+            }
+
+
+def _first_int_header(headers, names: tuple) -> Optional[int]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                pass
+    return None
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of parsed USPTO pages with a time-to-live."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_uspto_rate_limiter = RateLimiter(USPTO_CALLS_PER_SECOND)
+_uspto_quota = QuotaState()
+
+# Identical (query, rows, start) requests within the TTL are served from
+# memory; set USPTO_CACHE_TTL_SECONDS=0 to disable. Long-lived processes
+# (a warm Functions host, backfill workers) call clear_response_cache() at
+# the start of each run, so the cache never outlives one run.
+_uspto_cache = ResponseCache(float(os.environ.get("USPTO_CACHE_TTL_SECONDS", "3600")))
+
+
+# ELT mode: receives (query, start, response JSON text) for every page
+# fetched from the search API (cache hits excluded). See tools/raw_pages.py.
+_raw_page_sink: Optional[Callable[[str, int, str], None]] = None
+
+
+def set_raw_page_sink(sink: Optional[Callable[[str, int, str], None]]) -> None:
+    """Install (or with None, remove) the raw search page sink.
+
+    The sink is called from fetch worker threads, so it must be thread-safe.
+    """
+    global _raw_page_sink
+    _raw_page_sink = sink
+
+
+def clear_response_cache() -> None:
+    """Drop every cached USPTO page.
+
+    Call at the start of a sync run: pages cached by an earlier run in the
+    same process would hide patents published since.
+    """
+    _uspto_cache.clear()
+
+
+def get_quota_state() -> dict:
+    """USPTO calls made by this process and the quota the API last reported.
+
+    Returns:
+        Dict with calls, remaining, limit and reset_seconds (None when the
+        API has not sent the corresponding rate-limit header)
+    """
+    return _uspto_quota.snapshot()
+
+
+class PagedResults(NamedTuple):
+    """All pages of one query, with fetch statistics."""
+
+    patents: list
+    total_count: int
+    pages: int
+    seconds: float
+    failed: bool = False  # a page request failed (not just empty); results are incomplete
+
 
 def _get_api_key() -> Optional[str]:
     """Get USPTO API key from environment or .env file.
@@ -60,7 +251,7 @@ def _get_api_key() -> Optional[str]:
     return None
 
 
-def search_by_assignee(company: str, limit: int = 50) -> list[dict]:
+def search_by_assignee(company: str, limit: int = 50) -> list[Patent]:
     """Search patents by assignee/company name.
 
     Args:
@@ -68,7 +259,7 @@ def search_by_assignee(company: str, limit: int = 50) -> list[dict]:
         limit: Maximum number of results to return
 
     Returns:
-        List of patent dictionaries
+        List of Patent records
     """
     # Try USPTO ODP API first (primary source)
     # Use field-specific query to search applicant name directly
@@ -89,7 +280,7 @@ def search_by_title(
     filing_date_from: Optional[str] = None,
     filing_date_to: Optional[str] = None,
     start: int = 0,
-) -> list[dict]:
+) -> list[Patent]:
     """Search patents by title keywords with optional date-range filtering.
 
     Args:
@@ -100,15 +291,12 @@ def search_by_title(
         start: Offset for pagination (skip first N results)
 
     Returns:
-        List of patent dictionaries
+        List of Patent records
     """
     # Try USPTO ODP API first (primary source)
     # Use field-specific query to search invention title directly
     title_query = f'applicationMetaData.inventionTitle:({keywords})'
-    if filing_date_from or filing_date_to:
-        date_from = filing_date_from or "*"
-        date_to = filing_date_to or "*"
-        title_query += f' AND applicationMetaData.filingDate:[{date_from} TO {date_to}]'
+    title_query += _filing_date_clause(filing_date_from, filing_date_to)
     results = _search_uspto_odp(title_query, limit, start=start)
     if results:
         return results
@@ -125,7 +313,7 @@ def search_by_cpc(
     filing_date_from: Optional[str] = None,
     filing_date_to: Optional[str] = None,
     start: int = 0,
-) -> list[dict]:
+) -> list[Patent]:
     """Search patents by CPC (Cooperative Patent Classification) code.
 
     CPC codes are assigned by patent examiners and provide precise
@@ -140,26 +328,399 @@ def search_by_cpc(
         start: Offset for pagination (skip first N results)
 
     Returns:
-        List of patent dictionaries
+        List of Patent records
     """
     cpc_query = f'applicationMetaData.cpcClassificationBag:{cpc_code}*'
-    if filing_date_from or filing_date_to:
-        date_from = filing_date_from or "*"
-        date_to = filing_date_to or "*"
-        cpc_query += f' AND applicationMetaData.filingDate:[{date_from} TO {date_to}]'
+    cpc_query += _filing_date_clause(filing_date_from, filing_date_to)
     return _search_uspto_odp(cpc_query, limit, start=start)
 
 
-def get_patent(patent_number: str) -> Optional[dict]:
-    """Get single patent by publication number.
+def plan_coalesced_queries(
+    terms: list[str], max_terms: int = MAX_COALESCED_TERMS
+) -> list[list[str]]:
+    """Group topics or CPC prefixes into batches for one OR'd query each.
+
+    Args:
+        terms: Topics or CPC code prefixes, in priority order
+        max_terms: Maximum number of terms merged into a single query
+
+    Returns:
+        List of term groups; each group becomes one API query per window
+    """
+    if max_terms < 1:
+        raise ValueError("max_terms must be at least 1")
+    unique = list(dict.fromkeys(terms))
+    return [unique[i:i + max_terms] for i in range(0, len(unique), max_terms)]
+
+
+def build_coalesced_title_query(
+    topics: list[str],
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    publication_date_from: Optional[str] = None,
+    publication_date_to: Optional[str] = None,
+) -> str:
+    """Build one Lucene query matching any of several title topics."""
+    clause = " OR ".join(f"({topic})" for topic in topics)
+    return (
+        f'applicationMetaData.inventionTitle:({clause})'
+        + _filing_date_clause(filing_date_from, filing_date_to)
+        + _date_range_clause(PUBLICATION_DATE_FIELD, publication_date_from, publication_date_to)
+    )
+
+
+def build_coalesced_cpc_query(
+    cpc_codes: list[str],
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    publication_date_from: Optional[str] = None,
+    publication_date_to: Optional[str] = None,
+) -> str:
+    """Build one Lucene query matching any of several CPC code prefixes."""
+    clause = " OR ".join(f"{code}*" for code in cpc_codes)
+    return (
+        f'applicationMetaData.cpcClassificationBag:({clause})'
+        + _filing_date_clause(filing_date_from, filing_date_to)
+        + _date_range_clause(PUBLICATION_DATE_FIELD, publication_date_from, publication_date_to)
+    )
+
+
+def search_by_titles(
+    topics: list[str],
+    limit: int = 50,
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    start: int = 0,
+) -> dict[str, list[Patent]]:
+    """Search several title topics with a single coalesced API request.
+
+    The topics are OR'd into one query and every returned patent is
+    attributed back to the topics whose terms appear in its title (see
+    title_matches()). A patent can be attributed to more than one topic.
+
+    Args:
+        topics: Title keyword queries (same syntax as search_by_title)
+        limit: Maximum number of results for the coalesced query
+        filing_date_from: Start date for filing date filter (YYYY-MM-DD)
+        filing_date_to: End date for filing date filter (YYYY-MM-DD)
+        start: Offset for pagination of the coalesced query
+
+    Returns:
+        Dict mapping each topic to the patents attributed to it
+    """
+    query = build_coalesced_title_query(topics, filing_date_from, filing_date_to)
+    results, total = _fetch_uspto_page(query, limit, start=start)
+    # Google Patents cannot apply the date range, so only an undated
+    # query falls back, and only when the USPTO request failed (an empty
+    # result is an answer, not an outage)
+    if total is None and start == 0 and not (filing_date_from or filing_date_to):
+        print(f"[USPTO API unavailable, trying Google Patents for {len(topics)} topics]")
+        google_query = " OR ".join(f"({topic})" for topic in topics)
+        results = _search_google_patents(google_query, limit)
+    return attribute_patents(
+        results, topics, lambda p, t: title_matches(p.title, t)
+    )
+
+
+def search_by_cpcs(
+    cpc_codes: list[str],
+    limit: int = 50,
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    start: int = 0,
+    publication_date_from: Optional[str] = None,
+    publication_date_to: Optional[str] = None,
+) -> dict[str, list[Patent]]:
+    """Search several CPC code prefixes with a single coalesced API request.
+
+    Every returned patent is attributed back to the prefixes present in
+    its cpc_codes (see cpc_matches()).
+
+    Args:
+        cpc_codes: CPC code prefixes (e.g., ["G06N", "G06Q"])
+        limit: Maximum number of results for the coalesced query
+        filing_date_from: Start date for filing date filter (YYYY-MM-DD)
+        filing_date_to: End date for filing date filter (YYYY-MM-DD)
+        start: Offset for pagination of the coalesced query
+        publication_date_from: Start date for publication date filter
+        publication_date_to: End date for publication date filter
+
+    Returns:
+        Dict mapping each CPC prefix to the patents attributed to it
+    """
+    query = build_coalesced_cpc_query(
+        cpc_codes, filing_date_from, filing_date_to,
+        publication_date_from, publication_date_to,
+    )
+    results = _search_uspto_odp(query, limit, start=start)
+    return attribute_patents(
+        results, cpc_codes, lambda p, c: cpc_matches(p.cpc_codes, c)
+    )
+
+
+def search_all_by_titles(
+    topics: list[str],
+    filing_date_from: Optional[str] = None,
+    filing_date_to: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_workers: int = 4,
+    publication_date_from: Optional[str] = None,
+    publication_date_to: Optional[str] = None,
+) -> tuple[dict[str, list[Patent]], PagedResults]:
+    """Like search_by_titles(), but paginates the coalesced query to completion.
+
+    Args:
+        topics: Title keyword queries (same syntax as search_by_title)
+        filing_date_from: Start date for filing date filter (YYYY-MM-DD)
+        filing_date_to: End date for filing date filter (YYYY-MM-DD)
+        max_pages: Optional cap on pages fetched (None = all)
+        max_workers: Concurrent page requests (still bound by the rate limiter)
+        publication_date_from: Start date for publication date filter
+        publication_date_to: End date for publication date filter
+
+    Returns:
+        Tuple of (dict mapping each topic to its patents, PagedResults stats)
+    """
+    query = build_coalesced_title_query(
+        topics, filing_date_from, filing_date_to,
+        publication_date_from, publication_date_to,
+    )
+    paged = fetch_all_pages(query, max_pages=max_pages, max_workers=max_workers)
+    results = paged.patents
+    # As in search_by_titles(): no fallback for an empty result or a dated
+    # query, and none once USPTO answered (a later page failing sets failed)
+    dated = filing_date_from or filing_date_to or publication_date_from or publication_date_to
+    if paged.failed and not paged.pages and not dated:
+        print(f"[USPTO API unavailable, trying Google Patents for {len(topics)} topics]")
+        google_query = " OR ".join(f"({topic})" for topic in topics)
+        results = _search_google_patents(google_query, 100)
+    by_topic = attribute_patents(results, topics, lambda p, t: title_matches(p.title, t))
+    return by_topic, paged
+
+
+def fetch_all_pages(
+    query: str, max_pages: Optional[int] = None, max_workers: int = 4, parse: bool = True
+) -> PagedResults:
+    """Fetch every page of a USPTO ODP query.
+
+    The first page reports the total match count; the remaining pages are
+    then requested concurrently, so the critical path is about two page
+    round trips rather than one per page. All requests share the module
+    rate limiter. Duplicate patent numbers across pages are dropped.
+
+    Args:
+        query: Lucene query string
+        max_pages: Optional cap on pages fetched (None = all)
+        max_workers: Concurrent page requests
+        parse: Build Patent records; with False the pages only reach the
+            raw page sink (ELT loads) and patents is empty
+
+    Returns:
+        PagedResults with patents in page order; failed is set if any page
+        request failed, so the results may be incomplete
+    """
+    started = time.monotonic()
+    first, total = _fetch_uspto_page(query, API_PAGE_SIZE, start=0, parse=parse)
+    # Unparsed pages come back empty; the match count alone says whether to go on
+    more = bool(first) if parse else bool(total)
+    page_count = -(-(total or 0) // API_PAGE_SIZE) if more else 0
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+
+    pages = [first]
+    failed = total is None
+    offsets = [page * API_PAGE_SIZE for page in range(1, page_count)]
+    if offsets:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for page, page_total in pool.map(
+                lambda offset: _fetch_uspto_page(query, API_PAGE_SIZE, offset, parse),
+                offsets,
+            ):
+                pages.append(page)
+                failed = failed or page_total is None
+
+    patents, seen = [], set()
+    for page in pages:
+        for patent in page:
+            if patent.patent_number not in seen:
+                seen.add(patent.patent_number)
+                patents.append(patent)
+    return PagedResults(patents, total or 0, len(pages) if more else 0,
+                        time.monotonic() - started, failed=failed)
+
+
+def fetch_page(query: str, start: int = 0) -> tuple[list[Patent], Optional[int]]:
+    """Fetch one API_PAGE_SIZE page of a USPTO ODP query.
+
+    Uses the same cache entries as fetch_all_pages(), so a page already
+    fetched by either is not requested again within a run.
+
+    Args:
+        query: Lucene query string
+        start: Offset of the page (a multiple of API_PAGE_SIZE)
+
+    Returns:
+        Tuple of (Patent records, total match count); the total is None
+        when the request failed, as opposed to an empty result
+    """
+    return _fetch_uspto_page(query, API_PAGE_SIZE, start=start)
+
+
+def attribute_patents(patents: list, terms: list[str], matcher) -> dict[str, list]:
+    """Attribute coalesced-query results back to the terms that matched them.
+
+    Results that match none of the terms locally (e.g. because the API
+    stems a word differently) are attributed to the first term so they
+    are never dropped.
+
+    Args:
+        patents: Results of a coalesced query
+        terms: Terms that were OR'd into the query
+        matcher: Callable (patent, term) -> bool
+
+    Returns:
+        Dict mapping each term to its patents, in result order
+    """
+    attributed = {term: [] for term in terms}
+    for patent in patents:
+        matched = [term for term in terms if matcher(patent, term)]
+        for term in matched or terms[:1]:
+            attributed[term].append(patent)
+    return attributed
+
+
+def title_matches(title: str, keywords: str) -> bool:
+    """Check a title against a search_by_title() keyword query locally.
+
+    Supports the query syntax described in the module docstring: bare
+    terms (OR'd by default), "quoted phrases", AND / OR / NOT, parentheses
+    and trailing * wildcards. Matching is case-insensitive on word tokens.
+
+    Args:
+        title: Patent title
+        keywords: Keyword query as passed to search_by_title()
+
+    Returns:
+        True if the title satisfies the query
+    """
+    parser = _KeywordQuery(query_tokens(keywords))
+    return parser.evaluate(normalized_words(title))
+
+
+def cpc_matches(cpc_codes: list[str], cpc_code: str) -> bool:
+    """Check whether any of a patent's CPC codes starts with a prefix.
+
+    Whitespace is ignored, so "G06N   3/08" matches the prefix "G06N3".
+    """
+    prefix = "".join(cpc_code.split()).upper()
+    return any("".join(code.split()).upper().startswith(prefix) for code in cpc_codes)
+
+
+class _KeywordQuery:
+    """Tiny recursive-descent evaluator for title keyword queries."""
+
+    def __init__(self, tokens: list[str]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def evaluate(self, words: list[str]) -> bool:
+        self.words = words
+        self.word_set = set(words)
+        self.pos = 0
+        if not self.tokens:
+            return False
+        return self._or_expr()
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _or_expr(self) -> bool:
+        # Lucene default operator is OR; a bare NOT clause excludes instead.
+        positive, negative = [], []
+        while self._peek() not in (None, ")"):
+            if self._peek() == "OR":
+                self.pos += 1
+                continue
+            if self._peek() == "NOT":
+                self.pos += 1
+                negative.append(self._and_expr())
+                continue
+            positive.append(self._and_expr())
+        return (any(positive) or not positive) and not any(negative)
+
+    def _and_expr(self) -> bool:
+        result = self._unary()
+        while self._peek() == "AND":
+            self.pos += 1
+            result = self._unary() and result
+        return result
+
+    def _unary(self) -> bool:
+        if self._peek() == "NOT":
+            self.pos += 1
+            return not self._unary()
+        return self._primary()
+
+    def _primary(self) -> bool:
+        token = self._peek()
+        if token is None:
+            return False
+        self.pos += 1
+        if token == "(":
+            result = self._or_expr()
+            if self._peek() == ")":
+                self.pos += 1
+            return result
+        if token.startswith('"'):
+            return _contains_phrase(self.words, normalized_words(token))
+        if ":" in token:
+            token = token.split(":", 1)[1]
+        if token.endswith("*"):
+            prefix = token[:-1].lower()
+            return any(w.startswith(prefix) for w in self.words)
+        return any(normalize_token(w) in self.word_set for w in words(token))
+
+
+def _contains_phrase(words: list[str], phrase: list[str]) -> bool:
+    """Check whether phrase occurs as a contiguous run of words."""
+    if not phrase:
+        return False
+    n = len(phrase)
+    return any(words[i:i + n] == phrase for i in range(len(words) - n + 1))
+
+
+def _filing_date_clause(
+    filing_date_from: Optional[str], filing_date_to: Optional[str]
+) -> str:
+    """Lucene range clause on filing date, or empty string if unbounded."""
+    return _date_range_clause(
+        "applicationMetaData.filingDate", filing_date_from, filing_date_to
+    )
+
+
+def _date_range_clause(field: str, date_from: Optional[str], date_to: Optional[str]) -> str:
+    """Lucene ' AND field:[from TO to]' clause, or empty string if unbounded."""
+    if not (date_from or date_to):
+        return ""
+    return f' AND {field}:[{date_from or "*"} TO {date_to or "*"}]'
+
+
+def get_patent(patent_number: str) -> Optional[Patent]:
+    """Get single patent by application or publication number.
 
     Args:
-        patent_number: Publication number (e.g., "US11934567B2")
+        patent_number: Application number (e.g., "19255999") or publication
+            number (e.g., "US20250012345A1", "US11934567B2")
 
     Returns:
-        Patent dictionary or None if not found
+        Patent record or None if not found
     """
-    # Try USPTO first
+    # Direct ID lookup first (exact field match, cached)
+    found = get_patents([patent_number]).get(patent_number)
+    if found:
+        return found
+
+    # Free-text USPTO search (e.g. granted patent numbers)
     results = _search_uspto_odp(patent_number, 1)
     if results:
         return results[0]
@@ -169,7 +730,141 @@ def get_patent(patent_number: str) -> Optional[dict]:
     return results[0] if results else None
 
 
-def _search_uspto_odp(query: str, limit: int, start: int = 0) -> list[dict]:
+def get_patents(ids: Iterable[str], max_workers: int = 4) -> dict[str, Patent]:
+    """Look up many patents by application or publication number.
+
+    IDs are looked up directly against applicationNumberText or
+    earliestPublicationNumber, API_PAGE_SIZE IDs per OR'd query, so a
+    watchlist of 1,000 patents takes about 40 requests. Chunks are fetched
+    concurrently under the shared rate limiter and go through the response
+    cache. IDs in other formats (e.g. granted patent numbers) are not
+    supported here; use get_patent() for those.
+
+    Args:
+        ids: Application numbers (digits, e.g. "19255999" or "16/123,456")
+            and/or pre-grant publication numbers (e.g. "US20250012345A1")
+        max_workers: Concurrent chunk requests
+
+    Returns:
+        Dict mapping each found input ID to its Patent record
+    """
+    by_field = {"applicationNumberText": {}, "applicationMetaData.earliestPublicationNumber": {}}
+    for raw_id in ids:
+        normalized = "".join(raw_id.split()).upper()
+        if not normalized:
+            continue
+        digits = re.sub(r"[/,]", "", normalized)
+        if digits.isdigit():
+            by_field["applicationNumberText"][digits] = raw_id
+        else:
+            by_field["applicationMetaData.earliestPublicationNumber"][normalized] = raw_id
+
+    chunks = []
+    for field_name, wanted in by_field.items():
+        keys = list(wanted)
+        for i in range(0, len(keys), API_PAGE_SIZE):
+            chunk = keys[i:i + API_PAGE_SIZE]
+            chunks.append((f"{field_name}:({' OR '.join(chunk)})", len(chunk)))
+    if not chunks:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pages = list(pool.map(lambda c: _fetch_uspto_page(c[0], c[1])[0], chunks))
+
+    found = {}
+    app_ids = by_field["applicationNumberText"]
+    pub_ids = by_field["applicationMetaData.earliestPublicationNumber"]
+    for page in pages:
+        for patent in page:
+            if patent.application_number in app_ids:
+                found[app_ids[patent.application_number]] = patent
+            if patent.patent_number in pub_ids:
+                found[pub_ids[patent.patent_number]] = patent
+    return found
+
+
+def get_application_details(
+    application_numbers: Iterable[str], max_workers: int = 4
+) -> dict[str, dict]:
+    """Fetch grant date, status and abstract for applications.
+
+    Search results carry neither abstracts nor (reliably) grant dates, so
+    this looks each application up individually: the application record
+    for grantDate and applicationStatusCode, then its associated documents
+    for the grant (or pre-grant publication) full-text XML, which holds the
+    abstract. That is 2-3 requests per application, run concurrently under
+    the shared rate limiter.
+
+    Args:
+        application_numbers: Application numbers (digits, e.g. "19255999")
+        max_workers: Concurrent application lookups
+
+    Returns:
+        Dict mapping each application number that could be fetched to
+        {"grant_date", "status_code", "abstract"} (missing values are None
+        or ""). An application is left out if any of its requests failed,
+        so an abstract of "" always means no document has one.
+    """
+    numbers = list(dict.fromkeys(application_numbers))
+    if not numbers:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        details = list(pool.map(_fetch_application_details, numbers))
+    return {number: d for number, d in zip(numbers, details) if d is not None}
+
+
+def _fetch_application_details(application_number: str) -> Optional[dict]:
+    """Application record plus full-text abstract for one application."""
+    base = f"{USPTO_ODP_APPLICATION_API}/{urllib.parse.quote(application_number)}"
+    data = _uspto_get_json(base, "application")
+    if data is None:
+        return None
+    bag = data.get("patentFileWrapperDataBag") or [{}]
+    meta = bag[0].get("applicationMetaData", {})
+
+    grant_date = meta.get("grantDate") or None
+    if grant_date and "T" in grant_date:
+        grant_date = grant_date.split("T")[0]
+    details = {
+        "grant_date": grant_date,
+        "status_code": meta.get("applicationStatusCode"),
+        "abstract": "",
+    }
+
+    # "" only when no document exists; a failed request defers the whole
+    # application (None), or the enrichment would record it as abstract-less
+    docs = _uspto_get_json(f"{base}/associated-documents", "associated-documents",
+                           missing_ok=True)
+    if docs is None:
+        return None
+    entry = (docs.get("patentFileWrapperDataBag") or [{}])[0]
+    for key in ("grantDocumentMetaData", "pgpubDocumentMetaData"):
+        location = (entry.get(key) or {}).get("fileLocationURI")
+        if not location:
+            continue
+        xml = _uspto_request(location, "application/xml", "full-text", missing_ok=True)
+        if xml is None:
+            return None
+        details["abstract"] = _extract_abstract(xml) if xml else ""
+        if details["abstract"]:
+            break
+    return details
+
+
+def _extract_abstract(xml: bytes) -> str:
+    """Plain-text <abstract> from a USPTO full-text XML document."""
+    try:
+        root = ElementTree.fromstring(xml)
+        node = root if root.tag == "abstract" else root.find(".//abstract")
+        text = " ".join(node.itertext()) if node is not None else ""
+    except ElementTree.ParseError:
+        match = re.search(rb"<abstract[^>]*>(.*?)</abstract>", xml, re.DOTALL)
+        text = re.sub(r"<[^>]+>", " ", match.group(1).decode(errors="replace")) if match else ""
+        text = html.unescape(text)
+    return " ".join(text.split())
+
+
+def _search_uspto_odp(query: str, limit: int, start: int = 0) -> list[Patent]:
     """Search USPTO Open Data Portal API.
 
     Args:
@@ -178,12 +873,34 @@ def _search_uspto_odp(query: str, limit: int, start: int = 0) -> list[dict]:
         start: Offset for pagination (skip first N results)
 
     Returns:
-        List of patent dictionaries, empty list on failure
+        List of Patent records, empty list on failure
     """
-    api_key = _get_api_key()
-    if not api_key:
-        print("[No USPTO_API_KEY found - set in environment or .env file]")
-        return []
+    return _fetch_uspto_page(query, limit, start)[0]
+
+
+def _fetch_uspto_page(
+    query: str, limit: int, start: int = 0, parse: bool = True
+) -> tuple[list[Patent], Optional[int]]:
+    """Fetch one page from the USPTO ODP search API under the rate limiter.
+
+    Successful parsed pages are kept in the response cache; failures are
+    not. Unparsed pages bypass the cache so the raw page sink always sees
+    them.
+
+    Args:
+        query: Search query
+        limit: Maximum results to return
+        start: Offset for pagination (skip first N results)
+        parse: Build Patent records; with False only the raw page sink
+            gets the page and no records are returned
+
+    Returns:
+        Tuple of (Patent records, total match count); ([], None) on failure
+    """
+    cache_key = (query, min(limit, 100), start)
+    cached = _uspto_cache.get(cache_key) if parse else None
+    if cached is not None:
+        return list(cached[0][:limit]), cached[1]
 
     params = {
         "q": query,
@@ -191,50 +908,123 @@ def _search_uspto_odp(query: str, limit: int, start: int = 0) -> list[dict]:
         "start": start,
     }
 
-    url = f"{USPTO_ODP_API}?{urllib.parse.urlencode(params)}"
-
-    headers = {
-        "X-API-KEY": api_key,
-        "Accept": "application/json",
-    }
-
-    try:
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=30) as response:
-            data = json.loads(response.read().decode())
-
-        results = []
+    body = _uspto_request(f"{USPTO_ODP_API}?{urllib.parse.urlencode(params)}", "application/json")
+    if body is None:
+        return [], None
+    text = body.decode()
+    data = json.loads(text)
+    if _raw_page_sink is not None:
+        _raw_page_sink(query, start, text)
+    if not parse:
+        return [], data.get("count", 0)
+
+    results = []
+    with timer("uspto.format") as t:
         for app in data.get("patentFileWrapperDataBag", []):
             patent = _format_uspto_patent(app)
-            if patent and patent.get("patent_number"):  # Skip if no usable ID
+            if patent and patent.patent_number:  # Skip if no usable ID
                 results.append(patent)
                 if len(results) >= limit:
                     break
+        t.set(items=len(results))
 
-        if results:
-            print(f"[USPTO ODP: Found {data.get('count', 0)} total, returning {len(results)}]")
+    if results:
+        print(f"[USPTO ODP: Found {data.get('count', 0)} total, returning {len(results)}]")
 
-        return results
+    _uspto_cache.put(cache_key, (tuple(results), data.get("count", 0)))
+    return results, data.get("count", 0)
 
-    except urllib.error.HTTPError as e:
-        if e.code == 401 or e.code == 403:
-            print(f"[USPTO API authentication failed (HTTP {e.code}) - check API key]")
-        else:
-            print(f"[USPTO API error: HTTP {e.code}]")
-        return []
-    except Exception as e:
-        print(f"[USPTO API error: {e}]")
-        return []
 
+def _uspto_get_json(
+    url: str, endpoint: str = "search", missing_ok: bool = False
+) -> Optional[dict]:
+    """GET a USPTO ODP JSON endpoint; parsed body or None on failure.
+
+    With missing_ok, a 404 yields {} (nothing there) rather than None.
+    """
+    body = _uspto_request(url, "application/json", endpoint, missing_ok)
+    if body is None:
+        return None
+    return json.loads(body.decode()) if body else {}
+
+
+def _uspto_request(
+    url: str, accept: str, endpoint: str = "search", missing_ok: bool = False
+) -> Optional[bytes]:
+    """GET a USPTO ODP URL under the rate limiter and quota tracking.
+
+    Rate-limited (429) and server-error (5xx) responses are retried up to
+    USPTO_MAX_RETRIES times, after the Retry-After pause for a 429.
 
-def _format_uspto_patent(app: dict) -> Optional[dict]:
-    """Convert USPTO ODP result to standardized dict for storage.
+    Args:
+        url: Full request URL
+        accept: Accept header value
+        endpoint: Label for instrumentation (e.g. "search", "application")
+        missing_ok: Return b"" for a 404, so callers can tell a resource
+            that does not exist from a failed request
+
+    Returns:
+        Response body, or None on failure (errors are printed)
+    """
+    api_key = _get_api_key()
+    if not api_key:
+        print("[No USPTO_API_KEY found - set in environment or .env file]")
+        return None
+
+    headers = {
+        "X-API-KEY": api_key,
+        "Accept": accept,
+    }
+
+    with timer("uspto.request", endpoint=endpoint) as t:
+        for attempt in range(USPTO_MAX_RETRIES + 1):
+            t.set(retries=attempt)
+            try:
+                _uspto_rate_limiter.acquire()
+                req = urllib.request.Request(url, headers=headers)
+                with urllib.request.urlopen(req, timeout=30) as response:
+                    _uspto_quota.record_call(response.headers)
+                    body = response.read()
+                t.set(status=response.status, bytes=len(body))
+                return body
+
+            except urllib.error.HTTPError as e:
+                _uspto_quota.record_call(e.headers)
+                t.set(status=e.code)
+                retry = attempt < USPTO_MAX_RETRIES
+                if e.code == 404 and missing_ok:
+                    return b""
+                elif e.code == 401 or e.code == 403:
+                    print(f"[USPTO API authentication failed (HTTP {e.code}) - check API key]")
+                    return None
+                elif e.code == 429:
+                    count("uspto.rate_limited", endpoint=endpoint)
+                    retry_after = _first_int_header(e.headers or {}, ("Retry-After",)) or 10
+                    _uspto_rate_limiter.pause(retry_after)
+                    print(f"[USPTO API rate limited (HTTP 429) - pausing {retry_after}s]")
+                elif e.code >= 500 and retry:
+                    print(f"[USPTO API error: HTTP {e.code} - retrying]")
+                    time.sleep(2 ** attempt)
+                else:
+                    print(f"[USPTO API error: HTTP {e.code}]")
+                    return None
+                if not retry:
+                    return None
+            except Exception as e:
+                t.set(status="error")
+                print(f"[USPTO API error: {e}]")
+                return None
+    return None
+
+
+def _format_uspto_patent(app: dict) -> Optional[Patent]:
+    """Convert USPTO ODP result to a Patent record for storage.
 
     Args:
         app: Application data from USPTO ODP API
 
     Returns:
-        Standardized patent dictionary or None if invalid
+        Patent record or None if invalid
     """
     meta = app.get("applicationMetaData", {})
     if not meta:
@@ -258,6 +1048,10 @@ def _format_uspto_patent(app: dict) -> Optional[dict]:
     if filing_date and "T" in filing_date:
         filing_date = filing_date.split("T")[0]
 
+    grant_date = meta.get("grantDate") or None  # Only set once granted
+    if grant_date and "T" in grant_date:
+        grant_date = grant_date.split("T")[0]
+
     # Extract CPC codes if available
     cpc_codes = []
     for cpc in meta.get("cpcClassificationBag", []):
@@ -271,21 +1065,21 @@ def _format_uspto_patent(app: dict) -> Optional[dict]:
     if not patent_id:
         patent_id = app.get("applicationNumberText", "")
 
-    return {
-        "patent_number": patent_id,
-        "title": meta.get("inventionTitle", ""),
-        "abstract": "",  # ODP search doesn't include abstract
-        "assignee": assignee,
-        "inventors": inventors,
-        "filing_date": filing_date,
-        "grant_date": None,  # Would need separate lookup
-        "cpc_codes": cpc_codes,
-        "status_code": meta.get("applicationStatusCode"),
-    }
-
-
-
-def _search_google_patents(query: str, limit: int) -> list[dict]:
+    return Patent(
+        patent_number=patent_id,
+        title=meta.get("inventionTitle", ""),
+        abstract="",  # ODP search doesn't include abstract
+        assignee=assignee,
+        inventors=inventors,
+        filing_date=filing_date,
+        grant_date=grant_date,
+        cpc_codes=cpc_codes,
+        status_code=meta.get("applicationStatusCode"),
+        application_number=app.get("applicationNumberText", ""),
+    )
+
+
+def _search_google_patents(query: str, limit: int) -> list[Patent]:
     """Search Google Patents API (fallback).
 
     Args:
@@ -293,7 +1087,7 @@ def _search_google_patents(query: str, limit: int) -> list[dict]:
         limit: Maximum results to return
 
     Returns:
-        List of patent dictionaries
+        List of Patent records
     """
     params = {
         "url": query,
@@ -338,26 +1132,25 @@ def _search_google_patents(query: str, limit: int) -> list[dict]:
         return []
 
 
-def _format_google_patent(patent: dict) -> dict:
-    """Convert Google Patents result to standardized dict.
+def _format_google_patent(patent: dict) -> Patent:
+    """Convert Google Patents result to a Patent record.
 
     Args:
         patent: Patent dictionary from Google Patents API
 
     Returns:
-        Standardized patent dictionary
+        Patent record
     """
     assignee = patent.get("assignee", "")
     if assignee:
         assignee = assignee.replace("<b>", "").replace("</b>", "")
 
-    return {
-        "patent_number": patent.get("publication_number", ""),
-        "title": patent.get("title", "").strip(),
-        "abstract": patent.get("snippet", "").replace("&hellip;", "..."),
-        "assignee": assignee,
-        "inventors": [patent.get("inventor", "")] if patent.get("inventor") else [],
-        "filing_date": patent.get("filing_date"),
-        "grant_date": patent.get("grant_date"),
-        "cpc_codes": [],
-    }
+    return Patent(
+        patent_number=patent.get("publication_number", ""),
+        title=patent.get("title", "").strip(),
+        abstract=patent.get("snippet", "").replace("&hellip;", "..."),
+        assignee=assignee,
+        inventors=(patent["inventor"],) if patent.get("inventor") else (),
+        filing_date=patent.get("filing_date"),
+        grant_date=patent.get("grant_date"),
+    )
@@ -0,0 +1,168 @@
+"""Opt-in profiling for the backfill and chart scripts (--profile).
+
+A Profiler runs the wrapped block under cProfile (and optionally
+tracemalloc) and writes two files: <name>_<timestamp>.prof for snakeviz /
+pstats, and a matching .txt report with a wall-clock breakdown by stage,
+the top functions by cumulative time and, with memory tracing, the top
+allocation sites.
+
+Stages are marked in the scripts with stage("fetch") / "dedup" / "write" /
+"commit" / "render"; dedup is Python and write and commit are SQL. Outside
+a Profiler, stage() returns a shared no-op context manager.
+
+cProfile only sees the main thread. Paged fetches run their requests and
+parsing in ThreadPoolExecutor workers and generate_charts renders in a
+ProcessPoolExecutor, so fetch and render are wall-clock timers only: the
+function tables show the main thread waiting on those pools, not the work
+done in them. Parse time comes from the uspto.format instrumentation
+timers, which fire in whichever thread parsed; it is reported summed over
+threads as part of fetch, not subtracted from it.
+
+Usage:
+    with Profiler("cpc_backfill", "output/profiles", trace_memory=True):
+        ...
+        with stage("fetch"):
+            by_code = collect_cpc_window(...)
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from .instrumentation import add_sink, remove_sink
+
+STAGES = ("fetch", "parse", "dedup", "write", "commit", "render")
+
+_active = None
+
+
+def stage(name: str):
+    """Context manager adding the block's wall-clock time to a stage."""
+    if _active is None:
+        return _NULL_STAGE
+    return _Stage(_active, name)
+
+
+class Profiler:
+    """cProfile (+ tracemalloc) around a block, with a per-stage breakdown."""
+
+    def __init__(self, name: str, output_dir: str, top: int = 30, trace_memory: bool = False):
+        self.name = name
+        self.output_dir = output_dir
+        self.top = top
+        self.trace_memory = trace_memory
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.prof_path = None
+        self.report_path = None
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._wall = 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def emit(self, event: dict) -> None:
+        if event["type"] == "timer" and event["name"] == "uspto.format":
+            self.add("parse", event["seconds"])
+
+    def __enter__(self):
+        global _active
+        _active = self
+        add_sink(self)
+        if self.trace_memory:
+            tracemalloc.start(25)
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        self._profile.disable()
+        self._wall = time.perf_counter() - self._started
+        remove_sink(self)
+        _active = None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(
+            self.output_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        )
+        self.prof_path = f"{base}.prof"
+        self.report_path = f"{base}.txt"
+        self._profile.dump_stats(self.prof_path)
+        report = self.report()
+        if self.trace_memory:
+            tracemalloc.stop()
+        with open(self.report_path, "w") as f:
+            f.write(report)
+        print(f"\n{self._breakdown()}")
+        print(f"[Profile] Wrote {self.prof_path} and {self.report_path}")
+        return False
+
+    def report(self) -> str:
+        """Full text report: stage breakdown, top-N functions, memory."""
+        out = io.StringIO()
+        out.write(f"Profile of {self.name}\n\n{self._breakdown()}\n\n")
+        out.write(f"Top {self.top} functions by cumulative time:\n")
+        pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(self.top)
+        out.write(f"Top {self.top} functions by own time:\n")
+        pstats.Stats(self._profile, stream=out).sort_stats("tottime").print_stats(self.top)
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            out.write(f"Traced memory: {current / 1e6:.1f} MB current, {peak / 1e6:.1f} MB peak\n")
+            out.write(f"Top {self.top} allocation sites:\n")
+            for stat in tracemalloc.take_snapshot().statistics("lineno")[: self.top]:
+                out.write(f"  {stat}\n")
+        return out.getvalue()
+
+    def _breakdown(self) -> str:
+        # Parsing runs inside fetch, possibly in several threads at once, so
+        # it is listed on its own and left out of the wall-clock total
+        stages = dict(self.stages)
+        parse = stages.pop("parse")
+        wall = self._wall or 1e-9
+        lines = [f"Wall-clock by stage ({self._wall:.1f}s total):"]
+        for name, seconds in stages.items():
+            if seconds:
+                lines.append(f"  {name:<8} {seconds:9.2f}s  {seconds / wall:6.1%}")
+        other = max(self._wall - sum(stages.values()), 0.0)
+        lines.append(f"  {'other':<8} {other:9.2f}s  {other / wall:6.1%}")
+        if parse:
+            lines.append(f"  parse time summed over fetch threads: {parse:.2f}s (within fetch)")
+        if stages["fetch"] or stages["render"]:
+            lines.append("cProfile covers the main thread only: fetch and render work done in "
+                         "worker threads/processes is timed here, not in the function tables.")
+        return "\n".join(lines)
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "_started")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.add(self.name, time.perf_counter() - self._started)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
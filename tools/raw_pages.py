@@ -0,0 +1,98 @@
+"""Raw USPTO page landing for ELT-mode loads.
+
+In ELT mode the loaders skip Python-side parsing and per-patent MERGEs.
+Every search page fetched from USPTO (fetch_all_pages(parse=False)) is
+buffered as returned (via patent_search.set_raw_page_sink), landed compressed in RAW_USPTO_PAGES,
+and projected into PATENTS by one set-based OPENJSON transform. Fixing a
+transform bug then means re-running build_transform_raw_pages_sql(
+reprocess=True) over the stored pages instead of re-fetching the corpus.
+
+Usage:
+    buffer = RawPageBuffer()
+    set_raw_page_sink(buffer)
+    ...fetch pages...
+    merged = land_and_transform(cursor, buffer, "CPC:G06N", "cpc_collection")
+    conn.commit()
+"""
+import threading
+
+from .azure_sql_queries import build_insert_raw_page_query, build_transform_raw_pages_sql
+
+
+class RawPageBuffer:
+    """Thread-safe buffer of (query, start, response JSON) pages."""
+
+    def __init__(self):
+        self._pages = []
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str, start: int, body: str) -> None:
+        with self._lock:
+            self._pages.append((query, start, body))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pages)
+
+    def discard(self) -> int:
+        """Drop the buffered pages (e.g. of a window whose fetch failed).
+
+        Returns:
+            Number of pages dropped
+        """
+        with self._lock:
+            pages, self._pages = self._pages, []
+        return len(pages)
+
+    def flush(self, cursor, source: str, category: str) -> int:
+        """Insert buffered pages into RAW_USPTO_PAGES (caller commits).
+
+        Args:
+            cursor: Open pyodbc cursor
+            source: Label stored with the pages; the transform derives
+                PATENTS.search_query from it (per code for "CPC:G06N/G06Q")
+            category: Load category (e.g., "cpc_collection")
+
+        Returns:
+            Number of pages landed
+        """
+        with self._lock:
+            pages, self._pages = self._pages, []
+        if pages:
+            cursor.executemany(
+                build_insert_raw_page_query(),
+                [(source, category, query, start, body) for query, start, body in pages],
+            )
+        return len(pages)
+
+
+def transform_raw_pages(cursor, reprocess: bool = False, compress_abstract: bool = False) -> int:
+    """Run the OPENJSON transform into PATENTS (caller commits).
+
+    Args:
+        cursor: Open pyodbc cursor
+        reprocess: Re-run over every stored page, not only new ones
+        compress_abstract: PATENTS was created with compress_abstract
+
+    Returns:
+        Number of PATENTS rows inserted or updated
+    """
+    cursor.execute(build_transform_raw_pages_sql(reprocess, compress_abstract))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def land_and_transform(
+    cursor,
+    buffer: RawPageBuffer,
+    source: str,
+    category: str,
+    compress_abstract: bool = False,
+) -> int:
+    """Flush the buffer and transform the new pages (caller commits).
+
+    Returns:
+        Number of PATENTS rows inserted or updated
+    """
+    buffer.flush(cursor, source, category)
+    return transform_raw_pages(cursor, compress_abstract=compress_abstract)
@@ -0,0 +1,117 @@
+"""Result cache for the analytics queries, invalidated by data changes.
+
+Dashboard and QC results only change when PATENTS (or SYNC_LOG) does. A
+ResultCache keys each query on its SQL text and parameters and stores its
+result sets in memory and, optionally, on disk (one pickle per query).
+Before serving anything it reads the data version token
+(get_data_version_query: the newest PATENTS rowversion and tombstone plus
+the latest SYNC_LOG row, a few index seeks); when that token differs from
+the one the entries were stored under, they are dropped. Every loader
+moves the rowversion, including the ones that never write SYNC_LOG
+(BACKFILL_TASKS queue workers, the enrichment stage).
+
+Usage:
+    cache = ResultCache(os.path.join(PROJECT_ROOT, ".cache", "analytics"))
+    dashboard = fetch_dashboard(statements, cache=cache)
+"""
+import hashlib
+import os
+import pickle
+from collections import namedtuple
+from typing import Optional
+
+from .analytics import read_result_sets
+from .azure_sql_queries import get_data_version_query
+from .statements import StatementRegistry
+
+
+class ResultCache:
+    """Memory (and optional disk) cache of query result sets."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}  # key -> list of (columns, rows as tuples)
+        self._token = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def fetch(self, statements: StatementRegistry, name: str, sql: str, params: tuple = ()) -> list:
+        """Result sets of a query, from the cache while the data is unchanged.
+
+        Args:
+            statements: Registry of the connection to query on a miss
+            name: Statement name (see StatementRegistry)
+            sql: Query text from a query builder
+            params: Query parameters
+
+        Returns:
+            List of (column names, rows), one per result set; rows are named
+            tuples, so row.column access works as with pyodbc rows
+        """
+        token = self._data_token(statements)
+        key = hashlib.sha256(repr((sql, tuple(params))).encode()).hexdigest()
+
+        result_sets = self._memory.get(key)
+        if result_sets is None:
+            result_sets = self._read_disk(key, token)
+        if result_sets is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            cursor = statements.execute(name, sql, params)
+            result_sets = [(columns, [tuple(row) for row in rows])
+                           for columns, rows in read_result_sets(cursor)]
+            self._write_disk(key, token, result_sets)
+        self._memory[key] = result_sets
+        return [(columns, _named_rows(columns, rows)) for columns, rows in result_sets]
+
+    def invalidate(self) -> None:
+        """Drop every cached result (memory and disk)."""
+        self._memory.clear()
+        self._token = None
+        for entry in self._disk_entries():
+            os.remove(entry)
+
+    def _data_token(self, statements: StatementRegistry) -> str:
+        row = statements.execute("data_version", *get_data_version_query()).fetchone()
+        token = repr(tuple(row)) if row else "empty"
+        if token != self._token:
+            self._memory.clear()
+            self._token = token
+        return token
+
+    def _read_disk(self, key: str, token: str):
+        if not self.directory:
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{key}.pickle"), "rb") as f:
+                stored_token, result_sets = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        return result_sets if stored_token == token else None
+
+    def _write_disk(self, key: str, token: str, result_sets: list) -> None:
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f"{key}.pickle")
+        with open(f"{path}.tmp", "wb") as f:
+            pickle.dump((token, result_sets), f)
+        os.replace(f"{path}.tmp", path)
+
+    def _disk_entries(self) -> list[str]:
+        if not self.directory:
+            return []
+        return [os.path.join(self.directory, n) for n in os.listdir(self.directory)
+                if n.endswith(".pickle")]
+
+
+_row_types = {}
+
+
+def _named_rows(columns: list[str], rows: list) -> list:
+    row_type = _row_types.get(tuple(columns))
+    if row_type is None:
+        row_type = _row_types[tuple(columns)] = namedtuple("Row", columns, rename=True)
+    return [row_type(*row) for row in rows]
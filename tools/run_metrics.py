@@ -0,0 +1,159 @@
+"""Per-run performance metrics persisted to SYNC_RUN_METRICS.
+
+A RunMetrics collects what one sync or backfill run cost and produced:
+wall-clock duration, USPTO calls, bytes downloaded and retries (from the
+"uspto.request" instrumentation events), database round trips (via a
+counting cursor), rows inserted/updated/unchanged and peak memory. finish()
+writes it as one row, so sql/17_run_metrics_qc.sql can flag runs that are
+slower than the trailing median of their run type.
+
+Rows inserted and updated are counted in the database: PATENTS rows of the
+run's category whose rowversion moved past the value captured by begin().
+
+The instrumentation sink is installed only inside the with block, so a
+run that raises never leaves it behind.
+
+Usage:
+    with RunMetrics("cpc_backfill") as metrics:
+        cursor = metrics.track(conn.cursor())
+        metrics.begin(cursor)
+        ...load...
+        metrics.finish(cursor, sync_id, "completed", "cpc_collection",
+                       rows_sent=merged, rows_skipped=skipped)
+        conn.commit()
+"""
+import threading
+import time
+from datetime import datetime
+
+from .azure_sql_queries import build_insert_run_metrics_query, get_run_row_changes_query
+from .instrumentation import add_sink, remove_sink
+from .patent_search import get_quota_state
+
+
+class RunMetrics:
+    """Accumulates one run's metrics; an instrumentation sink inside its with block."""
+
+    def __init__(self, run_type: str):
+        self.run_type = run_type
+        self.bytes_downloaded = 0
+        self.api_retries = 0
+        self.db_round_trips = 0
+        self._started = time.monotonic()
+        self._calls_before = get_quota_state()["calls"]
+        self._db_started_at = None
+        self._start_version = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "RunMetrics":
+        add_sink(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        remove_sink(self)
+
+    def emit(self, event: dict) -> None:
+        if event["type"] == "timer" and event["name"] == "uspto.request":
+            with self._lock:
+                self.bytes_downloaded += event.get("bytes") or 0
+                self.api_retries += event.get("retries") or 0
+
+    def track(self, cursor) -> "_CountingCursor":
+        """Wrap a pyodbc cursor so its execute/executemany calls are counted."""
+        return _CountingCursor(cursor, self)
+
+    def begin(self, cursor) -> None:
+        """Capture the server clock and @@DBTS before the run writes anything."""
+        cursor.execute("SELECT GETDATE(), @@DBTS")
+        self._db_started_at, self._start_version = cursor.fetchone()
+
+    def finish(
+        self,
+        cursor,
+        sync_id,
+        status: str,
+        category: str,
+        rows_sent: int = 0,
+        rows_skipped: int = 0,
+    ) -> dict:
+        """Write the SYNC_RUN_METRICS row (caller commits) and stop collecting.
+
+        Args:
+            cursor: Open pyodbc cursor (the one passed to begin())
+            sync_id: SYNC_LOG row of the run, or None
+            status: Final run status (e.g., "completed", "partial", "failed")
+            category: PATENTS.category the run writes
+            rows_sent: Patents sent to the database (MERGE, stage or transform)
+            rows_skipped: Patents skipped in Python as already stored unchanged
+
+        Returns:
+            Dict of the recorded metrics
+        """
+        remove_sink(self)
+        inserted = updated = None
+        if self._start_version is not None:
+            cursor.execute(
+                get_run_row_changes_query(),
+                (self._db_started_at, self._start_version, category),
+            )
+            inserted, updated = cursor.fetchone()
+        unchanged = rows_skipped
+        if inserted is not None:
+            unchanged += max(rows_sent - inserted - updated, 0)
+
+        metrics = {
+            "run_type": self.run_type,
+            "sync_id": sync_id,
+            "started_at": self._db_started_at or datetime.now(),
+            "duration_seconds": round(time.monotonic() - self._started, 3),
+            "api_calls": get_quota_state()["calls"] - self._calls_before,
+            "bytes_downloaded": self.bytes_downloaded,
+            "api_retries": self.api_retries,
+            "db_round_trips": self.db_round_trips,
+            "rows_inserted": inserted,
+            "rows_updated": updated,
+            "rows_unchanged": unchanged,
+            "peak_memory_mb": _peak_memory_mb(),
+            "run_status": status,
+        }
+        cursor.execute(build_insert_run_metrics_query(), tuple(metrics.values()))
+        return metrics
+
+
+class _CountingCursor:
+    """Cursor proxy counting database round trips for a RunMetrics."""
+
+    def __init__(self, cursor, metrics: RunMetrics):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_metrics", metrics)
+
+    def execute(self, *args):
+        self._metrics.db_round_trips += 1
+        self._cursor.execute(*args)
+        return self
+
+    def executemany(self, *args):
+        self._metrics.db_round_trips += 1
+        return self._cursor.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+def _peak_memory_mb():
+    """Peak resident set size of this process in MB, or None if unknown.
+
+    A warm Functions host reuses the process, so for the daily sync this is
+    the peak since the host started, not just this invocation.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
@@ -0,0 +1,76 @@
+"""Named statements prepared once per connection.
+
+pyodbc prepares a statement once and reuses it for as long as the same
+cursor keeps executing the same SQL text; any other statement on that
+cursor throws the prepared handle away. A StatementRegistry gives every
+named statement its own cursor on the connection, so interleaved queries
+(e.g. a keyset candidate query between batches of updates) each stay
+prepared, and the server sees one parameterized text per statement (a
+few, for read queries whose optional filters change the SQL), each with
+its own cached plan.
+
+Each statement is tagged "/* stmt:<name> */" so get_statement_stats_query()
+can find it in sys.dm_exec_query_stats.
+
+Usage:
+    statements = StatementRegistry(conn)
+    rows = statements.execute("top_inventors", *get_top_inventors_query(25)).fetchall()
+    ...
+    statements.close()
+"""
+from .azure_sql_queries import get_statement_stats_query
+
+
+class StatementRegistry:
+    """Per-connection registry of tagged, prepared statements."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._statements = {}  # name -> (tagged sql, cursor)
+
+    def execute(self, name: str, sql: str, params: tuple = ()):
+        """Execute a named statement on its own cursor (caller commits).
+
+        A name keeps its cursor, and so its prepared statement, across calls;
+        registering different SQL under an existing name replaces it.
+
+        Args:
+            name: Statement name; appears in the plan-cache statistics
+            sql: Statement text from a query builder
+            params: Parameters for the ? placeholders
+
+        Returns:
+            The statement's cursor, positioned on its first result set
+        """
+        tagged = f"/* stmt:{name} */{sql}"
+        entry = self._statements.get(name)
+        if entry is None or entry[0] != tagged:
+            if entry is not None:
+                entry[1].close()
+            entry = (tagged, self.conn.cursor())
+            self._statements[name] = entry
+        cursor = entry[1]
+        cursor.execute(tagged, params)
+        return cursor
+
+    def names(self) -> list[str]:
+        """Names registered on this connection."""
+        return list(self._statements)
+
+    def stats(self, top_n: int = 20) -> list:
+        """Plan-cache statistics of tagged statements, most expensive first.
+
+        Covers every tagged statement in the database's plan cache, not only
+        this connection's. Needs VIEW DATABASE STATE.
+        """
+        cursor = self.conn.cursor()
+        try:
+            return cursor.execute(*get_statement_stats_query(top_n)).fetchall()
+        finally:
+            cursor.close()
+
+    def close(self) -> None:
+        """Close every statement cursor (the connection stays open)."""
+        for _, cursor in self._statements.values():
+            cursor.close()
+        self._statements.clear()